@@ -0,0 +1,42 @@
+"""add event_occurrences table
+
+Revision ID: j0e1f2g3h4i5
+Revises: i9d0e1f2g3h4
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "j0e1f2g3h4i5"
+down_revision = "i9d0e1f2g3h4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("occurrences_until", sa.DateTime(), nullable=True))
+    op.create_table(
+        "event_occurrences",
+        sa.Column("event_id", UUID(as_uuid=True), sa.ForeignKey("events.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("start_dt", sa.DateTime(), primary_key=True),
+        sa.Column("end_dt", sa.DateTime(), nullable=False),
+        sa.Column("sub_calendar_id", UUID(as_uuid=True), sa.ForeignKey("sub_calendars.id", ondelete="CASCADE"), nullable=False),
+    )
+    op.create_index(
+        "ix_event_occurrences_window", "event_occurrences",
+        ["sub_calendar_id", "start_dt", "end_dt"],
+    )
+    # Non-recurring events map 1:1. Recurring series are left with
+    # occurrences_until NULL and get expanded by the horizon job at startup.
+    op.execute(
+        "INSERT INTO event_occurrences (event_id, start_dt, end_dt, sub_calendar_id) "
+        "SELECT id, start_dt, end_dt, sub_calendar_id FROM events WHERE rrule IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_occurrences_window", table_name="event_occurrences")
+    op.drop_table("event_occurrences")
+    op.drop_column("events", "occurrences_until")
@@ -0,0 +1,58 @@
+"""add calendar_id to events and event_occurrences
+
+Revision ID: k1f2g3h4i5j6
+Revises: j0e1f2g3h4i5
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "k1f2g3h4i5j6"
+down_revision = "j0e1f2g3h4i5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("calendar_id", UUID(as_uuid=True), nullable=True))
+    op.execute(
+        "UPDATE events SET calendar_id = sc.calendar_id "
+        "FROM sub_calendars sc WHERE sc.id = events.sub_calendar_id"
+    )
+    op.alter_column("events", "calendar_id", nullable=False)
+    op.create_foreign_key("fk_events_calendar_id", "events", "calendars", ["calendar_id"], ["id"])
+    op.create_index("ix_events_calendar_start", "events", ["calendar_id", "start_dt"])
+    op.create_index("ix_events_calendar_end", "events", ["calendar_id", "end_dt"])
+
+    op.add_column("event_occurrences", sa.Column("calendar_id", UUID(as_uuid=True), nullable=True))
+    op.execute(
+        "UPDATE event_occurrences SET calendar_id = e.calendar_id "
+        "FROM events e WHERE e.id = event_occurrences.event_id"
+    )
+    op.alter_column("event_occurrences", "calendar_id", nullable=False)
+    op.create_foreign_key(
+        "fk_event_occurrences_calendar_id", "event_occurrences", "calendars",
+        ["calendar_id"], ["id"], ondelete="CASCADE",
+    )
+    op.drop_index("ix_event_occurrences_window", table_name="event_occurrences")
+    op.create_index(
+        "ix_event_occurrences_window", "event_occurrences",
+        ["calendar_id", "start_dt", "end_dt"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_occurrences_window", table_name="event_occurrences")
+    op.create_index(
+        "ix_event_occurrences_window", "event_occurrences",
+        ["sub_calendar_id", "start_dt", "end_dt"],
+    )
+    op.drop_constraint("fk_event_occurrences_calendar_id", "event_occurrences", type_="foreignkey")
+    op.drop_column("event_occurrences", "calendar_id")
+
+    op.drop_index("ix_events_calendar_end", table_name="events")
+    op.drop_index("ix_events_calendar_start", table_name="events")
+    op.drop_constraint("fk_events_calendar_id", "events", type_="foreignkey")
+    op.drop_column("events", "calendar_id")
@@ -0,0 +1,32 @@
+"""add generated period tsrange columns with GiST indexes
+
+Revision ID: l2g3h4i5j6k7
+Revises: k1f2g3h4i5j6
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+revision = "l2g3h4i5j6k7"
+down_revision = "k1f2g3h4i5j6"
+branch_labels = None
+depends_on = None
+
+PERIOD_SQL = "tsrange(start_dt, GREATEST(start_dt, end_dt), '[]')"
+
+
+def upgrade() -> None:
+    for table in ("events", "event_occurrences"):
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN period tsrange "
+            f"GENERATED ALWAYS AS ({PERIOD_SQL}) STORED"
+        )
+    op.execute("CREATE INDEX ix_events_period ON events USING GIST (period)")
+    op.execute("CREATE INDEX ix_event_occurrences_period ON event_occurrences USING GIST (period)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_event_occurrences_period")
+    op.execute("DROP INDEX IF EXISTS ix_events_period")
+    op.drop_column("event_occurrences", "period")
+    op.drop_column("events", "period")
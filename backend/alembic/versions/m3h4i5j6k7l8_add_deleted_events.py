@@ -0,0 +1,34 @@
+"""add deleted_events tombstones and (calendar_id, update_dt) index
+
+Revision ID: m3h4i5j6k7l8
+Revises: l2g3h4i5j6k7
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "m3h4i5j6k7l8"
+down_revision = "l2g3h4i5j6k7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "deleted_events",
+        sa.Column("event_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("calendar_id", UUID(as_uuid=True), sa.ForeignKey("calendars.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_deleted_events_calendar_deleted", "deleted_events", ["calendar_id", "deleted_at"],
+    )
+    op.create_index("ix_events_calendar_update", "events", ["calendar_id", "update_dt"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_calendar_update", table_name="events")
+    op.drop_index("ix_deleted_events_calendar_deleted", table_name="deleted_events")
+    op.drop_table("deleted_events")
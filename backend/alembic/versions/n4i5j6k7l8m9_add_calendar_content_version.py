@@ -0,0 +1,25 @@
+"""add content_version to calendars
+
+Revision ID: n4i5j6k7l8m9
+Revises: m3h4i5j6k7l8
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "n4i5j6k7l8m9"
+down_revision = "m3h4i5j6k7l8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "calendars",
+        sa.Column("content_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("calendars", "content_version")
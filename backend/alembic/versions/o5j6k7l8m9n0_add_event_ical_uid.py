@@ -0,0 +1,24 @@
+"""add ical_uid to events with a hash index for import deduplication
+
+Revision ID: o5j6k7l8m9n0
+Revises: n4i5j6k7l8m9
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "o5j6k7l8m9n0"
+down_revision = "n4i5j6k7l8m9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("ical_uid", sa.String(255), nullable=True))
+    op.create_index("ix_events_ical_uid", "events", ["ical_uid"], postgresql_using="hash")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_ical_uid", table_name="events")
+    op.drop_column("events", "ical_uid")
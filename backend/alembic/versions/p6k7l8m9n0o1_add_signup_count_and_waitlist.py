@@ -0,0 +1,60 @@
+"""add events.signup_count, unique (event_id, email) on signups, and event_waitlist
+
+Revision ID: p6k7l8m9n0o1
+Revises: o5j6k7l8m9n0
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "p6k7l8m9n0o1"
+down_revision = "o5j6k7l8m9n0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "events", sa.Column("signup_count", sa.Integer(), nullable=False, server_default="0")
+    )
+    # Keep the oldest signup of each duplicated email so the constraint can be added
+    op.execute("""
+        DELETE FROM event_signups s
+        USING event_signups older
+        WHERE older.event_id = s.event_id AND older.email = s.email
+          AND (older.created_at, older.id) < (s.created_at, s.id)
+    """)
+    op.create_unique_constraint(
+        "uq_event_signups_event_email", "event_signups", ["event_id", "email"]
+    )
+    op.execute("""
+        UPDATE events e SET signup_count = c.n
+        FROM (SELECT event_id, count(*) AS n FROM event_signups GROUP BY event_id) c
+        WHERE c.event_id = e.id
+    """)
+
+    op.create_table(
+        "event_waitlist",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("event_id", UUID(as_uuid=True), sa.ForeignKey("events.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+        sa.UniqueConstraint("event_id", "email", name="uq_event_waitlist_event_email"),
+    )
+    op.create_index(
+        "ix_event_waitlist_event_created", "event_waitlist", ["event_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_waitlist_event_created", table_name="event_waitlist")
+    op.drop_table("event_waitlist")
+    op.drop_constraint("uq_event_signups_event_email", "event_signups", type_="unique")
+    op.drop_column("events", "signup_count")
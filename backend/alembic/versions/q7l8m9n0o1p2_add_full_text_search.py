@@ -0,0 +1,64 @@
+"""add generated full-text search_vector columns to events and comments
+
+Replaces the trigram indexes of i9d0e1f2g3h4, which only served ILIKE search.
+
+Revision ID: q7l8m9n0o1p2
+Revises: p6k7l8m9n0o1
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+revision = "q7l8m9n0o1p2"
+down_revision = "p6k7l8m9n0o1"
+branch_labels = None
+depends_on = None
+
+EVENT_SEARCH_SQL = """
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+     || setweight(to_tsvector('french', coalesce(title, '')), 'A')
+     || setweight(to_tsvector('simple', coalesce(location, '')), 'B')
+     || setweight(to_tsvector('french', coalesce(location, '')), 'B')
+     || setweight(to_tsvector('simple', coalesce(notes, '')), 'C')
+     || setweight(to_tsvector('french', coalesce(notes, '')), 'C')
+     || setweight(to_tsvector('french', coalesce(translations -> 'fr' ->> 'title', '')), 'A')
+     || setweight(to_tsvector('french', coalesce(translations -> 'fr' ->> 'notes', '')), 'C')
+     || setweight(to_tsvector('english', coalesce(translations -> 'en' ->> 'title', '')), 'A')
+     || setweight(to_tsvector('english', coalesce(translations -> 'en' ->> 'notes', '')), 'C')
+     || setweight(to_tsvector('dutch', coalesce(translations -> 'nl' ->> 'title', '')), 'A')
+     || setweight(to_tsvector('dutch', coalesce(translations -> 'nl' ->> 'notes', '')), 'C')
+     || setweight(to_tsvector('german', coalesce(translations -> 'de' ->> 'title', '')), 'A')
+     || setweight(to_tsvector('german', coalesce(translations -> 'de' ->> 'notes', '')), 'C')
+"""
+
+COMMENT_SEARCH_SQL = """
+    setweight(to_tsvector('simple', coalesce(content, '')), 'A')
+     || setweight(to_tsvector('french', coalesce(content, '')), 'A')
+     || setweight(to_tsvector('french', coalesce(translations -> 'fr' ->> 'content', '')), 'A')
+     || setweight(to_tsvector('english', coalesce(translations -> 'en' ->> 'content', '')), 'A')
+     || setweight(to_tsvector('dutch', coalesce(translations -> 'nl' ->> 'content', '')), 'A')
+     || setweight(to_tsvector('german', coalesce(translations -> 'de' ->> 'content', '')), 'A')
+"""
+
+
+def upgrade() -> None:
+    for table, sql in (("events", EVENT_SEARCH_SQL), ("event_comments", COMMENT_SEARCH_SQL)):
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({sql}) STORED"
+        )
+    op.execute("CREATE INDEX ix_events_search ON events USING GIN (search_vector)")
+    op.execute("CREATE INDEX ix_event_comments_search ON event_comments USING GIN (search_vector)")
+    op.execute("DROP INDEX IF EXISTS idx_events_notes_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_events_location_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_events_title_trgm")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_events_title_trgm ON events USING GIN (title gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_events_location_trgm ON events USING GIN (location gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_events_notes_trgm ON events USING GIN (notes gin_trgm_ops)")
+    op.execute("DROP INDEX IF EXISTS ix_event_comments_search")
+    op.execute("DROP INDEX IF EXISTS ix_events_search")
+    op.drop_column("event_comments", "search_vector")
+    op.drop_column("events", "search_vector")
@@ -0,0 +1,32 @@
+"""add translation_memory
+
+Revision ID: r8m9n0o1p2q3
+Revises: q7l8m9n0o1p2
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "r8m9n0o1p2q3"
+down_revision = "q7l8m9n0o1p2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "translation_memory",
+        sa.Column("text_hash", sa.String(64), primary_key=True),
+        sa.Column("source", sa.String(10), primary_key=True),
+        sa.Column("target", sa.String(10), primary_key=True),
+        sa.Column("translated", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("translation_memory")
@@ -0,0 +1,24 @@
+"""add events.language and event_comments.language
+
+Revision ID: s9n0o1p2q3r4
+Revises: r8m9n0o1p2q3
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "s9n0o1p2q3r4"
+down_revision = "r8m9n0o1p2q3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("language", sa.String(10), nullable=True))
+    op.add_column("event_comments", sa.Column("language", sa.String(10), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("event_comments", "language")
+    op.drop_column("events", "language")
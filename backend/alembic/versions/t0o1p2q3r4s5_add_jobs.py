@@ -0,0 +1,49 @@
+"""add jobs (durable background job queue)
+
+Revision ID: t0o1p2q3r4s5
+Revises: s9n0o1p2q3r4
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "t0o1p2q3r4s5"
+down_revision = "s9n0o1p2q3r4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("kind", sa.String(100), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("run_at", sa.DateTime(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="5"),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+    )
+    op.create_index(
+        "ix_jobs_pending", "jobs", [sa.text("priority DESC"), "run_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index(
+        "ix_jobs_running", "jobs", ["locked_at"],
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_running", table_name="jobs")
+    op.drop_index("ix_jobs_pending", table_name="jobs")
+    op.drop_table("jobs")
@@ -24,8 +24,29 @@ class Settings(BaseSettings):
     ADMIN_EMAIL: str = ""
     LIBRETRANSLATE_URL: str = "http://libretranslate:5000"
     TRANSLATION_BACKEND: str = "libretranslate"  # "libretranslate", "mymemory", or "lingva"
+    # Failover chain, e.g. "libretranslate,mymemory,lingva" (empty: TRANSLATION_BACKEND alone)
+    TRANSLATION_BACKENDS: str = ""
+    MYMEMORY_URL: str = "https://api.mymemory.translated.net"
+    LINGVA_URL: str = "https://lingva.ml"
+    # Budget of one translation, failovers included
+    TRANSLATION_TIMEOUT_SECONDS: float = 10
+    # Also ask the next backend when one has not answered after this long (0 disables)
+    TRANSLATION_HEDGE_AFTER_SECONDS: float = 0
+    # Queue jobs pre-translating new events and comments in the background
+    PRETRANSLATION_ENABLED: bool = True
+    # Run a job worker inside the API process (false when running `python -m app.worker` apart)
+    RUN_JOB_WORKER: bool = True
+    # Jobs run at the same time by one worker
+    JOB_CONCURRENCY: int = 4
+    # Rolling horizon (days ahead) for materialized event occurrences
+    OCCURRENCE_HORIZON_DAYS: int = 548
+    # Deleted-event tombstones are kept this long; older sync tokens get 410
+    SYNC_TOMBSTONE_DAYS: int = 30
+    # Resolved permissions are cached in-process this long (0 disables the cache)
+    PERMISSION_CACHE_TTL_SECONDS: float = 30
     UPLOAD_DIR: str = "/app/uploads"
     MAX_FILE_SIZE_MB: int = 10
+    ICS_IMPORT_MAX_MB: int = 50
 
     # Cookies
     COOKIE_DOMAIN: str = ""          # ".agenda-souterrain.com" in production
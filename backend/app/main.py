@@ -1,4 +1,5 @@
 import asyncio
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,19 +11,65 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, AsyncSessionLocal
 from app.rate_limit import limiter
-from app.routers import auth, calendars, sub_calendars, events, sharing, admin, tags, comments, uploads
-from app.services.email import log_email_status
+from app.routers import auth, calendars, sub_calendars, events, sharing, admin, tags, comments, uploads, feeds, search
+from app.services.email import log_email_status, outbox as email_outbox
+from app.services.occurrences import extend_occurrence_horizon
+from app.services.sync import purge_tombstones
+from app.services.translation import init_http_client, close_http_client
+from app.services.jobs import run_worker, purge_failed_jobs
 from app.middleware.csrf import CSRFMiddleware
 from app.middleware.security_headers import SecurityHeadersMiddleware
 
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL = 6 * 3600
+
+
+async def _extend_occurrences_once():
+    try:
+        async with AsyncSessionLocal() as session:
+            count = await extend_occurrence_horizon(session)
+            await session.commit()
+        if count:
+            logger.info("Extended occurrence horizon for %d recurring event(s)", count)
+    except Exception:
+        logger.exception("Occurrence horizon job failed")
+
+
+async def _purge_tombstones_once():
+    try:
+        async with AsyncSessionLocal() as session:
+            count = await purge_tombstones(session)
+            await session.commit()
+        if count:
+            logger.info("Purged %d deleted-event tombstone(s)", count)
+    except Exception:
+        logger.exception("Tombstone purge failed")
+
+
+async def _purge_failed_jobs_once():
+    try:
+        async with AsyncSessionLocal() as session:
+            count = await purge_failed_jobs(session)
+            await session.commit()
+        if count:
+            logger.info("Purged %d failed job(s)", count)
+    except Exception:
+        logger.exception("Failed job purge failed")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan: startup & shutdown logic."""
     # ── Startup ──
     log_email_status()
+    email_outbox.start()
+    init_http_client()
+    worker_task = None
+    if settings.RUN_JOB_WORKER:
+        worker_task = asyncio.create_task(run_worker(settings.JOB_CONCURRENCY))
     ping_task = None
     if settings.SELF_PING_URL:
         async def _ping_loop():
@@ -36,11 +83,29 @@ async def lifespan(app: FastAPI):
                 await asyncio.sleep(300)
         ping_task = asyncio.create_task(_ping_loop())
 
+    # Keep the occurrence horizon rolling; the first pass runs in the
+    # background so that a large database does not delay startup
+    async def _maintenance_loop():
+        await _extend_occurrences_once()
+        while True:
+            await asyncio.sleep(MAINTENANCE_INTERVAL)
+            await _extend_occurrences_once()
+            await _purge_tombstones_once()
+            await _purge_failed_jobs_once()
+    maintenance_task = asyncio.create_task(_maintenance_loop())
+
     yield
 
     # ── Shutdown ──
     if ping_task:
         ping_task.cancel()
+    maintenance_task.cancel()
+    if worker_task:
+        # Interrupted jobs are put back in the queue
+        worker_task.cancel()
+        await asyncio.gather(worker_task, return_exceptions=True)
+    await close_http_client()
+    await email_outbox.stop()
 
 
 app = FastAPI(title="Agenda Souterrain API", version="1.0.0", docs_url="/docs", lifespan=lifespan)
@@ -70,6 +135,8 @@ app.include_router(tags.router, prefix="/v1")
 app.include_router(admin.router, prefix="/v1")
 app.include_router(comments.router, prefix="/v1")
 app.include_router(uploads.router, prefix="/v1")
+app.include_router(feeds.router, prefix="/v1")
+app.include_router(search.router, prefix="/v1")
 
 
 @app.get("/")
@@ -1,8 +1,10 @@
 from app.models.user import User
 from app.models.calendar import Calendar
 from app.models.sub_calendar import SubCalendar
-from app.models.event import Event, EventSignup
+from app.models.event import Event, EventSignup, EventWaitlistEntry, EventOccurrence, DeletedEvent
 from app.models.access import CalendarAccess, AccessLink, Group, Permission
 from app.models.custom_field import CustomEventField
 from app.models.tag import Tag, event_tags
 from app.models.comment import EventComment, EventAttachment
+from app.models.translation import TranslationMemory
+from app.models.job import Job
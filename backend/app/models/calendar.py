@@ -23,6 +23,8 @@ class Calendar(Base):
     default_event_duration: Mapped[int] = mapped_column(Integer, default=60)
     show_weekends: Mapped[bool] = mapped_column(Boolean, default=True)
     enable_email_notifications: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true")
+    # Bumped on every event, tag or sub-calendar write; feeds the ETag of event reads
+    content_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
 
     owner: Mapped["User"] = relationship("User", back_populates="calendars", foreign_keys=[owner_id])
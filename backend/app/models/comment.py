@@ -1,13 +1,19 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, Text, DateTime, Integer, ForeignKey, JSON
+from sqlalchemy import String, Text, DateTime, Integer, ForeignKey, JSON, Index, Computed
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from app.database import Base
+from app.utils.search import search_vector_sql
+
+SEARCH_SQL = search_vector_sql({"content": "A"}, {"content": "A"})
 
 
 class EventComment(Base):
     __tablename__ = "event_comments"
+    __table_args__ = (
+        Index("ix_event_comments_search", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     event_id: Mapped[uuid.UUID] = mapped_column(
@@ -18,9 +24,14 @@ class EventComment(Base):
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
     translations: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=dict)
+    # Detected language of content (set when translated)
+    language: Mapped[str | None] = mapped_column(String(10), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
     )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(SEARCH_SQL, persisted=True), deferred=True
+    )
 
     event: Mapped["Event"] = relationship("Event", back_populates="comments")
     user: Mapped["User"] = relationship("User")
@@ -1,18 +1,42 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, Boolean, DateTime, Integer, Float, Text, ForeignKey, JSON
+from sqlalchemy import (
+    String, Boolean, DateTime, Integer, Float, Text, ForeignKey, JSON, Index, Computed, UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSRANGE, TSVECTOR, Range
 from app.database import Base
+from app.utils.search import search_vector_sql
+
+# Closed [start_dt, end_dt] range, matching the inclusive window filters. GREATEST
+# keeps rows with end_dt < start_dt insertable (they become a point at start_dt).
+PERIOD_SQL = "tsrange(start_dt, GREATEST(start_dt, end_dt), '[]')"
+
+SEARCH_SQL = search_vector_sql(
+    {"title": "A", "location": "B", "notes": "C"},
+    {"title": "A", "notes": "C"},
+)
 
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_calendar_start", "calendar_id", "start_dt"),
+        Index("ix_events_calendar_end", "calendar_id", "end_dt"),
+        Index("ix_events_period", "period", postgresql_using="gist"),
+        Index("ix_events_calendar_update", "calendar_id", "update_dt"),
+        Index("ix_events_ical_uid", "ical_uid", postgresql_using="hash"),
+        Index("ix_events_search", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     sub_calendar_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("sub_calendars.id"), nullable=False, index=True
     )
+    # Denormalized from sub_calendar.calendar_id so calendar-wide queries need no join
+    calendar_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("calendars.id"), nullable=False
+    )
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     start_dt: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     end_dt: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -24,9 +48,15 @@ class Event(Base):
     who: Mapped[str] = mapped_column(String(255), nullable=True)
     signup_enabled: Mapped[bool] = mapped_column(Boolean, default=False)
     signup_max: Mapped[int] = mapped_column(Integer, nullable=True)
+    # Number of event_signups rows, kept in step by app.services.signups
+    signup_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     rrule: Mapped[str] = mapped_column(String(500), nullable=True)
     recurrence_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=True)
+    # UID of the VEVENT this event was imported from (re-imports skip it)
+    ical_uid: Mapped[str | None] = mapped_column(String(255), nullable=True)
     translations: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=dict)
+    # Language of title and notes as detected by app.utils.language (set when translated)
+    language: Mapped[str | None] = mapped_column(String(10), nullable=True)
     custom_fields: Mapped[dict] = mapped_column(JSON, default=dict)
     creator_token: Mapped[str] = mapped_column(String(100), nullable=True)
     creator_user_id: Mapped[uuid.UUID] = mapped_column(
@@ -34,6 +64,16 @@ class Event(Base):
     )
     creation_dt: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     update_dt: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None), onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    # Recurring events: event_occurrences rows exist up to this date
+    occurrences_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Generated from start_dt/end_dt; query with && (GiST indexed)
+    period: Mapped[Range[datetime]] = mapped_column(
+        TSRANGE, Computed(PERIOD_SQL, persisted=True), deferred=True
+    )
+    # Generated from the text columns and cached translations (see app.utils.search)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(SEARCH_SQL, persisted=True), deferred=True
+    )
 
     sub_calendar: Mapped["SubCalendar"] = relationship("SubCalendar", back_populates="events")
     signups: Mapped[list["EventSignup"]] = relationship(
@@ -51,8 +91,58 @@ class Event(Base):
     )
 
 
+class EventOccurrence(Base):
+    """One row per occurrence of an event, materialized up to a rolling horizon.
+
+    Non-recurring events have exactly one row; recurring events have one row
+    per occurrence up to Event.occurrences_until.
+    """
+    __tablename__ = "event_occurrences"
+    __table_args__ = (
+        Index("ix_event_occurrences_window", "calendar_id", "start_dt", "end_dt"),
+        Index("ix_event_occurrences_period", "period", postgresql_using="gist"),
+    )
+
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), primary_key=True
+    )
+    start_dt: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    end_dt: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    sub_calendar_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("sub_calendars.id", ondelete="CASCADE"), nullable=False
+    )
+    calendar_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("calendars.id", ondelete="CASCADE"), nullable=False
+    )
+    period: Mapped[Range[datetime]] = mapped_column(
+        TSRANGE, Computed(PERIOD_SQL, persisted=True), deferred=True
+    )
+
+
+class DeletedEvent(Base):
+    """Tombstone left by a deleted event so that delta sync clients can drop it.
+
+    Purged after settings.SYNC_TOMBSTONE_DAYS; older sync tokens are rejected.
+    """
+    __tablename__ = "deleted_events"
+    __table_args__ = (
+        Index("ix_deleted_events_calendar_deleted", "calendar_id", "deleted_at"),
+    )
+
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    calendar_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("calendars.id", ondelete="CASCADE"), nullable=False
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+
+
 class EventSignup(Base):
     __tablename__ = "event_signups"
+    __table_args__ = (
+        UniqueConstraint("event_id", "email", name="uq_event_signups_event_email"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("events.id"), nullable=False)
@@ -62,3 +152,22 @@ class EventSignup(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
 
     event: Mapped["Event"] = relationship("Event", back_populates="signups")
+
+
+class EventWaitlistEntry(Base):
+    """Someone who signed up for a full event; promoted to a signup, oldest
+    first, when a seat frees up."""
+    __tablename__ = "event_waitlist"
+    __table_args__ = (
+        UniqueConstraint("event_id", "email", name="uq_event_waitlist_event_email"),
+        Index("ix_event_waitlist_event_created", "event_id", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False
+    )
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    email: Mapped[str] = mapped_column(String(255), nullable=False)
+    note: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
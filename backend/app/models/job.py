@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, Text, DateTime, Integer, JSON, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Job(Base):
+    """Background work queued in the database (see app.services.jobs)."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # What workers poll: due jobs, most urgent first (claim_statement order)
+        Index(
+            "ix_jobs_pending", text("priority DESC"), "run_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # Jobs of crashed workers, reclaimed once their lease has expired
+        Index("ix_jobs_running", "locked_at", postgresql_where=text("status = 'running'")),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Name of the registered handler
+    kind: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Keyword arguments of the handler
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    # Higher runs first
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # "pending", "running" or "failed" (done jobs are deleted)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", server_default="pending")
+    # Not run before this date (scheduled jobs, retry backoff)
+    run_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=_utcnow)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5, server_default="5")
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from sqlalchemy import String, Text, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class TranslationMemory(Base):
+    """Every text ever translated, so that the same string is sent to the
+    translation backend only once (see app.services.translation)."""
+    __tablename__ = "translation_memory"
+
+    # sha256 of the source text, hex
+    text_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    source: Mapped[str] = mapped_column(String(10), primary_key=True)
+    target: Mapped[str] = mapped_column(String(10), primary_key=True)
+    translated: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
@@ -11,6 +11,10 @@ from app.models.comment import EventComment, EventAttachment
 from app.schemas.user import UserOut, BanUserRequest, make_user_out
 from app.schemas.calendar import CalendarAdminOut
 from app.routers.deps import get_superadmin_user
+from app.utils.permissions import invalidate_permissions, permission_cache
+from app.services.email import outbox as email_outbox
+from app.services.translation import backend_stats
+from app.services.jobs import job_stats
 from app.config import settings
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -103,6 +107,7 @@ async def delete_user(
     await db.execute(delete(PendingInvitation).where(PendingInvitation.invited_by == user_id))
 
     await db.delete(user)
+    invalidate_permissions(db)
 
 
 @router.put("/users/{user_id}/ban", response_model=UserOut)
@@ -184,3 +189,19 @@ async def delete_calendar_admin(
     if not cal:
         raise HTTPException(status_code=404, detail="Calendrier introuvable")
     await db.delete(cal)
+    invalidate_permissions(db, cal_id)
+
+
+@router.get("/metrics")
+async def get_metrics(
+    _: User = Depends(get_superadmin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """In-process cache counters, translation backend health and email delivery for this worker,
+    and the job queue (superadmin only)."""
+    return {
+        "permission_cache": permission_cache.stats(),
+        "translation_backends": backend_stats(),
+        "email": email_outbox.stats(),
+        "jobs": await job_stats(db),
+    }
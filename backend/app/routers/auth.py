@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timezone
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
@@ -14,14 +14,15 @@ from app.schemas.user import (
 from app.utils.security import (
     verify_password, get_password_hash,
     create_access_token, create_refresh_token,
-    create_verification_token, create_password_reset_token,
     generate_csrf_token, decode_token,
 )
 from app.utils.cookies import set_auth_cookies, clear_auth_cookies
+from app.utils.permissions import invalidate_permissions
 from app.routers.deps import get_current_user, check_ban_status
 from app.config import settings
 from app.rate_limit import limiter
-from app.services.email import send_verification_email, send_password_reset_email
+from app.services.email import verification_email, password_reset_email
+from app.services.jobs import enqueue
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,6 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 async def register(
     request: Request,
     data: UserCreate,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(User).where(User.email == data.email))
@@ -75,12 +75,12 @@ async def register(
                     group_members.insert().values(group_id=inv.group_id, user_id=user.id)
                 )
         await db.delete(inv)
+        invalidate_permissions(db, inv.calendar_id)
     if pending_invitations:
         logger.info("Applied %d pending invitation(s) for %s", len(pending_invitations), data.email)
 
     # Send verification email
-    token = create_verification_token(str(user.id))
-    background_tasks.add_task(send_verification_email, email=user.email, name=user.name, token=token)
+    enqueue(db, verification_email, user_id=str(user.id))
 
     return make_user_out(user)
 
@@ -114,19 +114,13 @@ async def verify_email(
 @limiter.limit("3/minute")
 async def resend_verification(
     request: Request,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     if current_user.is_verified:
         raise HTTPException(status_code=400, detail="Email déjà vérifié")
 
-    token = create_verification_token(str(current_user.id))
-    background_tasks.add_task(
-        send_verification_email,
-        email=current_user.email,
-        name=current_user.name,
-        token=token,
-    )
+    enqueue(db, verification_email, user_id=str(current_user.id))
     return {"message": "Email de vérification renvoyé"}
 
 
@@ -204,7 +198,6 @@ async def logout():
 async def forgot_password(
     request: Request,
     data: ForgotPasswordRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Send a password reset email. Always returns 200 to not reveal if the email exists."""
@@ -212,8 +205,7 @@ async def forgot_password(
     user = result.scalar_one_or_none()
 
     if user:
-        token = create_password_reset_token(str(user.id))
-        background_tasks.add_task(send_password_reset_email, email=user.email, token=token)
+        enqueue(db, password_reset_email, user_id=str(user.id))
 
     return {"message": "Si cette adresse est enregistrée, un email a été envoyé."}
 
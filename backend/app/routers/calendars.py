@@ -9,6 +9,9 @@ from app.models.sub_calendar import SubCalendar
 from app.models.access import CalendarAccess, Permission, group_members
 from app.schemas.calendar import CalendarCreate, CalendarUpdate, CalendarOut, slugify
 from app.routers.deps import get_current_user, get_superadmin_user
+from app.services.occurrences import resync_calendar_occurrences
+from app.services.sync import bump_content_version
+from app.utils.permissions import invalidate_permissions
 
 router = APIRouter(prefix="/calendars", tags=["calendars"])
 
@@ -118,9 +121,15 @@ async def update_calendar(
         raise HTTPException(status_code=404, detail="Introuvable")
     if calendar.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Accès interdit")
+    old_timezone = calendar.timezone
     for field, value in data.model_dump(exclude_none=True).items():
         setattr(calendar, field, value)
+    if calendar.timezone != old_timezone:
+        # Recurring series are expanded on the calendar's wall clock
+        await resync_calendar_occurrences(db, cal_id, calendar.timezone)
+        await bump_content_version(db, cal_id)
     await db.flush()
+    invalidate_permissions(db, cal_id)
     await db.refresh(calendar)
     return calendar
 
@@ -138,3 +147,4 @@ async def delete_calendar(
     if calendar.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Accès interdit")
     await db.delete(calendar)
+    invalidate_permissions(db, cal_id)
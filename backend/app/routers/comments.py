@@ -1,22 +1,22 @@
 import uuid
 import os
-from typing import Optional, List
+from typing import Optional, List, Dict
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import selectinload
 from app.database import get_db
 from app.models.event import Event
 from app.models.comment import EventComment, EventAttachment
 from app.models.user import User
 from app.schemas.comment import CommentCreate, CommentOut, AttachmentOut
-from app.routers.deps import get_optional_user, get_current_user, get_link_token
-from app.utils.permissions import (
-    get_effective_permission, can_read, can_add, can_modify, Permission
-)
-from app.services.translation import translate_text, SUPPORTED_LANGS
+from app.routers.deps import get_optional_user, get_current_user, get_link_token, require_permission
+from app.utils.permissions import get_effective_permission, can_read, can_add, can_modify
+from app.services.translation import translate_text, translate_texts, source_language, SUPPORTED_LANGS
+from app.services import pretranslation
 from app.config import settings
-from app.services.storage import storage
+from app.services.jobs import enqueue
+from app.services.storage import storage, delete_stored_files
 
 router = APIRouter(
     prefix="/calendars/{cal_id}/events/{event_id}",
@@ -62,14 +62,19 @@ def _detect_mime(content: bytes) -> str | None:
     return None
 
 
-async def _get_event(event_id: uuid.UUID, db: AsyncSession) -> Event:
-    result = await db.execute(select(Event).where(Event.id == event_id))
+async def _get_event(cal_id: uuid.UUID, event_id: uuid.UUID, db: AsyncSession) -> Event:
+    result = await db.execute(select(Event).where(Event.id == event_id, Event.calendar_id == cal_id))
     event = result.scalar_one_or_none()
     if not event:
         raise HTTPException(status_code=404, detail="Evenement introuvable")
     return event
 
 
+def _in_event(model, cal_id: uuid.UUID, event_id: uuid.UUID) -> tuple:
+    """Criteria keeping rows of model (joined to Event) to the event and calendar in the URL."""
+    return model.event_id == event_id, Event.calendar_id == cal_id
+
+
 # ─── COMMENTS ──────────────────────────────────────────────────────────────
 
 
@@ -81,11 +86,9 @@ async def list_comments(
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Acces refuse")
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
 
-    await _get_event(event_id, db)
+    await _get_event(cal_id, event_id, db)
     result = await db.execute(
         select(EventComment)
         .options(selectinload(EventComment.user))
@@ -97,7 +100,7 @@ async def list_comments(
         CommentOut(
             id=c.id, event_id=c.event_id, user_id=c.user_id,
             user_name=c.user.name, content=c.content,
-            translations=c.translations, created_at=c.created_at,
+            translations=c.translations, language=c.language, created_at=c.created_at,
         )
         for c in comments
     ]
@@ -112,11 +115,9 @@ async def create_comment(
     user: User = Depends(get_current_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Acces refuse")
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
 
-    await _get_event(event_id, db)
+    await _get_event(cal_id, event_id, db)
     comment = EventComment(
         event_id=event_id,
         user_id=user.id,
@@ -125,11 +126,12 @@ async def create_comment(
     db.add(comment)
     await db.flush()
     await db.refresh(comment)
+    pretranslation.schedule(db, "comment", [comment.id])
 
     return CommentOut(
         id=comment.id, event_id=comment.event_id, user_id=comment.user_id,
         user_name=user.name, content=comment.content,
-        translations=comment.translations, created_at=comment.created_at,
+        translations=comment.translations, language=comment.language, created_at=comment.created_at,
     )
 
 
@@ -142,8 +144,12 @@ async def delete_comment(
     user: User = Depends(get_current_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
+    # Authors may delete their own comments even without read access any more
     perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    result = await db.execute(select(EventComment).where(EventComment.id == comment_id))
+    result = await db.execute(
+        select(EventComment).join(Event, Event.id == EventComment.event_id)
+        .where(EventComment.id == comment_id, *_in_event(EventComment, cal_id, event_id))
+    )
     comment = result.scalar_one_or_none()
     if not comment:
         raise HTTPException(status_code=404, detail="Commentaire introuvable")
@@ -155,6 +161,63 @@ async def delete_comment(
     await db.delete(comment)
 
 
+@router.post("/comments/translate", response_model=Dict[uuid.UUID, Dict[str, str]])
+async def translate_comments(
+    cal_id: uuid.UUID,
+    event_id: uuid.UUID,
+    target_lang: str = Query(...),
+    source_lang: str = Query("fr"),
+    db: AsyncSession = Depends(get_db),
+    user: Optional[User] = Depends(get_optional_user),
+    link_token: Optional[str] = Depends(get_link_token),
+):
+    """Translate a whole thread: comment id -> translation, for every comment of the event."""
+    if target_lang not in SUPPORTED_LANGS or source_lang not in SUPPORTED_LANGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Supported languages: {', '.join(sorted(SUPPORTED_LANGS))}"
+        )
+
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
+
+    await _get_event(cal_id, event_id, db)
+    result = await db.execute(
+        select(EventComment.id, EventComment.content, EventComment.translations)
+        .where(EventComment.event_id == event_id)
+    )
+    comments = result.all()
+    missing = [c for c in comments if target_lang not in (c.translations or {})]
+
+    try:
+        translated = await translate_texts([c.content for c in missing], source_lang, target_lang)
+    except Exception:
+        raise HTTPException(status_code=502, detail="Translation service unavailable")
+
+    translations = {c.id: (c.translations or {}).get(target_lang) for c in comments}
+    translations.update({c.id: {"content": content} for c, content in zip(missing, translated)})
+
+    # Cache results: merged into the rows as they are now (a pre-translation
+    # job may have written them meanwhile), one UPDATE statement for all rows;
+    # comments deleted meanwhile are not locked, so not written
+    if missing:
+        result = await db.execute(
+            select(EventComment.id, EventComment.content, EventComment.translations)
+            .where(EventComment.id.in_([c.id for c in missing]))
+            .with_for_update()
+        )
+        current = result.all()
+        if current:
+            await db.execute(update(EventComment), [
+                {
+                    "id": c.id,
+                    "translations": {target_lang: translations[c.id], **(c.translations or {})},
+                    "language": source_language(c.content, source_lang),
+                }
+                for c in current
+            ])
+    return translations
+
+
 @router.post("/comments/{comment_id}/translate")
 async def translate_comment(
     cal_id: uuid.UUID,
@@ -172,11 +235,12 @@ async def translate_comment(
             detail=f"Supported languages: {', '.join(sorted(SUPPORTED_LANGS))}"
         )
 
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Acces refuse")
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
 
-    result = await db.execute(select(EventComment).where(EventComment.id == comment_id))
+    result = await db.execute(
+        select(EventComment).join(Event, Event.id == EventComment.event_id)
+        .where(EventComment.id == comment_id, *_in_event(EventComment, cal_id, event_id))
+    )
     comment = result.scalar_one_or_none()
     if not comment:
         raise HTTPException(status_code=404, detail="Commentaire introuvable")
@@ -186,9 +250,12 @@ async def translate_comment(
     if target_lang in cached:
         return cached[target_lang]
 
+    # source_lang is the client's guess: trust the text
+    comment.language = source_language(comment.content, source_lang)
+
     # Translate
     try:
-        translated_content = await translate_text(comment.content, source_lang, target_lang)
+        translated_content = await translate_text(comment.content, comment.language, target_lang)
     except Exception:
         raise HTTPException(status_code=502, detail="Translation service unavailable")
 
@@ -212,11 +279,9 @@ async def list_attachments(
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Acces refuse")
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
 
-    await _get_event(event_id, db)
+    await _get_event(cal_id, event_id, db)
     result = await db.execute(
         select(EventAttachment)
         .options(selectinload(EventAttachment.user))
@@ -245,11 +310,9 @@ async def upload_attachment(
     user: User = Depends(get_current_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_add(perm):
-        raise HTTPException(status_code=403, detail="Acces refuse")
+    await require_permission(db, cal_id, can_add, user=user, link_token=link_token)
 
-    await _get_event(event_id, db)
+    await _get_event(cal_id, event_id, db)
 
     # Read file content and check size
     content = await file.read()
@@ -310,7 +373,10 @@ async def delete_attachment(
     link_token: Optional[str] = Depends(get_link_token),
 ):
     perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    result = await db.execute(select(EventAttachment).where(EventAttachment.id == attachment_id))
+    result = await db.execute(
+        select(EventAttachment).join(Event, Event.id == EventAttachment.event_id)
+        .where(EventAttachment.id == attachment_id, *_in_event(EventAttachment, cal_id, event_id))
+    )
     attachment = result.scalar_one_or_none()
     if not attachment:
         raise HTTPException(status_code=404, detail="Fichier introuvable")
@@ -319,7 +385,7 @@ async def delete_attachment(
     if not can_modify(perm) and not is_own:
         raise HTTPException(status_code=403, detail="Acces refuse")
 
-    # Delete file via storage backend
-    await storage.delete(attachment.stored_filename)
+    # Delete file via storage backend, once the row deletion is committed
+    enqueue(db, delete_stored_files, filenames=[attachment.stored_filename])
 
     await db.delete(attachment)
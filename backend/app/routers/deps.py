@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Optional
 from fastapi import Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -126,3 +126,26 @@ async def require_calendar_admin(
     if not is_admin(perm):
         raise HTTPException(status_code=403, detail="Accès administrateur requis")
     return cal
+
+
+async def require_permission(
+    db: AsyncSession,
+    cal_id,
+    check: Callable,
+    *,
+    user: Optional[User] = None,
+    link_token: Optional[str] = None,
+    sub_calendar_id=None,
+):
+    """
+    Resolve the caller's permission (one query, or none when cached).
+    404 if the calendar does not exist, 403 if check(permission) is false.
+    """
+    from app.utils.permissions import resolve_access
+
+    access = await resolve_access(db, cal_id, user, link_token, sub_calendar_id)
+    if not access.calendar_exists:
+        raise HTTPException(status_code=404, detail="Calendrier introuvable")
+    if not check(access.permission):
+        raise HTTPException(status_code=403, detail="Accès refusé")
+    return access.permission
@@ -1,33 +1,62 @@
+import asyncio
 import uuid
 import os
 import secrets
 from datetime import datetime, timezone
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import Response
+from typing import AsyncIterator, Optional, List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, delete as sa_delete
-from sqlalchemy.orm import selectinload
-from app.database import get_db
-from app.models.event import Event, EventSignup
+from sqlalchemy import select, insert, func, and_, or_, delete as sa_delete
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.dialects.postgresql import TSRANGE, insert as pg_insert
+from app.database import get_db, AsyncSessionLocal
+from app.models.event import Event, EventSignup, EventOccurrence, DeletedEvent
 from app.models.comment import EventAttachment
 from app.models.sub_calendar import SubCalendar
 from app.models.calendar import Calendar
 from app.models.user import User
 from app.models.tag import Tag, event_tags
-from app.schemas.event import EventCreate, EventUpdate, EventOut, SignupCreate, SignupOut
-from app.routers.deps import get_optional_user, get_link_token
-from app.utils.ical import event_to_ical, events_to_ical
+from app.schemas.event import (
+    EventCreate, EventUpdate, EventOut, EventPage, EventChanges, EventImportResult,
+    EventBatch, EventBatchResult, SignupCreate, SignupOut,
+)
+from app.routers.deps import get_optional_user, get_link_token, require_permission
+from app.utils.ical import CALENDAR_HEADER, CALENDAR_FOOTER, event_to_ical, vevent_to_ical, format_dtstamp
+from app.utils.recurrence import expand_occurrences, overlaps
+from app.utils.http_cache import make_etag, query_key, not_modified, set_etag
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor, after_cursor,
+    decode_rank_cursor,
+)
+from app.utils.search import tsquery_text
 from app.utils.permissions import (
     get_effective_permission, can_read_limited, can_read, can_add,
     can_modify, can_modify_own, Permission
 )
-from app.services.translation import translate_text, SUPPORTED_LANGS
+from app.services.translation import translate_text, source_language, SUPPORTED_LANGS
+from app.services import pretranslation
 from app.config import settings
-from app.services.storage import storage
+from app.services.jobs import enqueue
+from app.services.storage import delete_stored_files
+from app.services.occurrences import (
+    sync_event_occurrences, materialize_new_events, safe_horizon, horizon_end, occurrences_cover,
+)
+from app.services.ics_import import IcsImporter
+from app.services.search import event_search, search_page
+from app.services.signups import take_seat, release_seat, insert_signup, join_waitlist, promote_waitlist
+from app.services.event_batch import EventBatchRunner, OCCURRENCE_FIELDS
+from app.services.sync import new_sync_token, tombstone_cutoff, record_tombstones, bump_content_version
 
 router = APIRouter(prefix="/calendars/{cal_id}/events", tags=["events"])
 
+# Rows fetched per round trip when streaming an iCalendar export
+EXPORT_BATCH_SIZE = 500
+
+# Bytes read from an uploaded .ics file at a time
+IMPORT_READ_SIZE = 64 * 1024
+
 
 async def _get_cal(cal_id: uuid.UUID, db: AsyncSession) -> Calendar:
     result = await db.execute(select(Calendar).where(Calendar.id == cal_id))
@@ -37,150 +66,441 @@ async def _get_cal(cal_id: uuid.UUID, db: AsyncSession) -> Calendar:
     return cal
 
 
-@router.get("", response_model=List[EventOut])
+def _content_etag(request: Request, cal: Calendar, perm: Permission) -> str:
+    """ETag of an event read: changes with the calendar content, the caller's
+    permission (masking) and the request path and query."""
+    return make_etag(cal.content_version, perm.name, request.url.path, query_key(request))
+
+
+def _naive(dt: Optional[datetime]) -> Optional[datetime]:
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt and dt.tzinfo else dt
+
+
+def _mask_details(event: EventOut) -> EventOut:
+    """Hide everything but the time slot (read_only_no_details)."""
+    return event.model_copy(update={
+        "title": "Occupé",
+        "location": None,
+        "notes": None,
+        "who": None,
+        "rrule": None,
+        "custom_fields": {},
+    })
+
+
+def _expand_events(
+    events: list[Event], window_start: datetime, window_end: datetime, tz_name: str,
+) -> list[EventOut]:
+    """Replace recurring masters by their occurrences inside [window_start, window_end)."""
+    out: list[EventOut] = []
+    for e in events:
+        if not e.rrule:
+            if overlaps(e.start_dt, e.end_dt, window_start, window_end):
+                out.append(EventOut.model_validate(e))
+            continue
+        base = EventOut.model_validate(e)
+        try:
+            occurrences = expand_occurrences(
+                e.rrule, e.start_dt, e.end_dt, window_start, window_end,
+                tz_name=tz_name, all_day=e.all_day,
+            )
+        except ValueError:
+            # Unparseable rule: skip the series rather than failing the whole view
+            continue
+        for occ_start, occ_end in occurrences:
+            out.append(base.model_copy(update={
+                "start_dt": occ_start, "end_dt": occ_end, "is_occurrence": True,
+            }))
+    out.sort(key=lambda ev: (ev.start_dt, ev.id))
+    return out
+
+
+def _period_overlaps(period, window_start: Optional[datetime], window_end: Optional[datetime]):
+    """`period && [window_start, window_end]`, served by the GiST index on period.
+
+    A missing bound leaves that side of the window open.
+    """
+    return period.overlaps(func.tsrange(window_start, window_end, "[]", type_=TSRANGE))
+
+
+async def _list_from_occurrences(
+    db: AsyncSession,
+    occ_filters: list,
+    window_start: Optional[datetime],
+    window_end: datetime,
+    expand: bool,
+    cursor: Optional[tuple[datetime, uuid.UUID]],
+    limit: int,
+) -> EventPage:
+    """Answer a window query with a range scan on event_occurrences.
+
+    Only series with an occurrence in the window are returned, so finished
+    recurring events no longer show up on every later view.
+    """
+    occ_filters = [*occ_filters, _period_overlaps(EventOccurrence.period, window_start, window_end)]
+
+    if not expand:
+        stmt = (
+            select(Event).options(selectinload(Event.tags))
+            .where(Event.id.in_(select(EventOccurrence.event_id).where(*occ_filters)))
+        )
+        if cursor:
+            stmt = stmt.where(after_cursor(Event.start_dt, Event.id, cursor))
+        result = await db.execute(stmt.order_by(Event.start_dt, Event.id).limit(limit + 1))
+        return _page([EventOut.model_validate(e) for e in result.scalars().all()], limit)
+
+    # Same half-open rule as utils.recurrence.overlaps
+    occ_filters += [
+        EventOccurrence.start_dt < window_end,
+        or_(EventOccurrence.end_dt > window_start, EventOccurrence.start_dt >= window_start),
+    ]
+    stmt = (
+        select(EventOccurrence.start_dt, EventOccurrence.end_dt, Event)
+        .join(Event, Event.id == EventOccurrence.event_id)
+        .options(selectinload(Event.tags))
+        .where(*occ_filters)
+    )
+    if cursor:
+        stmt = stmt.where(after_cursor(EventOccurrence.start_dt, EventOccurrence.event_id, cursor))
+    result = await db.execute(
+        stmt.order_by(EventOccurrence.start_dt, EventOccurrence.event_id).limit(limit + 1)
+    )
+    masters: dict[uuid.UUID, EventOut] = {}
+    out: list[EventOut] = []
+    for occ_start, occ_end, e in result.all():
+        if e.id not in masters:
+            masters[e.id] = EventOut.model_validate(e)
+        out.append(masters[e.id].model_copy(update={
+            "start_dt": occ_start, "end_dt": occ_end, "is_occurrence": e.rrule is not None,
+        }))
+    return _page(out, limit)
+
+
+def _page(rows: list[EventOut], limit: int) -> EventPage:
+    """Build a page from up to limit + 1 rows sorted by (start_dt, id)."""
+    if len(rows) <= limit:
+        return EventPage(items=rows)
+    rows = rows[:limit]
+    return EventPage(items=rows, next_cursor=encode_cursor(rows[-1].start_dt, rows[-1].id))
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[tuple[datetime, uuid.UUID]]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+
+@router.get("", response_model=EventPage)
 async def list_events(
     cal_id: uuid.UUID,
+    request: Request,
+    response: Response,
     start_dt: Optional[datetime] = Query(None),
     end_dt: Optional[datetime] = Query(None),
     subcalendar_ids: Optional[List[uuid.UUID]] = Query(None),
+    expand: bool = Query(False),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read_limited(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
-
-    await _get_cal(cal_id, db)
-    sc_result = await db.execute(select(SubCalendar.id).where(SubCalendar.calendar_id == cal_id))
-    sc_ids = [row[0] for row in sc_result.all()]
-
-    def naive(dt: datetime) -> datetime:
-        return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt and dt.tzinfo else dt
-
-    base_filters = [Event.sub_calendar_id.in_(sc_ids)]
-    if subcalendar_ids:
-        base_filters.append(Event.sub_calendar_id.in_(subcalendar_ids))
-
-    date_filters = []
-    if start_dt:
-        date_filters.append(Event.end_dt >= naive(start_dt))
-    if end_dt:
-        date_filters.append(Event.start_dt <= naive(end_dt))
-
-    if date_filters:
-        normal_match = and_(*base_filters, *date_filters)
-        # Recurring events whose start_dt <= end of window are always included
-        recur_filter = and_(*base_filters, Event.rrule.isnot(None))
-        if end_dt:
-            recur_filter = and_(recur_filter, Event.start_dt <= naive(end_dt))
-        final_filter = or_(normal_match, recur_filter)
+    """List events in a window, one page at a time in (start_dt, id) order.
+
+    By default recurring events are returned once, as their series master.
+    With expand=true (requires start_dt and end_dt) each series is expanded in
+    the calendar's timezone and only the occurrences inside [start_dt, end_dt)
+    are returned, flagged with is_occurrence.
+    """
+    perm = await require_permission(db, cal_id, can_read_limited, user=user, link_token=link_token)
+    if expand and not (start_dt and end_dt):
+        raise HTTPException(status_code=400, detail="expand nécessite start_dt et end_dt")
+    window_start, window_end = _naive(start_dt), _naive(end_dt)
+    if window_start and window_end and window_start > window_end:
+        # tsrange() would fail on a reversed window
+        raise HTTPException(status_code=400, detail="start_dt doit précéder end_dt")
+    after = _parse_cursor(cursor)
+
+    cal = await _get_cal(cal_id, db)
+    etag = _content_etag(request, cal, perm)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+
+    if (
+        window_end and window_end <= safe_horizon()
+        # Series the background job has not expanded yet are only in the masters
+        and await occurrences_cover(db, cal_id, window_end)
+    ):
+        occ_filters = [EventOccurrence.calendar_id == cal_id]
+        if subcalendar_ids:
+            occ_filters.append(EventOccurrence.sub_calendar_id.in_(subcalendar_ids))
+        page = await _list_from_occurrences(db, occ_filters, window_start, window_end, expand, after, limit)
     else:
-        final_filter = and_(*base_filters)
-
-    result = await db.execute(
-        select(Event).options(selectinload(Event.tags)).where(final_filter).order_by(Event.start_dt)
-    )
-    events = result.scalars().all()
+        # Window beyond the materialized horizon, or series not materialized
+        # yet: filter masters and expand in Python
+        base_filters = [Event.calendar_id == cal_id]
+        if subcalendar_ids:
+            base_filters.append(Event.sub_calendar_id.in_(subcalendar_ids))
+
+        if start_dt or end_dt:
+            normal_match = and_(*base_filters, _period_overlaps(Event.period, window_start, window_end))
+            # Recurring events whose start_dt <= end of window are always included
+            recur_filter = and_(*base_filters, Event.rrule.isnot(None))
+            if end_dt:
+                recur_filter = and_(recur_filter, Event.start_dt <= window_end)
+            final_filter = or_(normal_match, recur_filter)
+        else:
+            final_filter = and_(*base_filters)
+
+        stmt = select(Event).options(selectinload(Event.tags)).where(final_filter)
+        if expand:
+            # Occurrence start dates are only known after expansion: page in memory
+            result = await db.execute(stmt)
+            out = _expand_events(result.scalars().all(), window_start, window_end, cal.timezone)
+            if after:
+                out = [e for e in out if (e.start_dt, e.id) > after]
+            page = _page(out[:limit + 1], limit)
+        else:
+            if after:
+                stmt = stmt.where(after_cursor(Event.start_dt, Event.id, after))
+            result = await db.execute(stmt.order_by(Event.start_dt, Event.id).limit(limit + 1))
+            page = _page([EventOut.model_validate(e) for e in result.scalars().all()], limit)
 
     # Mask details for read_only_no_details
     if perm == Permission.READ_ONLY_NO_DETAILS:
-        masked = []
-        for e in events:
-            e.title = "Occupé"
-            e.location = None
-            e.notes = None
-            e.who = None
-            e.rrule = None
-            e.custom_fields = {}
-            masked.append(e)
-        return masked
-
-    return events
-
+        page.items = [_mask_details(e) for e in page.items]
 
-def _escape_like(term: str) -> str:
-    """Escape special LIKE/ILIKE characters."""
-    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return page
 
 
-@router.get("/search", response_model=List[EventOut])
+@router.get("/search", response_model=EventPage)
 async def search_events(
     cal_id: uuid.UUID,
     q: str = Query(...),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
+    """Full-text search, best matches first; the last word matches as a prefix.
+
+    Events are also found through the text of their comments.
+    """
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_rank_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Curseur invalide")
+
+    text = tsquery_text(q)
+    if text is None:
+        return EventPage(items=[])
+    stmt = event_search(text, after).where(Event.calendar_id == cal_id)
+    result = await db.execute(stmt.limit(limit + 1))
+    items, next_cursor = search_page(result.all(), limit)
+    return EventPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/changes", response_model=EventChanges)
+async def list_changes(
+    cal_id: uuid.UUID,
+    since: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    user: Optional[User] = Depends(get_optional_user),
+    link_token: Optional[str] = Depends(get_link_token),
+):
+    """Delta sync: events changed and events deleted since a sync token.
 
-    await _get_cal(cal_id, db)
-    sc_result = await db.execute(select(SubCalendar.id).where(SubCalendar.calendar_id == cal_id))
-    sc_ids = [row[0] for row in sc_result.all()]
+    Without `since`, only returns a starting token: fetch it before the
+    initial full load. Apply `events` as upserts and `deleted` as removals,
+    then poll again with `sync_token` (immediately while has_more is true).
+    A token older than the tombstone retention gets 410: reload everything.
+    """
+    perm = await require_permission(db, cal_id, can_read_limited, user=user, link_token=link_token)
+
+    if since is None:
+        return EventChanges(sync_token=new_sync_token())
+    try:
+        after = decode_cursor(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Jeton de synchronisation invalide")
+    if after[0] < tombstone_cutoff():
+        raise HTTPException(status_code=410, detail="Jeton de synchronisation expiré")
+
+    # Issued before reading so that concurrent writes land in the next poll
+    next_token = new_sync_token(not_before=after)
     result = await db.execute(
-        select(Event).options(selectinload(Event.tags)).where(
-            and_(
-                Event.sub_calendar_id.in_(sc_ids),
-                or_(
-                    Event.title.ilike(f"%{_escape_like(q)}%"),
-                    Event.location.ilike(f"%{_escape_like(q)}%"),
-                    Event.notes.ilike(f"%{_escape_like(q)}%"),
-                ),
-            )
-        )
+        select(Event).options(selectinload(Event.tags))
+        .where(Event.calendar_id == cal_id, after_cursor(Event.update_dt, Event.id, after))
+        .order_by(Event.update_dt, Event.id)
+        .limit(limit + 1)
+    )
+    events = list(result.scalars().all())
+    has_more = len(events) > limit
+    if has_more:
+        events = events[:limit]
+        next_token = encode_cursor(events[-1].update_dt, events[-1].id)
+
+    deleted = await db.execute(
+        select(DeletedEvent.event_id)
+        .where(DeletedEvent.calendar_id == cal_id, DeletedEvent.deleted_at >= after[0])
+    )
+
+    items = [EventOut.model_validate(e) for e in events]
+    if perm == Permission.READ_ONLY_NO_DETAILS:
+        items = [_mask_details(e) for e in items]
+    return EventChanges(
+        events=items, deleted=deleted.scalars().all(), sync_token=next_token, has_more=has_more,
     )
-    return result.scalars().all()
+
+
+async def _stream_calendar_ical(cal_id: uuid.UUID) -> AsyncIterator[bytes]:
+    """Serialize the calendar batch by batch from a server-side cursor, so
+    memory stays flat however many events it holds.
+
+    Uses its own session: the request's session is closed once the handler
+    has returned the response, before the body is sent.
+    """
+    dtstamp = format_dtstamp()
+    yield CALENDAR_HEADER
+    async with AsyncSessionLocal() as session:
+        result = await session.stream_scalars(
+            select(Event)
+            .where(Event.calendar_id == cal_id)
+            .order_by(Event.start_dt, Event.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for batch in result.partitions():
+            yield b"".join(vevent_to_ical(event, dtstamp) for event in batch)
+    yield CALENDAR_FOOTER
 
 
 @router.get("/export.ics")
 async def export_calendar_ical(
     cal_id: uuid.UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
+    perm = await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
 
-    await _get_cal(cal_id, db)
-    sc_result = await db.execute(select(SubCalendar.id).where(SubCalendar.calendar_id == cal_id))
-    sc_ids = [row[0] for row in sc_result.all()]
-
-    result = await db.execute(select(Event).where(Event.sub_calendar_id.in_(sc_ids)).order_by(Event.start_dt))
-    events = list(result.scalars().all())
+    cal = await _get_cal(cal_id, db)
+    etag = _content_etag(request, cal, perm)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
 
-    return Response(
-        content=events_to_ical(events),
+    response = StreamingResponse(
+        _stream_calendar_ical(cal_id),
         media_type="text/calendar",
         headers={"Content-Disposition": "attachment; filename=calendar.ics"},
     )
+    set_etag(response, etag)
+    return response
+
+
+@router.post("/import.ics", response_model=EventImportResult, status_code=201)
+async def import_calendar_ical(
+    cal_id: uuid.UUID,
+    sub_calendar_id: uuid.UUID = Query(...),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    user: Optional[User] = Depends(get_optional_user),
+    link_token: Optional[str] = Depends(get_link_token),
+):
+    """Import the VEVENTs of an .ics file into a sub-calendar.
+
+    Events whose UID is already in the calendar are skipped, so the same file
+    can be imported again safely. Recurrence overrides (RECURRENCE-ID) are not
+    supported and counted as invalid.
+    """
+    await require_permission(
+        db, cal_id, can_add, user=user, link_token=link_token, sub_calendar_id=sub_calendar_id,
+    )
+    cal = await _get_cal(cal_id, db)
+    sc_result = await db.execute(
+        select(SubCalendar.id).where(
+            SubCalendar.id == sub_calendar_id,
+            SubCalendar.calendar_id == cal_id,
+        )
+    )
+    if not sc_result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Sous-calendrier introuvable dans ce calendrier")
+
+    max_bytes = settings.ICS_IMPORT_MAX_MB * 1024 * 1024
+
+    async def chunks():
+        size = 0
+        while chunk := await file.read(IMPORT_READ_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Fichier trop volumineux (max {settings.ICS_IMPORT_MAX_MB} Mo)",
+                )
+            yield chunk
+
+    importer = IcsImporter(db, cal_id, sub_calendar_id, cal.timezone, user.id if user else None)
+    result = await importer.run(chunks())
+    if result.imported:
+        await bump_content_version(db, cal_id)
+    return result
+
+
+@router.post(":batch", response_model=List[EventBatchResult])
+async def batch_events(
+    cal_id: uuid.UUID,
+    data: EventBatch,
+    db: AsyncSession = Depends(get_db),
+    user: Optional[User] = Depends(get_optional_user),
+    link_token: Optional[str] = Depends(get_link_token),
+):
+    """Create, update and delete many events at once.
+
+    Each operation gets its own result (same status codes as the single-event
+    endpoints); failed operations do not prevent the others.
+    """
+    cal = await _get_cal(cal_id, db)
+    return await EventBatchRunner(db, cal, user, link_token).run(data.operations)
 
 
 @router.get("/{event_id}", response_model=EventOut)
 async def get_event(
     cal_id: uuid.UUID,
     event_id: uuid.UUID,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read_limited(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
+    perm = await require_permission(db, cal_id, can_read_limited, user=user, link_token=link_token)
+
+    cal = await _get_cal(cal_id, db)
+    etag = _content_etag(request, cal, perm)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
 
-    sc_result = await db.execute(select(SubCalendar.id).where(SubCalendar.calendar_id == cal_id))
-    sc_ids = [row[0] for row in sc_result.all()]
     result = await db.execute(
         select(Event).options(selectinload(Event.tags)).where(
-            Event.id == event_id, Event.sub_calendar_id.in_(sc_ids)
+            Event.id == event_id, Event.calendar_id == cal_id
         )
     )
     event = result.scalar_one_or_none()
     if not event:
         raise HTTPException(status_code=404, detail="Événement introuvable")
+    set_etag(response, etag)
     return event
 
 
@@ -192,14 +512,10 @@ async def export_event_ical(
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
 
-    sc_result = await db.execute(select(SubCalendar.id).where(SubCalendar.calendar_id == cal_id))
-    sc_ids = [row[0] for row in sc_result.all()]
     result = await db.execute(
-        select(Event).where(Event.id == event_id, Event.sub_calendar_id.in_(sc_ids))
+        select(Event).where(Event.id == event_id, Event.calendar_id == cal_id)
     )
     event = result.scalar_one_or_none()
     if not event:
@@ -207,6 +523,36 @@ async def export_event_ical(
     return Response(content=event_to_ical(event), media_type="text/calendar")
 
 
+async def _valid_tags(db: AsyncSession, cal_id: uuid.UUID, tag_ids: List[uuid.UUID]) -> List[Tag]:
+    """The requested tags that exist in this calendar (unknown ids are ignored)."""
+    if not tag_ids:
+        return []
+    result = await db.execute(select(Tag).where(Tag.id.in_(tag_ids), Tag.calendar_id == cal_id))
+    return list(result.scalars())
+
+
+def _set_tags_stmt(event_id: uuid.UUID, current: set, wanted: set):
+    """One statement turning an event's tag links from current into wanted, or None."""
+    removed = current - wanted
+    added = wanted - current
+    if not added:
+        if not removed:
+            return None
+        return sa_delete(event_tags).where(
+            event_tags.c.event_id == event_id, event_tags.c.tag_id.in_(list(removed))
+        )
+    stmt = pg_insert(event_tags).values(
+        [{"event_id": event_id, "tag_id": tid} for tid in added]
+    ).on_conflict_do_nothing()
+    if removed:
+        stmt = stmt.add_cte(
+            sa_delete(event_tags).where(
+                event_tags.c.event_id == event_id, event_tags.c.tag_id.in_(list(removed))
+            ).cte("removed_tags")
+        )
+    return stmt
+
+
 @router.post("", response_model=EventOut, status_code=201)
 async def create_event(
     cal_id: uuid.UUID,
@@ -215,49 +561,47 @@ async def create_event(
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(
-        db, cal_id, user=user, link_token=link_token,
+    await require_permission(
+        db, cal_id, can_add, user=user, link_token=link_token,
         sub_calendar_id=data.sub_calendar_id,
     )
-    if not can_add(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
 
-    await _get_cal(cal_id, db)
+    # Sub-calendar check and calendar timezone in one query
     sc_result = await db.execute(
-        select(SubCalendar).where(
-            SubCalendar.id == data.sub_calendar_id,
-            SubCalendar.calendar_id == cal_id,
-        )
+        select(Calendar.timezone)
+        .join(SubCalendar, SubCalendar.calendar_id == Calendar.id)
+        .where(SubCalendar.id == data.sub_calendar_id, Calendar.id == cal_id)
     )
-    if not sc_result.scalar_one_or_none():
+    sc_row = sc_result.first()
+    if not sc_row:
         raise HTTPException(status_code=404, detail="Sous-calendrier introuvable dans ce calendrier")
 
-    creator_user_id = user.id if user else None
-    tag_ids = data.tag_ids
+    tags = await _valid_tags(db, cal_id, data.tag_ids)
     event_data = data.model_dump(exclude={"tag_ids"})
-    event = Event(
-        **event_data,
-        creator_token=secrets.token_urlsafe(32),
-        creator_user_id=creator_user_id,
-    )
-    db.add(event)
-    await db.flush()
-
-    if tag_ids:
-        # Validate tags exist in this calendar
-        tag_result = await db.execute(
-            select(Tag.id).where(Tag.id.in_(tag_ids), Tag.calendar_id == cal_id)
-        )
-        valid_tag_ids = [row[0] for row in tag_result.all()]
-        for tid in valid_tag_ids:
-            await db.execute(event_tags.insert().values(event_id=event.id, tag_id=tid))
-        await db.flush()
-
-    # Re-fetch with tags eager-loaded
     result = await db.execute(
-        select(Event).options(selectinload(Event.tags)).where(Event.id == event.id)
+        insert(Event)
+        .values(
+            **event_data,
+            calendar_id=cal_id,
+            creator_token=secrets.token_urlsafe(32),
+            creator_user_id=user.id if user else None,
+            translations={},
+            occurrences_until=horizon_end() if data.rrule else None,
+        )
+        .returning(Event)
     )
-    return result.scalar_one()
+    event = result.scalar_one()
+    if tags:
+        await db.execute(event_tags.insert().values(
+            [{"event_id": event.id, "tag_id": tag.id} for tag in tags]
+        ))
+    # The tags were just validated: no need to read them back
+    set_committed_value(event, "tags", tags)
+
+    await materialize_new_events(db, [event], sc_row.timezone)
+    await bump_content_version(db, cal_id)
+    pretranslation.schedule(db, "event", [event.id])
+    return event
 
 
 @router.put("/{event_id}", response_model=EventOut)
@@ -269,8 +613,10 @@ async def update_event(
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    result = await db.execute(select(Event).where(Event.id == event_id))
-    event = result.scalar_one_or_none()
+    result = await db.execute(
+        select(Event).options(joinedload(Event.tags)).where(Event.id == event_id, Event.calendar_id == cal_id)
+    )
+    event = result.unique().scalar_one_or_none()
     if not event:
         raise HTTPException(status_code=404, detail="Événement introuvable")
 
@@ -286,34 +632,50 @@ async def update_event(
     update_data = data.model_dump(exclude_unset=True)
     tag_ids = update_data.pop("tag_ids", None)
 
+    if "sub_calendar_id" in update_data:
+        sc_result = await db.execute(
+            select(SubCalendar.id).where(
+                SubCalendar.id == update_data["sub_calendar_id"],
+                SubCalendar.calendar_id == cal_id,
+            )
+        )
+        if not sc_result.scalar_one_or_none():
+            raise HTTPException(status_code=404, detail="Sous-calendrier introuvable dans ce calendrier")
+        if update_data["sub_calendar_id"] != event.sub_calendar_id:
+            # Moving an event adds it to the target sub-calendar
+            target_perm = await get_effective_permission(
+                db, cal_id, user=user, link_token=link_token,
+                sub_calendar_id=update_data["sub_calendar_id"],
+            )
+            if not can_add(target_perm):
+                raise HTTPException(status_code=403, detail="Accès refusé")
+
     # Invalidate translation cache if title or notes changed
     if "title" in update_data or "notes" in update_data:
         event.translations = {}
+        pretranslation.schedule(db, "event", [event.id])
 
     for field, value in update_data.items():
         setattr(event, field, value)
     event.update_dt = datetime.now(timezone.utc).replace(tzinfo=None)
-
-    if tag_ids is not None:
-        # Clear existing tags
-        await db.execute(
-            sa_delete(event_tags).where(event_tags.c.event_id == event.id)
-        )
-        # Add new tags
-        tag_result = await db.execute(
-            select(Tag.id).where(Tag.id.in_(tag_ids), Tag.calendar_id == cal_id)
-        )
-        valid_tag_ids = [row[0] for row in tag_result.all()]
-        for tid in valid_tag_ids:
-            await db.execute(event_tags.insert().values(event_id=event.id, tag_id=tid))
-
+    # Single UPDATE; the loaded row is current, nothing to read back
     await db.flush()
 
-    # Re-fetch with tags eager-loaded
-    result2 = await db.execute(
-        select(Event).options(selectinload(Event.tags)).where(Event.id == event.id)
-    )
-    return result2.scalar_one()
+    if tag_ids is not None:
+        tags = await _valid_tags(db, cal_id, tag_ids)
+        stmt = _set_tags_stmt(event.id, {t.id for t in event.tags}, {t.id for t in tags})
+        if stmt is not None:
+            await db.execute(stmt)
+        set_committed_value(event, "tags", tags)
+
+    if OCCURRENCE_FIELDS & update_data.keys():
+        await sync_event_occurrences(db, event)
+    if {"signup_max", "signup_enabled"} & update_data.keys():
+        # More seats, or signups reopened: let the waitlist in
+        if await promote_waitlist(db, event.id):
+            await db.refresh(event, ["signup_count"])
+    await bump_content_version(db, cal_id)
+    return event
 
 
 @router.delete("/{event_id}", status_code=204)
@@ -324,7 +686,7 @@ async def delete_event(
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    result = await db.execute(select(Event).where(Event.id == event_id))
+    result = await db.execute(select(Event).where(Event.id == event_id, Event.calendar_id == cal_id))
     event = result.scalar_one_or_none()
     if not event:
         raise HTTPException(status_code=404, detail="Événement introuvable")
@@ -338,14 +700,17 @@ async def delete_event(
     if not can_modify(perm) and not (can_modify_own(perm) and is_own):
         raise HTTPException(status_code=403, detail="Accès refusé")
 
-    # Delete attachment files before cascade-deleting DB rows
+    # Attachment rows go with the cascade; their files once it is committed
     att_result = await db.execute(
-        select(EventAttachment).where(EventAttachment.event_id == event_id)
+        select(EventAttachment.stored_filename).where(EventAttachment.event_id == event_id)
     )
-    for att in att_result.scalars().all():
-        await storage.delete(att.stored_filename)
+    filenames = list(att_result.scalars())
+    if filenames:
+        enqueue(db, delete_stored_files, filenames=filenames)
 
+    await record_tombstones(db, Event.id == event.id)
     await db.delete(event)
+    await bump_content_version(db, cal_id)
 
 
 @router.post("/{event_id}/translate")
@@ -362,11 +727,9 @@ async def translate_event(
     if target_lang not in SUPPORTED_LANGS or source_lang not in SUPPORTED_LANGS:
         raise HTTPException(status_code=400, detail=f"Supported languages: {', '.join(sorted(SUPPORTED_LANGS))}")
 
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
 
-    result = await db.execute(select(Event).where(Event.id == event_id))
+    result = await db.execute(select(Event).where(Event.id == event_id, Event.calendar_id == cal_id))
     event = result.scalar_one_or_none()
     if not event:
         raise HTTPException(status_code=404, detail="Événement introuvable")
@@ -376,10 +739,15 @@ async def translate_event(
     if target_lang in cached:
         return cached[target_lang]
 
+    # source_lang is the client's guess: trust the text
+    event.language = source_language(f"{event.title}\n{event.notes or ''}", source_lang)
+
     # Translate
     try:
-        translated_title = await translate_text(event.title, source_lang, target_lang)
-        translated_notes = await translate_text(event.notes or "", source_lang, target_lang) if event.notes else ""
+        translated_title, translated_notes = await asyncio.gather(
+            translate_text(event.title, event.language, target_lang),
+            translate_text(event.notes or "", event.language, target_lang),
+        )
     except Exception:
         raise HTTPException(status_code=502, detail="Translation service unavailable")
 
@@ -390,6 +758,7 @@ async def translate_event(
     # SQLAlchemy needs a new dict to detect JSON mutation
     new_translations = {**event.translations, target_lang: translation}
     event.translations = new_translations
+    await bump_content_version(db, cal_id)
     await db.flush()
 
     return translation
@@ -403,10 +772,11 @@ async def list_signups(
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
-    result = await db.execute(select(EventSignup).where(EventSignup.event_id == event_id))
+    await require_permission(db, cal_id, can_read, user=user, link_token=link_token)
+    result = await db.execute(
+        select(EventSignup).join(Event, Event.id == EventSignup.event_id)
+        .where(EventSignup.event_id == event_id, Event.calendar_id == cal_id)
+    )
     return result.scalars().all()
 
 
@@ -415,37 +785,44 @@ async def create_signup(
     cal_id: uuid.UUID,
     event_id: uuid.UUID,
     data: SignupCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_read_limited(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
-
-    ev_result = await db.execute(select(Event).where(Event.id == event_id))
-    event = ev_result.scalar_one_or_none()
-    if not event:
+    """Sign up for an event; when it is full, join its waitlist instead (202, waitlisted)."""
+    await require_permission(db, cal_id, can_read_limited, user=user, link_token=link_token)
+
+    if await take_seat(db, event_id, Event.calendar_id == cal_id):
+        signup = await insert_signup(db, event_id, **data.model_dump())
+        if signup is None:
+            # Raising rolls the seat back with the transaction
+            raise HTTPException(status_code=409, detail="Cette adresse email est déjà inscrite")
+        await bump_content_version(db, cal_id)
+        return signup
+
+    # No seat: say why (slow path only)
+    ev_result = await db.execute(
+        select(
+            Event.signup_enabled,
+            select(EventSignup.id).where(
+                EventSignup.event_id == Event.id, EventSignup.email == data.email
+            ).exists(),
+        ).where(Event.id == event_id, Event.calendar_id == cal_id)
+    )
+    row = ev_result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Événement introuvable")
-    if not event.signup_enabled:
+    signup_enabled, already_signed_up = row
+    if not signup_enabled:
         raise HTTPException(status_code=400, detail="Les inscriptions ne sont pas activées pour cet événement")
-    # Anti-duplicate: check if this email is already signed up
-    dup_result = await db.execute(
-        select(EventSignup).where(EventSignup.event_id == event_id, EventSignup.email == data.email)
-    )
-    if dup_result.scalar_one_or_none():
+    if already_signed_up:
         raise HTTPException(status_code=409, detail="Cette adresse email est déjà inscrite")
-    if event.signup_max:
-        count_result = await db.execute(
-            select(func.count()).select_from(EventSignup).where(EventSignup.event_id == event_id)
-        )
-        if count_result.scalar() >= event.signup_max:
-            raise HTTPException(status_code=400, detail="Événement complet")
-    signup = EventSignup(event_id=event_id, **data.model_dump())
-    db.add(signup)
-    await db.flush()
-    await db.refresh(signup)
-    return signup
+    entry = await join_waitlist(db, event_id, **data.model_dump())
+    if entry is None:
+        raise HTTPException(status_code=409, detail="Cette adresse email est déjà sur la liste d'attente")
+    response.status_code = 202
+    return SignupOut.model_validate(entry).model_copy(update={"waitlisted": True})
 
 
 @router.delete("/{event_id}/signups/{signup_id}", status_code=204)
@@ -457,11 +834,19 @@ async def delete_signup(
     user: Optional[User] = Depends(get_optional_user),
     link_token: Optional[str] = Depends(get_link_token),
 ):
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    if not can_modify(perm):
-        raise HTTPException(status_code=403, detail="Accès refusé")
-    result = await db.execute(select(EventSignup).where(EventSignup.id == signup_id))
-    signup = result.scalar_one_or_none()
-    if not signup:
+    await require_permission(db, cal_id, can_modify, user=user, link_token=link_token)
+    result = await db.execute(
+        sa_delete(EventSignup)
+        .where(
+            EventSignup.id == signup_id,
+            EventSignup.event_id == event_id,
+            EventSignup.event_id.in_(select(Event.id).where(Event.calendar_id == cal_id)),
+        )
+        .returning(EventSignup.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Inscription introuvable")
-    await db.delete(signup)
+    await release_seat(db, event_id)
+    await promote_waitlist(db, event_id)
+    await bump_content_version(db, cal_id)
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.database import get_db
+from app.models.access import AccessLink
+from app.models.calendar import Calendar
+from app.services.feeds import get_feed
+from app.utils.http_cache import not_modified, set_etag
+from app.utils.permissions import get_effective_permission, can_read
+
+router = APIRouter(prefix="/feeds", tags=["feeds"])
+
+
+@router.get("/{token}.ics")
+async def subscription_feed(
+    token: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """iCalendar subscription for an access link, for calendar apps to poll.
+
+    An unchanged calendar costs one query (link + content version): the
+    permission comes from the permission cache and the body from the feed cache.
+    """
+    result = await db.execute(
+        select(AccessLink.calendar_id, Calendar.content_version)
+        .join(Calendar, Calendar.id == AccessLink.calendar_id)
+        .where(AccessLink.token == token, AccessLink.active == True)  # noqa: E712
+    )
+    link = result.first()
+    if not link:
+        raise HTTPException(status_code=404, detail="Flux introuvable")
+    perm = await get_effective_permission(db, link.calendar_id, link_token=token)
+    if not can_read(perm):
+        raise HTTPException(status_code=403, detail="Accès refusé")
+
+    feed = await get_feed(db, link.calendar_id, link.content_version, perm)
+    cached = not_modified(request, feed.etag, feed.last_modified)
+    if cached:
+        return cached
+    response = Response(content=feed.body, media_type="text/calendar")
+    set_etag(response, feed.etag, feed.last_modified)
+    return response
@@ -0,0 +1,61 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.models.calendar import Calendar
+from app.models.event import Event
+from app.models.user import User
+from app.routers.deps import get_current_user
+from app.schemas.event import SearchResults, SearchGroup
+from app.services.search import event_search, search_page
+from app.utils.pagination import MAX_PAGE_SIZE, decode_rank_cursor
+from app.utils.permissions import readable_calendars
+from app.utils.search import tsquery_text
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+DEFAULT_SEARCH_LIMIT = 50
+
+
+@router.get("", response_model=SearchResults)
+async def search_all_calendars(
+    q: str = Query(...),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Search every calendar the user can read, in one query.
+
+    Results are ranked across calendars; each page is then grouped by calendar.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_rank_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Curseur invalide")
+
+    text = tsquery_text(q)
+    if text is None:
+        return SearchResults(groups=[])
+    readable = readable_calendars(user.id).subquery("readable")
+    stmt = (
+        event_search(text, after)
+        .add_columns(Calendar.title, Calendar.slug)
+        .join(readable, readable.c.calendar_id == Event.calendar_id)
+        .join(Calendar, Calendar.id == Event.calendar_id)
+    )
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    items, next_cursor = search_page(rows, limit)
+
+    groups: dict = {}
+    for item, row in zip(items, rows):
+        event, _, _, title, slug = row
+        group = groups.get(event.calendar_id)
+        if group is None:
+            group = groups[event.calendar_id] = SearchGroup(
+                calendar_id=event.calendar_id, calendar_title=title, calendar_slug=slug, items=[],
+            )
+        group.items.append(item)
+    return SearchResults(groups=list(groups.values()), next_cursor=next_cursor)
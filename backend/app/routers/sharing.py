@@ -1,12 +1,11 @@
 import uuid
 import logging
 import secrets
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from app.database import get_db
 from app.models.user import User
-from app.models.calendar import Calendar
 from app.models.access import AccessLink, CalendarAccess, Group, group_members, Permission, PendingInvitation
 from app.models.sub_calendar import SubCalendar
 from app.schemas.sharing import (
@@ -18,8 +17,9 @@ from app.schemas.sharing import (
     GroupAccessOut, ClaimLinkOut, GroupBrief, UserGroupMembership,
 )
 from app.routers.deps import get_current_user, get_optional_user, get_link_token, require_calendar_admin
-from app.utils.permissions import get_effective_permission, is_admin
-from app.services.email import send_invitation_email
+from app.utils.permissions import resolve_access, invalidate_permissions, is_admin
+from app.services.email import invitation_email
+from app.services.jobs import enqueue
 
 logger = logging.getLogger(__name__)
 
@@ -46,13 +46,10 @@ async def get_my_permission(
     user: User | None = Depends(get_optional_user),
     link_token: str | None = Depends(get_link_token),
 ):
-    cal_result = await db.execute(select(Calendar).where(Calendar.id == cal_id))
-    cal = cal_result.scalar_one_or_none()
-    if not cal:
+    access = await resolve_access(db, cal_id, user=user, link_token=link_token)
+    if not access.calendar_exists:
         raise HTTPException(status_code=404, detail="Calendrier introuvable")
-    is_owner = bool(user and cal.owner_id == user.id)
-    perm = await get_effective_permission(db, cal_id, user=user, link_token=link_token)
-    return MyPermissionOut(permission=perm, is_owner=is_owner)
+    return MyPermissionOut(permission=access.permission, is_owner=access.is_owner)
 
 
 # ─── Access links ──────────────────────────────────────────────────────────────
@@ -126,6 +123,7 @@ async def create_link(
     )
     db.add(access)
     await db.flush()
+    invalidate_permissions(db, cal_id)
     await db.refresh(link)
     return AccessLinkOut(
         id=link.id, calendar_id=link.calendar_id, token=link.token,
@@ -170,6 +168,7 @@ async def update_link(
         if acc:
             acc.permission = data.permission
     await db.flush()
+    invalidate_permissions(db, cal_id)
     await db.refresh(link)
     perm_result = await db.execute(
         select(CalendarAccess.permission).where(CalendarAccess.link_id == link.id).limit(1)
@@ -203,6 +202,7 @@ async def delete_link(
     for acc in acc_result.scalars().all():
         await db.delete(acc)
     await db.delete(link)
+    invalidate_permissions(db, cal_id)
 
 
 # ─── User access ───────────────────────────────────────────────────────────────
@@ -255,7 +255,6 @@ async def list_access(
 async def invite_user(
     cal_id: uuid.UUID,
     data: InviteUser,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -282,11 +281,12 @@ async def invite_user(
         )
         db.add(access)
         await db.flush()
+        invalidate_permissions(db, cal_id)
 
         email_sent = False
         if cal.enable_email_notifications:
-            background_tasks.add_task(
-                send_invitation_email,
+            enqueue(
+                db, invitation_email,
                 recipient_email=target.email,
                 recipient_name=target.name,
                 inviter_name=current_user.name or current_user.email,
@@ -321,8 +321,8 @@ async def invite_user(
 
         email_sent = False
         if cal.enable_email_notifications:
-            background_tasks.add_task(
-                send_invitation_email,
+            enqueue(
+                db, invitation_email,
                 recipient_email=data.email,
                 recipient_name=None,
                 inviter_name=current_user.name or current_user.email,
@@ -384,6 +384,7 @@ async def update_access(
         raise HTTPException(status_code=404, detail="Introuvable")
     access.permission = data.permission
     await db.flush()
+    invalidate_permissions(db, cal_id)
     user_email = user_name = group_name = None
     if access.user_id:
         u_result = await db.execute(select(User).where(User.id == access.user_id))
@@ -416,6 +417,7 @@ async def delete_access(
     if not access:
         raise HTTPException(status_code=404, detail="Introuvable")
     await db.delete(access)
+    invalidate_permissions(db, cal_id)
 
 
 # ─── Groups ────────────────────────────────────────────────────────────────────
@@ -462,6 +464,7 @@ async def delete_group(
     for acc in acc_result.scalars().all():
         await db.delete(acc)
     await db.delete(group)
+    invalidate_permissions(db, cal_id)
 
 
 @router.get("/groups/{group_id}/members", response_model=list[GroupMemberOut])
@@ -485,7 +488,6 @@ async def add_group_member(
     cal_id: uuid.UUID,
     group_id: uuid.UUID,
     data: AddGroupMember,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -509,10 +511,11 @@ async def add_group_member(
         if existing.first():
             raise HTTPException(status_code=409, detail="Déjà membre du groupe")
         await db.execute(group_members.insert().values(group_id=group_id, user_id=target.id))
+        invalidate_permissions(db, cal_id)
 
         if cal.enable_email_notifications:
-            background_tasks.add_task(
-                send_invitation_email,
+            enqueue(
+                db, invitation_email,
                 recipient_email=target.email,
                 recipient_name=target.name,
                 inviter_name=current_user.name or current_user.email,
@@ -545,8 +548,8 @@ async def add_group_member(
         await db.flush()
 
         if cal.enable_email_notifications:
-            background_tasks.add_task(
-                send_invitation_email,
+            enqueue(
+                db, invitation_email,
                 recipient_email=data.email,
                 recipient_name=None,
                 inviter_name=current_user.name or current_user.email,
@@ -574,6 +577,7 @@ async def remove_group_member(
             group_members.c.user_id == user_id,
         )
     )
+    invalidate_permissions(db, cal_id)
 
 
 @router.post("/groups/{group_id}/access", response_model=CalendarAccessOut, status_code=201)
@@ -606,6 +610,7 @@ async def set_group_access(
         )
         db.add(acc)
     await db.flush()
+    invalidate_permissions(db, cal_id)
     if not acc.id:
         await db.refresh(acc)
     return CalendarAccessOut(
@@ -665,6 +670,7 @@ async def delete_group_access(
     if not acc:
         raise HTTPException(status_code=404, detail="Introuvable")
     await db.delete(acc)
+    invalidate_permissions(db, cal_id)
 
 
 # ─── Claim link (auto-join group) ─────────────────────────────────────────────
@@ -701,6 +707,7 @@ async def claim_link(
         return ClaimLinkOut(group_id=group.id, group_name=group.name)
     # Add user to group
     await db.execute(group_members.insert().values(group_id=link.group_id, user_id=current_user.id))
+    invalidate_permissions(db, cal_id)
     return ClaimLinkOut(group_id=group.id, group_name=group.name)
 
 
@@ -752,6 +759,7 @@ async def set_access(
     access = CalendarAccess(calendar_id=cal_id, **data.model_dump())
     db.add(access)
     await db.flush()
+    invalidate_permissions(db, cal_id)
     await db.refresh(access)
     return CalendarAccessOut(
         id=access.id, sub_calendar_id=access.sub_calendar_id,
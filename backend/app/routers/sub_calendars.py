@@ -5,8 +5,10 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models.user import User
 from app.models.sub_calendar import SubCalendar
+from app.models.event import Event
 from app.schemas.sub_calendar import SubCalendarCreate, SubCalendarUpdate, SubCalendarOut
 from app.routers.deps import get_current_user, require_calendar_admin as _require_admin
+from app.services.sync import record_tombstones, bump_content_version
 
 router = APIRouter(prefix="/calendars/{cal_id}/subcalendars", tags=["sub-calendars"])
 
@@ -31,6 +33,7 @@ async def create_sub_calendar(
     await _require_admin(cal_id, current_user, db)
     sc = SubCalendar(calendar_id=cal_id, **data.model_dump())
     db.add(sc)
+    await bump_content_version(db, cal_id)
     await db.flush()
     await db.refresh(sc)
     return sc
@@ -53,6 +56,7 @@ async def update_sub_calendar(
         raise HTTPException(status_code=404, detail="Sous-calendrier introuvable")
     for field, value in data.model_dump(exclude_none=True).items():
         setattr(sc, field, value)
+    await bump_content_version(db, cal_id)
     await db.flush()
     await db.refresh(sc)
     return sc
@@ -72,4 +76,6 @@ async def delete_sub_calendar(
     sc = result.scalar_one_or_none()
     if not sc:
         raise HTTPException(status_code=404, detail="Sous-calendrier introuvable")
+    await record_tombstones(db, Event.sub_calendar_id == sc_id)
     await db.delete(sc)
+    await bump_content_version(db, cal_id)
@@ -7,6 +7,7 @@ from app.models.user import User
 from app.models.tag import Tag
 from app.schemas.tag import TagCreate, TagUpdate, TagOut
 from app.routers.deps import get_current_user, require_calendar_admin as _require_admin
+from app.services.sync import bump_content_version
 
 router = APIRouter(prefix="/calendars/{cal_id}/tags", tags=["tags"])
 
@@ -29,6 +30,7 @@ async def create_tag(
     await _require_admin(cal_id, current_user, db)
     tag = Tag(calendar_id=cal_id, **data.model_dump())
     db.add(tag)
+    await bump_content_version(db, cal_id)
     await db.flush()
     await db.refresh(tag)
     return tag
@@ -51,6 +53,7 @@ async def update_tag(
         raise HTTPException(status_code=404, detail="Étiquette introuvable")
     for field, value in data.model_dump(exclude_none=True).items():
         setattr(tag, field, value)
+    await bump_content_version(db, cal_id)
     await db.flush()
     await db.refresh(tag)
     return tag
@@ -71,3 +74,4 @@ async def delete_tag(
     if not tag:
         raise HTTPException(status_code=404, detail="Étiquette introuvable")
     await db.delete(tag)
+    await bump_content_version(db, cal_id)
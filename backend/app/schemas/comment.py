@@ -22,6 +22,7 @@ class CommentOut(BaseModel):
     user_name: str
     content: str
     translations: Optional[Dict[str, Any]] = None
+    language: Optional[str] = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal, Union, Annotated
 from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 from app.schemas.tag import TagOut
 
@@ -112,16 +112,98 @@ class EventOut(BaseModel):
     who: Optional[str]
     signup_enabled: bool
     signup_max: Optional[int]
+    signup_count: int = 0
     rrule: Optional[str]
     custom_fields: Dict[str, Any]
     tags: List[TagOut] = []
     translations: Optional[Dict[str, Any]] = None
+    language: Optional[str] = None
     creation_dt: datetime
     update_dt: datetime
+    # True for a single occurrence of a recurring event (list_events?expand=true);
+    # id still refers to the series master.
+    is_occurrence: bool = False
+    # Search results only: matching passages, HTML-escaped, matches in <mark>
+    snippet: Optional[str] = None
 
     model_config = {"from_attributes": True}
 
 
+class EventPage(BaseModel):
+    items: List[EventOut]
+    # Pass back as ?cursor= to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+class SearchGroup(BaseModel):
+    calendar_id: uuid.UUID
+    calendar_title: str
+    calendar_slug: str
+    items: List[EventOut]
+
+
+class SearchResults(BaseModel):
+    # One group per calendar, the calendar with the best match first
+    groups: List[SearchGroup]
+    next_cursor: Optional[str] = None
+
+
+class EventChanges(BaseModel):
+    # Created or updated since the token (upsert), and ids of deleted events
+    events: List[EventOut] = []
+    deleted: List[uuid.UUID] = []
+    sync_token: str
+    # More changes are pending: call again right away with sync_token
+    has_more: bool = False
+
+
+class EventImportResult(BaseModel):
+    imported: int = 0
+    # VEVENTs whose UID is already in the calendar (or repeated in the file)
+    duplicates: int = 0
+    # VEVENTs that could not be mapped (e.g. no DTSTART)
+    invalid: int = 0
+
+
+# Operations accepted by one events:batch request
+MAX_BATCH_OPERATIONS = 500
+
+
+class EventBatchCreate(BaseModel):
+    op: Literal["create"]
+    data: EventCreate
+
+
+class EventBatchUpdate(BaseModel):
+    op: Literal["update"]
+    id: uuid.UUID
+    data: EventUpdate
+
+
+class EventBatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: uuid.UUID
+
+
+EventBatchOperation = Annotated[
+    Union[EventBatchCreate, EventBatchUpdate, EventBatchDelete], Field(discriminator="op")
+]
+
+
+class EventBatch(BaseModel):
+    operations: List[EventBatchOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+
+class EventBatchResult(BaseModel):
+    # Same position as the operation in the request
+    index: int
+    # HTTP status the single-event endpoint would have answered
+    status: int
+    id: Optional[uuid.UUID] = None
+    event: Optional[EventOut] = None
+    detail: Optional[str] = None
+
+
 class SignupCreate(BaseModel):
     name: str
     email: EmailStr
@@ -135,5 +217,7 @@ class SignupOut(BaseModel):
     email: str
     note: Optional[str]
     created_at: datetime
+    # True when the event was full and this is a waitlist entry
+    waitlisted: bool = False
 
     model_config = {"from_attributes": True}
@@ -1,9 +1,23 @@
+import asyncio
 import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
 import httpx
 from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.jobs import job
+from app.utils.security import create_verification_token, create_password_reset_token
+from app.utils.throttle import Throttle
 
 logger = logging.getLogger(__name__)
 
+RESEND_URL = "https://api.resend.com/emails"
+# Resend accepts up to 100 emails per batch request, and 2 requests per second
+RESEND_BATCH_SIZE = 100
+RESEND_RATE_LIMIT = 2.0
+
 # ── Invitation templates per language ────────────────────────────────────────
 
 TEMPLATES = {
@@ -452,25 +466,209 @@ def _get_permission_label(permission: str, lang: str) -> str:
     return labels.get(permission, permission)
 
 
+@dataclass
+class OutgoingEmail:
+    to: str
+    subject: str
+    html: str
+    attempts: int = 0
+    # Set to whether it was sent, for callers awaiting delivery (EmailOutbox.send)
+    delivered: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+
+
+def _settle(emails: list[OutgoingEmail], sent: bool) -> None:
+    for email in emails:
+        if email.delivered is not None and not email.delivered.done():
+            email.delivered.set_result(sent)
+
+
+class EmailNotSent(Exception):
+    pass
+
+
+class EmailOutbox:
+    """
+    In-process send queue in front of Resend.
+
+    Emails queued within `linger` seconds of each other are sent together
+    through the batch endpoint (up to `batch_size` per request), over one
+    pooled HTTP client, at most `rate` requests per second. Rate-limited
+    (429), server-side (5xx) and network failures are retried with
+    exponential backoff, `max_attempts` times in all. A batch rejected as a
+    whole (other 4xx) is resent one email at a time, so only the emails
+    Resend refuses on their own are dropped.
+    """
+
+    def __init__(
+        self, batch_size: int = RESEND_BATCH_SIZE, linger: float = 0.25, rate: float = RESEND_RATE_LIMIT,
+        max_attempts: int = 5, backoff: float = 1.0,
+    ):
+        self.batch_size = batch_size
+        self.linger = linger
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._throttle = Throttle(rate)
+        self._queue: asyncio.Queue[OutgoingEmail] = asyncio.Queue()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._retrying: set[asyncio.Task] = set()
+        self.queued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.requests = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, client: Optional[httpx.AsyncClient] = None) -> None:
+        if self._task is None:
+            self._client = client or httpx.AsyncClient(timeout=15, limits=httpx.Limits(max_connections=4))
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Send what is still queued (for at most timeout seconds), then close the client."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Email outbox stopped with %d email(s) unsent", self._queue.qsize())
+        if self._retrying:
+            logger.warning("Email outbox stopped with %d batch(es) waiting for a retry", len(self._retrying))
+        self._task.cancel()
+        for task in self._retrying:
+            task.cancel()
+        self._task = None
+        await self._client.aclose()
+        self._client = None
+
+    def enqueue(self, email: OutgoingEmail) -> None:
+        self.queued += 1
+        self._queue.put_nowait(email)
+
+    async def send(self, email: OutgoingEmail) -> bool:
+        """Queue email and wait until it is sent (True) or given up (False)."""
+        email.delivered = asyncio.get_running_loop().create_future()
+        self.enqueue(email)
+        return await email.delivered
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._send_batch(batch)
+            except Exception:
+                logger.exception("Email batch of %d failed", len(batch))
+                self.failed += len(batch)
+                _settle(batch, False)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _send_batch(self, batch: list[OutgoingEmail]) -> None:
+        await self._throttle.wait()
+        self.requests += 1
+        for email in batch:
+            email.attempts += 1
+        try:
+            if len(batch) == 1:
+                resp = await self._client.post(RESEND_URL, headers=_resend_headers(), json=_resend_payload(batch[0]))
+            else:
+                resp = await self._client.post(
+                    f"{RESEND_URL}/batch", headers=_resend_headers(), json=[_resend_payload(e) for e in batch],
+                )
+        except httpx.HTTPError as exc:
+            self._retry_later(batch, None, repr(exc))
+            return
+        if resp.status_code in (200, 201):
+            self.sent += len(batch)
+            _settle(batch, True)
+            logger.info("Sent %d email(s) to %s", len(batch), ", ".join(e.to for e in batch))
+        elif resp.status_code == 429 or resp.status_code >= 500:
+            self._retry_later(batch, resp.headers.get("retry-after"), f"HTTP {resp.status_code}")
+        elif len(batch) > 1:
+            # One bad address fails the whole batch: find it
+            logger.warning("Resend rejected a batch of %d (HTTP %s), sending one by one", len(batch), resp.status_code)
+            for email in batch:
+                await self._send_batch([email])
+        else:
+            self.failed += len(batch)
+            _settle(batch, False)
+            logger.error("Resend API error %s for %s: %s", resp.status_code, ", ".join(e.to for e in batch), resp.text)
+
+    def _retry_later(self, batch: list[OutgoingEmail], retry_after: Optional[str], reason: str) -> None:
+        retry = [e for e in batch if e.attempts < self.max_attempts]
+        given_up = len(batch) - len(retry)
+        if given_up:
+            self.failed += given_up
+            _settle([e for e in batch if e.attempts >= self.max_attempts], False)
+            logger.error("Giving up on %d email(s) after %d attempts: %s", given_up, self.max_attempts, reason)
+        if not retry:
+            return
+        self.retries += len(retry)
+        delay = self.backoff * 2 ** (retry[0].attempts - 1)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        logger.warning("Resend unavailable (%s), retrying %d email(s) in %.1fs", reason, len(retry), delay)
+        # Waits outside the send loop, so that other emails keep going out meanwhile
+        task = asyncio.create_task(self._requeue(retry, delay))
+        self._retrying.add(task)
+        task.add_done_callback(self._retrying.discard)
+
+    async def _requeue(self, emails: list[OutgoingEmail], delay: float) -> None:
+        await asyncio.sleep(delay)
+        for email in emails:
+            self._queue.put_nowait(email)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "pending": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "requests": self.requests,
+        }
+
+
+def _resend_headers() -> dict:
+    return {"Authorization": f"Bearer {settings.RESEND_API_KEY}"}
+
+
+def _resend_payload(email: OutgoingEmail) -> dict:
+    return {"from": settings.EMAIL_FROM, "to": [email.to], "subject": email.subject, "html": email.html}
+
+
+outbox = EmailOutbox()
+
+
 async def _send_email(to: str, subject: str, html_body: str) -> bool:
-    """Send an HTML email via Resend HTTP API. Returns True on success."""
+    """Send an HTML email via the Resend HTTP API.
+
+    Returns whether it was sent: through the outbox (started by the API and
+    by workers), or directly when it is not running (scripts).
+    """
     if not _email_configured():
         logger.warning("Resend not configured — skipping email to %s", to)
         return False
 
+    email = OutgoingEmail(to, subject, html_body)
+    if outbox.running:
+        return await outbox.send(email)
+
     logger.info("Sending email to %s (subject: %s)", to, subject[:60])
     try:
         async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
-                "https://api.resend.com/emails",
-                headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"},
-                json={
-                    "from": settings.EMAIL_FROM,
-                    "to": [to],
-                    "subject": subject,
-                    "html": html_body,
-                },
-            )
+            resp = await client.post(RESEND_URL, headers=_resend_headers(), json=_resend_payload(email))
         if resp.status_code in (200, 201):
             logger.info("Email sent successfully to %s (id: %s)", to, resp.json().get("id"))
             return True
@@ -547,3 +745,41 @@ async def send_password_reset_email(
     subject = tpl["subject"]
     html_body = tpl["body"].format(reset_url=reset_url)
     return await _send_email(email, subject, html_body)
+
+
+# ── Jobs (app.services.jobs) ─────────────────────────────────────────────────
+# Queued by the routers; a failed delivery raises, so that the job is retried.
+
+def _require_sent(sent: bool, to: str) -> None:
+    if not sent and _email_configured():
+        raise EmailNotSent(to)
+
+
+async def _load_user(user_id: str) -> Optional[User]:
+    async with AsyncSessionLocal() as session:
+        return await session.get(User, uuid.UUID(user_id))
+
+
+@job(priority=5)
+async def invitation_email(**kwargs) -> None:
+    """send_invitation_email, as a job (same arguments)."""
+    _require_sent(await send_invitation_email(**kwargs), kwargs["recipient_email"])
+
+
+@job(priority=10)
+async def verification_email(user_id: str) -> None:
+    # The token is made at send time, so that none is stored in the jobs table
+    user = await _load_user(user_id)
+    if user is None or user.is_verified:
+        return
+    token = create_verification_token(str(user.id))
+    _require_sent(await send_verification_email(email=user.email, name=user.name, token=token), user.email)
+
+
+@job(priority=10)
+async def password_reset_email(user_id: str) -> None:
+    user = await _load_user(user_id)
+    if user is None:
+        return
+    token = create_password_reset_token(str(user.id))
+    _require_sent(await send_password_reset_email(email=user.email, token=token), user.email)
@@ -0,0 +1,264 @@
+"""Batch event mutations (POST /calendars/{cal_id}/events:batch).
+
+Operations are validated one by one, with the same rules and status codes as
+the single-event endpoints, but the database work is done per kind instead of
+per event: one load of the targeted events, one permission lookup per
+sub-calendar, one UPDATE per distinct update payload (`WHERE id IN (...)`),
+one multi-row INSERT of the new events and of their tags, and one DELETE of
+the removed events. A failed operation does not prevent the others.
+"""
+import json
+import secrets
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.calendar import Calendar
+from app.models.comment import EventAttachment
+from app.models.event import Event, EventSignup
+from app.models.sub_calendar import SubCalendar
+from app.models.tag import Tag, event_tags
+from app.models.user import User
+from app.schemas.event import (
+    EventBatchOperation, EventBatchCreate, EventBatchUpdate, EventBatchDelete, EventBatchResult, EventOut,
+)
+from app.services import pretranslation
+from app.services.occurrences import materialize_new_events, sync_events_occurrences, horizon_end
+from app.services.signups import promote_waitlist
+from app.services.jobs import enqueue
+from app.services.storage import delete_stored_files
+from app.services.sync import record_tombstones, bump_content_version
+from app.utils.permissions import resolve_access, can_add, can_modify, can_modify_own, Permission
+
+# Fields whose change requires rewriting an event's occurrence rows
+OCCURRENCE_FIELDS = {"start_dt", "end_dt", "all_day", "rrule", "sub_calendar_id"}
+
+# Rows per multi-row INSERT into event_tags (2 bind params each)
+TAG_INSERT_CHUNK = 5000
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class EventBatchRunner:
+    def __init__(
+        self, db: AsyncSession, cal: Calendar,
+        user: Optional[User] = None, link_token: Optional[str] = None,
+    ):
+        self.db = db
+        self.cal = cal
+        self.user = user
+        self.link_token = link_token
+        self.results: dict[int, EventBatchResult] = {}
+
+    async def run(self, operations: list[EventBatchOperation]) -> list[EventBatchResult]:
+        target_ids = {op.id for op in operations if not isinstance(op, EventBatchCreate)}
+        events: dict[uuid.UUID, Event] = {}
+        if target_ids:
+            result = await self.db.execute(
+                select(Event).where(Event.id.in_(list(target_ids)), Event.calendar_id == self.cal.id)
+            )
+            events = {event.id: event for event in result.scalars()}
+
+        sub_calendar_ids = {
+            op.data.sub_calendar_id for op in operations
+            if not isinstance(op, EventBatchDelete) and op.data.sub_calendar_id
+        }
+        known_sub_calendars = await self._sub_calendars(sub_calendar_ids)
+        perms = await self._permissions(
+            (sub_calendar_ids & known_sub_calendars) | {e.sub_calendar_id for e in events.values()}
+        )
+        valid_tags = await self._tags({
+            tid for op in operations
+            if not isinstance(op, EventBatchDelete) and op.data.tag_ids
+            for tid in op.data.tag_ids
+        })
+
+        creates: list[tuple[int, EventBatchCreate]] = []
+        updates: list[tuple[int, EventBatchUpdate, Event]] = []
+        deletes: list[tuple[int, Event]] = []
+        seen: set[uuid.UUID] = set()
+        for index, op in enumerate(operations):
+            if isinstance(op, EventBatchCreate):
+                sc_id = op.data.sub_calendar_id
+                if sc_id not in known_sub_calendars:
+                    self._fail(index, 404, "Sous-calendrier introuvable dans ce calendrier")
+                elif not can_add(perms[sc_id]):
+                    self._fail(index, 403, "Accès refusé")
+                else:
+                    creates.append((index, op))
+                continue
+
+            event = events.get(op.id)
+            if op.id in seen:
+                self._fail(index, 409, "Événement déjà modifié par une autre opération du lot", op.id)
+                continue
+            seen.add(op.id)
+            if event is None:
+                self._fail(index, 404, "Événement introuvable", op.id)
+            elif not self._may_modify(event, perms[event.sub_calendar_id]):
+                self._fail(index, 403, "Accès refusé", op.id)
+            elif isinstance(op, EventBatchUpdate):
+                sc_id = op.data.sub_calendar_id
+                moved = "sub_calendar_id" in op.data.model_fields_set and sc_id != event.sub_calendar_id
+                if moved and sc_id not in known_sub_calendars:
+                    self._fail(index, 404, "Sous-calendrier introuvable dans ce calendrier", op.id)
+                elif moved and not can_add(perms[sc_id]):
+                    # Moving an event adds it to the target sub-calendar
+                    self._fail(index, 403, "Accès refusé", op.id)
+                else:
+                    updates.append((index, op, event))
+            else:
+                deletes.append((index, event))
+
+        await self._delete(deletes)
+        await self._update(updates, valid_tags)
+        await self._create(creates, valid_tags)
+        if creates or updates or deletes:
+            await bump_content_version(self.db, self.cal.id)
+            await self._attach_events()
+        return [self.results[i] for i in range(len(operations))]
+
+    def _fail(self, index: int, status: int, detail: str, event_id: Optional[uuid.UUID] = None) -> None:
+        self.results[index] = EventBatchResult(index=index, status=status, id=event_id, detail=detail)
+
+    def _may_modify(self, event: Event, perm: Permission) -> bool:
+        is_own = self.user is not None and event.creator_user_id == self.user.id
+        return can_modify(perm) or (can_modify_own(perm) and is_own)
+
+    async def _sub_calendars(self, ids: set[uuid.UUID]) -> set[uuid.UUID]:
+        if not ids:
+            return set()
+        result = await self.db.execute(
+            select(SubCalendar.id).where(SubCalendar.id.in_(list(ids)), SubCalendar.calendar_id == self.cal.id)
+        )
+        return set(result.scalars())
+
+    async def _permissions(self, sub_calendar_ids: set[uuid.UUID]) -> dict[uuid.UUID, Permission]:
+        perms = {}
+        for sc_id in sub_calendar_ids:
+            access = await resolve_access(self.db, self.cal.id, self.user, self.link_token, sc_id)
+            perms[sc_id] = access.permission
+        return perms
+
+    async def _tags(self, ids: set[uuid.UUID]) -> set[uuid.UUID]:
+        if not ids:
+            return set()
+        result = await self.db.execute(
+            select(Tag.id).where(Tag.id.in_(list(ids)), Tag.calendar_id == self.cal.id)
+        )
+        return set(result.scalars())
+
+    async def _delete(self, deletes: list[tuple[int, Event]]) -> None:
+        if not deletes:
+            return
+        ids = [event.id for _, event in deletes]
+        # Attachment rows go with the cascade; their files once it is committed
+        files = await self.db.execute(
+            select(EventAttachment.stored_filename).where(EventAttachment.event_id.in_(ids))
+        )
+        filenames = list(files.scalars())
+        if filenames:
+            enqueue(self.db, delete_stored_files, filenames=filenames)
+
+        await record_tombstones(self.db, Event.id.in_(ids))
+        # event_signups has no ON DELETE CASCADE (the ORM cascade does it for single deletes)
+        await self.db.execute(delete(EventSignup).where(EventSignup.event_id.in_(ids)))
+        await self.db.execute(
+            delete(Event).where(Event.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        for index, event in deletes:
+            self.db.expunge(event)
+            self.results[index] = EventBatchResult(index=index, status=204, id=event.id)
+
+    async def _update(self, updates: list[tuple[int, EventBatchUpdate, Event]], valid_tags: set[uuid.UUID]) -> None:
+        if not updates:
+            return
+        now = _utcnow()
+        # Moving or editing many events the same way is one UPDATE
+        groups: dict[str, tuple[dict, list[Event]]] = {}
+        retagged: dict[uuid.UUID, list[uuid.UUID]] = {}
+        resync: list[Event] = []
+        reopened: list[uuid.UUID] = []
+        for index, op, event in updates:
+            values = op.data.model_dump(exclude_unset=True)
+            tag_ids = values.pop("tag_ids", None)
+            if tag_ids is not None:
+                retagged[event.id] = [tid for tid in dict.fromkeys(tag_ids) if tid in valid_tags]
+            if OCCURRENCE_FIELDS & values.keys():
+                resync.append(event)
+            if {"signup_max", "signup_enabled"} & values.keys():
+                reopened.append(event.id)
+            key = json.dumps(values, sort_keys=True, default=str)
+            groups.setdefault(key, (values, []))[1].append(event)
+            self.results[index] = EventBatchResult(index=index, status=200, id=event.id)
+
+        for values, events in groups.values():
+            if "title" in values or "notes" in values:
+                # Invalidate translation cache
+                values = {**values, "translations": {}}
+                pretranslation.schedule(self.db, "event", [event.id for event in events])
+            # ORM-enabled UPDATE: the loaded events get the new values too
+            await self.db.execute(
+                update(Event)
+                .where(Event.id.in_([event.id for event in events]))
+                .values(**values, update_dt=now)
+            )
+
+        if retagged:
+            await self.db.execute(delete(event_tags).where(event_tags.c.event_id.in_(list(retagged))))
+            await self._insert_tags(retagged)
+        await sync_events_occurrences(self.db, resync, self.cal.timezone)
+        for event_id in reopened:
+            await promote_waitlist(self.db, event_id)
+
+    async def _create(self, creates: list[tuple[int, EventBatchCreate]], valid_tags: set[uuid.UUID]) -> None:
+        if not creates:
+            return
+        now = _utcnow()
+        until = horizon_end()
+        creator_user_id = self.user.id if self.user else None
+        rows = []
+        tags: dict[uuid.UUID, list[uuid.UUID]] = {}
+        for index, op in creates:
+            row = op.data.model_dump(exclude={"tag_ids"})
+            row.update(
+                id=uuid.uuid4(),
+                calendar_id=self.cal.id,
+                creator_token=secrets.token_urlsafe(32),
+                creator_user_id=creator_user_id,
+                translations={},
+                creation_dt=now,
+                update_dt=now,
+                occurrences_until=until if row["rrule"] else None,
+            )
+            rows.append(row)
+            tags[row["id"]] = [tid for tid in dict.fromkeys(op.data.tag_ids) if tid in valid_tags]
+            self.results[index] = EventBatchResult(index=index, status=201, id=row["id"])
+
+        await self.db.execute(insert(Event).values(rows))
+        await self._insert_tags(tags)
+        await materialize_new_events(self.db, [Event(**row) for row in rows], self.cal.timezone)
+        pretranslation.schedule(self.db, "event", [row["id"] for row in rows])
+
+    async def _insert_tags(self, tags: dict[uuid.UUID, list[uuid.UUID]]) -> None:
+        rows = [{"event_id": event_id, "tag_id": tid} for event_id, tids in tags.items() for tid in tids]
+        for i in range(0, len(rows), TAG_INSERT_CHUNK):
+            await self.db.execute(event_tags.insert().values(rows[i:i + TAG_INSERT_CHUNK]))
+
+    async def _attach_events(self) -> None:
+        """Fill in the created and updated events, with their tags, in one query."""
+        written = {r.id: r for r in self.results.values() if r.status in (200, 201)}
+        if not written:
+            return
+        result = await self.db.execute(
+            select(Event)
+            .options(selectinload(Event.tags))
+            .where(Event.id.in_(list(written)))
+            .execution_options(populate_existing=True)
+        )
+        for event in result.scalars():
+            written[event.id].event = EventOut.model_validate(event)
@@ -0,0 +1,94 @@
+"""ICS subscription feeds for access links.
+
+Calendar apps poll a feed every few minutes, almost always getting the same
+answer. Two in-process caches make that cheap:
+
+- rendered VEVENT fragments, keyed by (event id, update_dt): an edit changes
+  update_dt, so a stale fragment is never reused, only evicted;
+- the last rendered feed per (calendar, permission), tagged with the
+  calendar's content_version: while the version is unchanged the feed is
+  served as is, without touching the events table. This cache is bounded
+  by total body size, so a few large calendars cannot hold a worker's memory.
+"""
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.access import Permission
+from app.models.event import Event
+from app.utils.http_cache import make_etag
+from app.utils.lru import LRUCache
+from app.utils.ical import CALENDAR_HEADER, CALENDAR_FOOTER, vevent_to_ical, format_dtstamp
+
+# Cache bounds (per worker)
+FEED_CACHE_SIZE = 256
+FEED_CACHE_BYTES = 32 * 1024 * 1024
+FRAGMENT_CACHE_SIZE = 50_000
+# Events loaded per query when rendering missing fragments
+RENDER_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class RenderedFeed:
+    content_version: int
+    etag: str
+    last_modified: datetime
+    body: bytes
+
+
+fragment_cache: LRUCache[bytes] = LRUCache(FRAGMENT_CACHE_SIZE)
+feed_cache: LRUCache[RenderedFeed] = LRUCache(
+    FEED_CACHE_SIZE, max_bytes=FEED_CACHE_BYTES, sizeof=lambda feed: len(feed.body),
+)
+
+
+def render_fragment(event: Event) -> bytes:
+    """VEVENT for a feed. DTSTAMP is the last modification, so the bytes only
+    depend on the row and can be cached under (id, update_dt)."""
+    fragment = vevent_to_ical(event, format_dtstamp(event.update_dt.replace(tzinfo=timezone.utc)))
+    fragment_cache.set((event.id, event.update_dt), fragment)
+    return fragment
+
+
+async def get_feed(
+    db: AsyncSession, calendar_id: uuid.UUID, content_version: int, perm: Permission,
+) -> RenderedFeed:
+    """The calendar's feed as seen with perm, re-rendered only if its content changed."""
+    key = (calendar_id, perm)
+    feed = feed_cache.get(key)
+    if feed and feed.content_version == content_version:
+        return feed
+
+    index = (await db.execute(
+        select(Event.id, Event.update_dt)
+        .where(Event.calendar_id == calendar_id)
+        .order_by(Event.start_dt, Event.id)
+    )).all()
+    fragments: dict[uuid.UUID, bytes] = {}
+    missing = []
+    for event_id, update_dt in index:
+        fragment = fragment_cache.get((event_id, update_dt))
+        if fragment is None:
+            missing.append(event_id)
+        else:
+            fragments[event_id] = fragment
+    for i in range(0, len(missing), RENDER_BATCH_SIZE):
+        result = await db.execute(select(Event).where(Event.id.in_(missing[i:i + RENDER_BATCH_SIZE])))
+        for event in result.scalars():
+            fragments[event.id] = render_fragment(event)
+
+    body = b"".join([
+        CALENDAR_HEADER,
+        # An event deleted between the two queries has no fragment: skip it
+        *(fragments[event_id] for event_id, _ in index if event_id in fragments),
+        CALENDAR_FOOTER,
+    ])
+    feed = RenderedFeed(
+        content_version=content_version,
+        etag=make_etag(calendar_id, content_version, perm.name),
+        last_modified=datetime.now(timezone.utc).replace(microsecond=0),
+        body=body,
+    )
+    feed_cache.set(key, feed)
+    return feed
@@ -0,0 +1,129 @@
+"""Bulk iCalendar import.
+
+The upload is decoded and parsed chunk by chunk (VEventParser), and events
+are written IMPORT_BATCH_SIZE at a time: one lookup of already-imported
+UIDs (hash index on events.ical_uid), one multi-row INSERT of the events,
+then their occurrence rows.
+"""
+import codecs
+import secrets
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from sqlalchemy import select, insert, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.event import Event
+from app.schemas.event import EventImportResult
+from app.services.occurrences import materialize_new_events, horizon_end
+from app.utils.ical import VEventParser, VEvent, vevent_to_fields
+
+# asyncpg allows this many bind params per statement
+MAX_BIND_PARAMS = 32767
+# Events per INSERT: one bind param per column (defaults included)
+IMPORT_BATCH_SIZE = MAX_BIND_PARAMS // len(Event.__table__.columns)
+
+
+def _as_uuid(value: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
+class IcsImporter:
+    def __init__(
+        self, db: AsyncSession, cal_id: uuid.UUID, sub_calendar_id: uuid.UUID,
+        tz_name: str, creator_user_id: Optional[uuid.UUID] = None,
+    ):
+        self.db = db
+        self.cal_id = cal_id
+        self.sub_calendar_id = sub_calendar_id
+        self.tz_name = tz_name
+        self.creator_user_id = creator_user_id
+        self.result = EventImportResult()
+        self._seen_uids: set[str] = set()
+
+    async def run(self, chunks: AsyncIterator[bytes]) -> EventImportResult:
+        parser = VEventParser()
+        decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        pending: list[VEvent] = []
+        async for chunk in chunks:
+            pending.extend(parser.feed(decoder.decode(chunk)))
+            # One chunk can bring many events: write full batches, keep the rest
+            while len(pending) >= IMPORT_BATCH_SIZE:
+                await self._write(pending[:IMPORT_BATCH_SIZE])
+                pending = pending[IMPORT_BATCH_SIZE:]
+        pending.extend(parser.feed(decoder.decode(b"", final=True)))
+        pending.extend(parser.close())
+        for i in range(0, len(pending), IMPORT_BATCH_SIZE):
+            await self._write(pending[i:i + IMPORT_BATCH_SIZE])
+        return self.result
+
+    async def _write(self, vevents: list[VEvent]) -> None:
+        candidates: list[dict] = []
+        for vevent in vevents:
+            if "RECURRENCE-ID" in vevent:
+                # Overrides of a single occurrence have no equivalent here
+                self.result.invalid += 1
+                continue
+            try:
+                fields = vevent_to_fields(vevent)
+            except ValueError:
+                self.result.invalid += 1
+                continue
+            uid = fields["ical_uid"]
+            if uid:
+                if uid in self._seen_uids:
+                    self.result.duplicates += 1
+                    continue
+                self._seen_uids.add(uid)
+            candidates.append(fields)
+
+        existing = await self._existing_uids([f["ical_uid"] for f in candidates if f["ical_uid"]])
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        until = horizon_end()
+        rows = []
+        for fields in candidates:
+            if fields["ical_uid"] in existing:
+                self.result.duplicates += 1
+                continue
+            rows.append({
+                **fields,
+                "id": uuid.uuid4(),
+                "calendar_id": self.cal_id,
+                "sub_calendar_id": self.sub_calendar_id,
+                "creator_user_id": self.creator_user_id,
+                "creator_token": secrets.token_urlsafe(32),
+                "signup_enabled": False,
+                "translations": {},
+                "custom_fields": {},
+                "creation_dt": now,
+                "update_dt": now,
+                "occurrences_until": until if fields["rrule"] else None,
+            })
+        if not rows:
+            return
+        await self.db.execute(insert(Event).values(rows))
+        await materialize_new_events(self.db, [Event(**row) for row in rows], self.tz_name)
+        self.result.imported += len(rows)
+
+    async def _existing_uids(self, uids: list[str]) -> set[str]:
+        """UIDs already in the calendar: imported ones, or our own exports (UID = event id)."""
+        if not uids:
+            return set()
+        own_ids = {u: _as_uuid(u) for u in uids}
+        result = await self.db.execute(
+            select(Event.ical_uid, Event.id).where(
+                Event.calendar_id == self.cal_id,
+                or_(
+                    Event.ical_uid.in_(uids),
+                    Event.id.in_([i for i in own_ids.values() if i]),
+                ),
+            )
+        )
+        found: set[str] = set()
+        for ical_uid, event_id in result.all():
+            if ical_uid:
+                found.add(ical_uid)
+            found.add(str(event_id))
+        return found
@@ -0,0 +1,246 @@
+"""Durable background jobs, queued in the `jobs` table.
+
+Handlers are async functions registered with `@job`. A request queues one
+with `enqueue(db, handler, **kwargs)`: the row is written in the request
+transaction, so the job exists exactly when the change that asked for it was
+committed, and survives restarts.
+
+Workers (`run_worker`, inside the API process when settings.RUN_JOB_WORKER,
+or separately with `python -m app.worker`) claim due jobs with
+`SELECT ... FOR UPDATE SKIP LOCKED`, highest priority first, so any number of
+them can share the table. A done job is deleted; a failed one is retried
+with exponential backoff, and kept with status "failed" after its last
+attempt. Jobs of a worker that died are claimed again once their lease ends.
+"""
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls of an idle worker
+POLL_INTERVAL = 1.0
+# A job running longer is cancelled (and retried)
+JOB_TIMEOUT = 300
+# A job claimed this long ago without an outcome belongs to a dead worker
+LEASE = timedelta(seconds=2 * JOB_TIMEOUT)
+# Retry delays: RETRY_BASE, twice that, ... up to RETRY_MAX
+RETRY_BASE = 10
+RETRY_MAX = 3600
+# Failed jobs are kept this long for inspection
+FAILED_RETENTION_DAYS = 30
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class JobOptions:
+    priority: int
+    max_attempts: int
+
+
+HANDLERS: dict[str, Handler] = {}
+_options: dict[str, JobOptions] = {}
+
+
+def job(fn: Optional[Handler] = None, *, priority: int = 0, max_attempts: int = 5):
+    """Register an async function as a job handler, under its name.
+
+    Used bare (`@job`) or with defaults for its jobs (`@job(priority=10)`).
+    Its keyword arguments are stored as JSON: pass strings, not UUIDs.
+    """
+    def register(handler: Handler) -> Handler:
+        name = handler.__name__
+        if HANDLERS.get(name, handler) is not handler:
+            raise ValueError(f"Job handler {name!r} already registered")
+        HANDLERS[name] = handler
+        _options[name] = JobOptions(priority, max_attempts)
+        return handler
+
+    return register(fn) if fn is not None else register
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue(
+    db: AsyncSession,
+    handler: Handler,
+    *,
+    priority: Optional[int] = None,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+    **kwargs: Any,
+) -> Job:
+    """Queue handler(**kwargs), committed with the current transaction of db.
+
+    priority and max_attempts default to those given to `@job`; run_at
+    (naive UTC) delays the job.
+    """
+    name = handler.__name__
+    if HANDLERS.get(name) is not handler:
+        raise ValueError(f"{name!r} is not a registered job handler")
+    options = _options[name]
+    row = Job(
+        kind=name,
+        payload=kwargs,
+        priority=options.priority if priority is None else priority,
+        run_at=run_at or _utcnow(),
+        max_attempts=options.max_attempts if max_attempts is None else max_attempts,
+    )
+    db.add(row)
+    return row
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before retrying a job that failed its attempts-th run."""
+    return min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+
+
+def release_expired_statement(now: datetime):
+    """UPDATE putting jobs whose lease expired (dead worker) back in the queue."""
+    return (
+        update(Job)
+        .where(Job.status == "running", Job.locked_at < now - LEASE)
+        .values(status="pending", locked_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def claim_statement(limit: int, now: datetime):
+    """UPDATE marking up to limit due jobs as running, returning them.
+
+    Only pending jobs are claimed, so that the rows are read in order from
+    ix_jobs_pending; expired leases are released first (release_expired_statement).
+    """
+    due = (
+        select(Job.id)
+        .where(Job.status == "pending", Job.run_at <= now)
+        .order_by(Job.priority.desc(), Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Job)
+        .where(Job.id.in_(due.scalar_subquery()))
+        .values(status="running", attempts=Job.attempts + 1, locked_at=now)
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def claim_jobs(limit: int) -> list:
+    async with AsyncSessionLocal() as session:
+        now = _utcnow()
+        await session.execute(release_expired_statement(now))
+        result = await session.execute(claim_statement(limit, now))
+        claimed = result.all()
+        await session.commit()
+    return claimed
+
+
+async def _finish(job_id: uuid.UUID, values: Optional[dict]) -> None:
+    """Delete a done job (values None), or update a failed one."""
+    async with AsyncSessionLocal() as session:
+        if values is None:
+            await session.execute(delete(Job).where(Job.id == job_id))
+        else:
+            await session.execute(
+                update(Job).where(Job.id == job_id).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        await session.commit()
+
+
+def failure_values(attempts: int, max_attempts: int, error: str, now: datetime) -> dict:
+    if attempts >= max_attempts:
+        return {"status": "failed", "locked_at": None, "last_error": error}
+    return {
+        "status": "pending",
+        "locked_at": None,
+        "last_error": error,
+        "run_at": now + timedelta(seconds=retry_delay(attempts)),
+    }
+
+
+async def run_job(claimed) -> None:
+    """Run one claimed job and record its outcome."""
+    handler = HANDLERS.get(claimed.kind)
+    try:
+        if claimed.attempts > claimed.max_attempts:
+            # Reclaimed after its worker died on the last attempt
+            raise RuntimeError("Worker lost during the last attempt")
+        if handler is None:
+            raise LookupError(f"Unknown job kind {claimed.kind!r}")
+        await asyncio.wait_for(handler(**claimed.payload), JOB_TIMEOUT)
+    except asyncio.CancelledError:
+        # Worker stopping: run again by the next one, without using an attempt
+        await asyncio.shield(_finish(claimed.id, {
+            "status": "pending", "locked_at": None, "attempts": claimed.attempts - 1,
+        }))
+        raise
+    except Exception as exc:
+        values = failure_values(claimed.attempts, claimed.max_attempts, repr(exc), _utcnow())
+        log = logger.error if values["status"] == "failed" else logger.warning
+        log("Job %s %s failed (attempt %d/%d)", claimed.kind, claimed.id,
+            claimed.attempts, claimed.max_attempts, exc_info=True)
+        await _finish(claimed.id, values)
+    else:
+        await _finish(claimed.id, None)
+
+
+def _reap(running: set[asyncio.Task], task: asyncio.Task) -> None:
+    running.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        # Outcome not recorded (database unreachable): run again after the lease
+        logger.error("Job outcome lost", exc_info=task.exception())
+
+
+async def run_worker(concurrency: int) -> None:
+    """Claim and run jobs, up to concurrency at a time, until cancelled."""
+    running: set[asyncio.Task] = set()
+    try:
+        while True:
+            claimed = []
+            if len(running) < concurrency:
+                try:
+                    claimed = await claim_jobs(concurrency - len(running))
+                except Exception:
+                    logger.exception("Claiming jobs failed")
+            for row in claimed:
+                task = asyncio.create_task(run_job(row))
+                running.add(task)
+                task.add_done_callback(lambda t: _reap(running, t))
+            if running:
+                await asyncio.wait(running, timeout=POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def purge_failed_jobs(db: AsyncSession) -> int:
+    cutoff = _utcnow() - timedelta(days=FAILED_RETENTION_DAYS)
+    result = await db.execute(delete(Job).where(Job.status == "failed", Job.created_at < cutoff))
+    return result.rowcount
+
+
+async def job_stats(db: AsyncSession) -> dict:
+    """Job counts per status, and how late the oldest due job is."""
+    result = await db.execute(select(Job.status, func.count()).group_by(Job.status))
+    stats = {"pending": 0, "running": 0, "failed": 0, **dict(result.all())}
+    oldest = await db.scalar(
+        select(func.min(Job.run_at)).where(Job.status == "pending", Job.run_at <= _utcnow())
+    )
+    stats["lag_seconds"] = (_utcnow() - oldest).total_seconds() if oldest else 0.0
+    return stats
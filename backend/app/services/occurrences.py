@@ -0,0 +1,256 @@
+"""Materialized event occurrences (event_occurrences table).
+
+Every event has its occurrence rows rewritten whenever it is written, up to
+a rolling horizon (settings.OCCURRENCE_HORIZON_DAYS ahead). A background job
+(see app.main) extends recurring series as the horizon moves forward, so
+windows that end before `safe_horizon()` can be answered from the table alone
+once every recurring series of the calendar is materialized that far (see
+`occurrences_cover`).
+
+Writers and the background job lock the event row before touching its
+occurrences, so the job never inserts rows built from a superseded rule.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete, update, exists, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from app.config import settings
+from app.models.calendar import Calendar
+from app.models.event import Event, EventOccurrence
+from app.utils.recurrence import expand_occurrences
+
+logger = logging.getLogger(__name__)
+
+# Per-series cap when materializing (a daily series covers ~50 years). A capped
+# series gets occurrences_until = its last materialized start, so later
+# windows are expanded from the master instead of being read truncated.
+MATERIALIZE_LIMIT = 20000
+# Rows per multi-row INSERT (5 bind params each, asyncpg allows 32767)
+INSERT_CHUNK = 2000
+# How far behind the target horizon the job may lag before list_events
+# stops trusting the table for a window
+HORIZON_SLACK = timedelta(days=7)
+# Series are extended once their horizon lags this much, not on every run
+# (must stay below HORIZON_SLACK minus the job interval)
+HORIZON_STEP = timedelta(days=3)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def horizon_end() -> datetime:
+    """Date up to which occurrences are materialized on write."""
+    return _utcnow() + timedelta(days=settings.OCCURRENCE_HORIZON_DAYS)
+
+
+def safe_horizon() -> datetime:
+    """Windows ending before this date can be served from event_occurrences."""
+    return horizon_end() - HORIZON_SLACK
+
+
+def _occurrence_rows(
+    event: Event, tz_name: str, window_start: datetime, window_end: datetime, limit: int | None = None,
+) -> list[dict]:
+    if limit is None:
+        limit = MATERIALIZE_LIMIT
+    if not event.rrule:
+        return [{
+            "event_id": event.id, "start_dt": event.start_dt, "end_dt": event.end_dt,
+            "sub_calendar_id": event.sub_calendar_id, "calendar_id": event.calendar_id,
+        }]
+    try:
+        occurrences = expand_occurrences(
+            event.rrule, event.start_dt, event.end_dt, window_start, window_end,
+            tz_name=tz_name, all_day=event.all_day, limit=limit,
+        )
+    except ValueError:
+        logger.warning("Invalid rrule on event %s: %r", event.id, event.rrule)
+        return []
+    if len(occurrences) >= limit:
+        logger.warning(
+            "Event %s has more than %d occurrences until %s; later ones are not materialized",
+            event.id, MATERIALIZE_LIMIT, window_end,
+        )
+    return [
+        {
+            "event_id": event.id, "start_dt": s, "end_dt": e,
+            "sub_calendar_id": event.sub_calendar_id, "calendar_id": event.calendar_id,
+        }
+        for s, e in occurrences
+    ]
+
+
+def _covered_until(rows: list[dict], window_end: datetime, limit: int | None = None) -> datetime:
+    """occurrences_until for a series materialized as rows up to window_end.
+
+    When the expansion stopped at the cap, only windows ending at or before the
+    last materialized start are complete.
+    """
+    if limit is None:
+        limit = MATERIALIZE_LIMIT
+    if rows and len(rows) >= limit:
+        return rows[-1]["start_dt"]
+    return window_end
+
+
+async def _set_occurrences_until(db: AsyncSession, values: dict[uuid.UUID, datetime | None]) -> None:
+    """Core UPDATEs of occurrences_until, one per distinct value, pinning update_dt:
+    moving the horizon is not an edit."""
+    by_value: dict[datetime | None, list[uuid.UUID]] = {}
+    for event_id, value in values.items():
+        by_value.setdefault(value, []).append(event_id)
+    for value, ids in by_value.items():
+        await db.execute(
+            update(Event)
+            .where(Event.id.in_(ids))
+            .values(occurrences_until=value, update_dt=Event.update_dt)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def _insert_rows(db: AsyncSession, rows: list[dict]) -> None:
+    for i in range(0, len(rows), INSERT_CHUNK):
+        await db.execute(
+            pg_insert(EventOccurrence)
+            .values(rows[i:i + INSERT_CHUNK])
+            .on_conflict_do_nothing(index_elements=["event_id", "start_dt"])
+        )
+
+
+async def _calendar_timezone(db: AsyncSession, cal_id: uuid.UUID) -> str:
+    result = await db.execute(select(Calendar.timezone).where(Calendar.id == cal_id))
+    return result.scalar_one_or_none() or "UTC"
+
+
+async def _lock_events(db: AsyncSession, ids: list[uuid.UUID]) -> None:
+    # Taken before deleting occurrences: the horizon job skips locked series
+    await db.execute(select(Event.id).where(Event.id.in_(ids)).with_for_update())
+
+
+async def occurrences_cover(db: AsyncSession, cal_id: uuid.UUID, window_end: datetime) -> bool:
+    """True when every recurring series of the calendar is materialized up to window_end."""
+    result = await db.execute(select(~exists().where(
+        Event.calendar_id == cal_id,
+        Event.rrule.isnot(None),
+        or_(Event.occurrences_until.is_(None), Event.occurrences_until < window_end),
+    )))
+    return result.scalar_one()
+
+
+async def sync_event_occurrences(db: AsyncSession, event: Event, tz_name: str | None = None) -> None:
+    """Rewrite the occurrence rows of one event after it was created or updated.
+
+    The calendar timezone is only needed (and looked up if not given) for
+    recurring events.
+    """
+    await _lock_events(db, [event.id])
+    await db.execute(delete(EventOccurrence).where(EventOccurrence.event_id == event.id))
+    if event.rrule:
+        if tz_name is None:
+            tz_name = await _calendar_timezone(db, event.calendar_id)
+        until = horizon_end()
+        rows = _occurrence_rows(event, tz_name, event.start_dt, until)
+        event.occurrences_until = _covered_until(rows, until)
+    else:
+        rows = _occurrence_rows(event, "UTC", event.start_dt, event.end_dt)
+        event.occurrences_until = None
+    await _insert_rows(db, rows)
+
+
+async def materialize_new_events(db: AsyncSession, events: list[Event], tz_name: str) -> None:
+    """Insert occurrence rows for events just inserted in bulk.
+
+    Their occurrences_until must already be set to horizon_end() for recurring
+    events (it is written with the event row); it is lowered for series that
+    reach MATERIALIZE_LIMIT.
+    """
+    rows: list[dict] = []
+    capped: dict[uuid.UUID, datetime] = {}
+    for event in events:
+        if event.rrule:
+            series = _occurrence_rows(event, tz_name, event.start_dt, event.occurrences_until)
+            until = _covered_until(series, event.occurrences_until)
+            if until != event.occurrences_until:
+                capped[event.id] = until
+                set_committed_value(event, "occurrences_until", until)
+            rows.extend(series)
+        else:
+            rows.extend(_occurrence_rows(event, "UTC", event.start_dt, event.end_dt))
+    await _insert_rows(db, rows)
+    await _set_occurrences_until(db, capped)
+
+
+async def sync_events_occurrences(db: AsyncSession, events: list[Event], tz_name: str) -> None:
+    """sync_event_occurrences for many events of one calendar, in a fixed number of statements."""
+    if not events:
+        return
+    await _lock_events(db, [e.id for e in events])
+    await db.execute(delete(EventOccurrence).where(EventOccurrence.event_id.in_([e.id for e in events])))
+    until = horizon_end()
+    rows: list[dict] = []
+    covered: dict[uuid.UUID, datetime | None] = {}
+    for event in events:
+        if event.rrule:
+            series = _occurrence_rows(event, tz_name, event.start_dt, until)
+            covered[event.id] = _covered_until(series, until)
+            rows.extend(series)
+        else:
+            rows.extend(_occurrence_rows(event, "UTC", event.start_dt, event.end_dt))
+            covered[event.id] = None
+    await _insert_rows(db, rows)
+    await _set_occurrences_until(db, covered)
+
+
+async def resync_calendar_occurrences(db: AsyncSession, cal_id: uuid.UUID, tz_name: str) -> None:
+    """Re-expand every recurring event of a calendar (e.g. after a timezone change)."""
+    result = await db.execute(
+        select(Event).where(Event.calendar_id == cal_id, Event.rrule.isnot(None))
+    )
+    for event in result.scalars().all():
+        await sync_event_occurrences(db, event, tz_name)
+
+
+async def extend_occurrence_horizon(db: AsyncSession) -> int:
+    """Materialize recurring series up to the current horizon.
+
+    Handles series never materialized (occurrences_until NULL, e.g. right
+    after the migration) and series whose horizon lags by HORIZON_STEP or
+    more; others are not loaded. Only the missing part of a series is
+    expanded, and a series is never taken past MATERIALIZE_LIMIT rows in all
+    (capped series are left behind the horizon, and read from their master).
+    Returns the number of series extended.
+
+    Series are locked until the caller commits; series being rewritten by a
+    writer are skipped and picked up by a later run if still needed.
+    """
+    target = horizon_end()
+    result = await db.execute(
+        select(Event, Calendar.timezone)
+        .join(Calendar, Calendar.id == Event.calendar_id)
+        .where(
+            Event.rrule.isnot(None),
+            or_(Event.occurrences_until.is_(None), Event.occurrences_until < target - HORIZON_STEP),
+        )
+        .with_for_update(of=Event, skip_locked=True)
+    )
+    series = result.all()
+    counts = dict((await db.execute(
+        select(EventOccurrence.event_id, func.count())
+        .where(EventOccurrence.event_id.in_([event.id for event, _ in series]))
+        .group_by(EventOccurrence.event_id)
+    )).all()) if series else {}
+    extended: dict[uuid.UUID, datetime] = {}
+    for event, tz_name in series:
+        remaining = MATERIALIZE_LIMIT - counts.get(event.id, 0)
+        if remaining <= 0:
+            continue
+        window_start = event.occurrences_until or event.start_dt
+        rows = _occurrence_rows(event, tz_name, window_start, target, limit=remaining)
+        await _insert_rows(db, rows)
+        extended[event.id] = _covered_until(rows, target, limit=remaining)
+    await _set_occurrences_until(db, extended)
+    return len(extended)
@@ -0,0 +1,141 @@
+"""Background pre-translation of events and comments.
+
+Writes schedule their new or edited events and comments with `schedule()`,
+which queues a job (app.services.jobs) committed with them. Workers then
+translate them from their detected language (the calendar language when
+unsure) into the other SUPPORTED_LANGS and fill their `translations` and
+`language`. Readers then find the translation cached instead of waiting for
+the backend. Backend calls are rate limited in app.services.translation.
+
+Failed jobs are retried by the queue; until then, texts are translated on
+demand, as before.
+"""
+import asyncio
+import uuid
+from typing import Iterable, Literal
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.calendar import Calendar
+from app.models.comment import EventComment
+from app.models.event import Event
+from app.services.jobs import job, enqueue
+from app.services.sync import bump_content_version
+from app.services.translation import translate_text, source_language, SUPPORTED_LANGS
+
+# Rows per job, so that one job stays well within jobs.JOB_TIMEOUT
+JOB_SIZE = 50
+
+
+def _targets(source: str, translations: dict | None) -> list[str]:
+    done = translations or {}
+    return sorted(lang for lang in SUPPORTED_LANGS if lang != source and lang not in done)
+
+
+async def _pretranslate_event(event_id: uuid.UUID) -> None:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Event.title, Event.notes, Event.translations, Calendar.language)
+            .join(Calendar, Calendar.id == Event.calendar_id)
+            .where(Event.id == event_id)
+        )
+        row = result.first()
+    if row is None:
+        return
+    source = source_language(f"{row.title}\n{row.notes or ''}", row.language)
+    if source not in SUPPORTED_LANGS:
+        return
+    translated = {}
+    for target in _targets(source, row.translations):
+        title, notes = await asyncio.gather(
+            translate_text(row.title, source, target),
+            translate_text(row.notes or "", source, target),
+        )
+        translated[target] = {"title": title, "notes": notes}
+    if not translated:
+        return
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Event.calendar_id, Event.translations)
+            .where(Event.id == event_id, Event.title == row.title, Event.notes.is_not_distinct_from(row.notes))
+            .with_for_update()
+        )
+        current = result.first()
+        if current is None:
+            # Deleted, or edited meanwhile (the edit scheduled its own job)
+            return
+        await session.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            # Filling a cache is not an edit: keep update_dt
+            .values(
+                translations={**translated, **(current.translations or {})},
+                language=source,
+                update_dt=Event.update_dt,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await bump_content_version(session, current.calendar_id)
+        await session.commit()
+
+
+async def _pretranslate_comment(comment_id: uuid.UUID) -> None:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(EventComment.content, EventComment.translations, Calendar.language)
+            .join(Event, Event.id == EventComment.event_id)
+            .join(Calendar, Calendar.id == Event.calendar_id)
+            .where(EventComment.id == comment_id)
+        )
+        row = result.first()
+    if row is None:
+        return
+    source = source_language(row.content, row.language)
+    if source not in SUPPORTED_LANGS:
+        return
+    translated = {}
+    for target in _targets(source, row.translations):
+        translated[target] = {"content": await translate_text(row.content, source, target)}
+    if not translated:
+        return
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(EventComment.translations)
+            .where(EventComment.id == comment_id, EventComment.content == row.content)
+            .with_for_update()
+        )
+        current = result.first()
+        if current is None:
+            return
+        await session.execute(
+            update(EventComment)
+            .where(EventComment.id == comment_id)
+            .values(translations={**translated, **(current.translations or {})}, language=source)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+
+@job
+async def pretranslate_events(ids: list[str]) -> None:
+    for event_id in ids:
+        await _pretranslate_event(uuid.UUID(event_id))
+
+
+@job
+async def pretranslate_comments(ids: list[str]) -> None:
+    for comment_id in ids:
+        await _pretranslate_comment(uuid.UUID(comment_id))
+
+
+def schedule(db: AsyncSession, kind: Literal["event", "comment"], ids: Iterable[uuid.UUID]) -> None:
+    """Pre-translate these rows once the current transaction commits."""
+    ids = [str(i) for i in ids]
+    if not settings.PRETRANSLATION_ENABLED or not ids:
+        return
+    handler = pretranslate_events if kind == "event" else pretranslate_comments
+    for start in range(0, len(ids), JOB_SIZE):
+        enqueue(db, handler, ids=ids[start:start + JOB_SIZE])
@@ -0,0 +1,45 @@
+"""Ranked event search, shared by the per-calendar and the cross-calendar endpoints.
+
+See app.utils.search for how events and comments are indexed and queried.
+"""
+from typing import Optional
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import selectinload
+from app.models.comment import EventComment
+from app.models.event import Event
+from app.schemas.event import EventOut
+from app.utils.pagination import encode_rank_cursor, after_rank_cursor
+from app.utils.search import search_query, headline, safe_snippet
+
+
+def event_search(text: str, after: Optional[tuple] = None):
+    """select(Event, rank, snippet) of the events matching text, or one of
+    their comments, best match first. text comes from tsquery_text()."""
+    query = search_query(text)
+    rank = func.ts_rank(Event.search_vector, query)
+    by_comment = select(EventComment.event_id).where(EventComment.search_vector.op("@@")(query))
+    stmt = (
+        select(
+            Event,
+            rank,
+            headline(func.concat_ws(" · ", Event.title, Event.location, Event.notes), query),
+        )
+        .options(selectinload(Event.tags))
+        .where(or_(Event.search_vector.op("@@")(query), Event.id.in_(by_comment)))
+        .order_by(rank.desc(), Event.id)
+    )
+    if after:
+        stmt = stmt.where(after_rank_cursor(rank, Event.id, after))
+    return stmt
+
+
+def search_page(rows, limit: int) -> tuple[list[EventOut], Optional[str]]:
+    """Events with their snippets and the next cursor, from up to limit + 1
+    event_search rows (extra columns after the snippet are ignored)."""
+    items = [
+        EventOut.model_validate(row[0]).model_copy(update={"snippet": safe_snippet(row[2])})
+        for row in rows[:limit]
+    ]
+    if len(rows) <= limit:
+        return items, None
+    return items, encode_rank_cursor(rows[limit - 1][1], items[-1].id)
@@ -0,0 +1,101 @@
+"""Event signup seats and waitlist.
+
+events.signup_count holds the number of signups. A seat is taken with a
+conditional `UPDATE ... WHERE signup_count < signup_max RETURNING`, so a
+burst of concurrent signups can never overbook an event and no signup pays a
+COUNT(*). Duplicate emails are rejected by the (event_id, email) unique
+constraint. Signups to a full event go to event_waitlist, and are promoted
+oldest first when a seat frees up.
+
+signup_count is part of EventOut: seat changes advance update_dt (so that
+/changes reports the event), and callers bump the calendar content_version.
+"""
+import uuid
+from sqlalchemy import select, update, delete, insert, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.event import Event, EventSignup, EventWaitlistEntry
+
+
+def _seat_available():
+    return or_(Event.signup_max.is_(None), Event.signup_count < Event.signup_max)
+
+
+async def take_seat(db: AsyncSession, event_id: uuid.UUID, *criteria) -> bool:
+    """Count one more signup if the event accepts signups and has room."""
+    result = await db.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.signup_enabled.is_(True), _seat_available(), *criteria)
+        .values(signup_count=Event.signup_count + 1)
+        .returning(Event.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.first() is not None
+
+
+async def release_seat(db: AsyncSession, event_id: uuid.UUID) -> None:
+    await db.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.signup_count > 0)
+        .values(signup_count=Event.signup_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def insert_signup(db: AsyncSession, event_id: uuid.UUID, **values) -> EventSignup | None:
+    """Insert a signup; None if this email is already signed up."""
+    result = await db.execute(
+        pg_insert(EventSignup)
+        .values(id=uuid.uuid4(), event_id=event_id, **values)
+        .on_conflict_do_nothing(constraint="uq_event_signups_event_email")
+        .returning(EventSignup)
+    )
+    return result.scalar_one_or_none()
+
+
+async def join_waitlist(db: AsyncSession, event_id: uuid.UUID, **values) -> EventWaitlistEntry | None:
+    """Add to the waitlist; None if this email is already on it."""
+    result = await db.execute(
+        pg_insert(EventWaitlistEntry)
+        .values(id=uuid.uuid4(), event_id=event_id, **values)
+        .on_conflict_do_nothing(constraint="uq_event_waitlist_event_email")
+        .returning(EventWaitlistEntry)
+    )
+    return result.scalar_one_or_none()
+
+
+async def promote_waitlist(db: AsyncSession, event_id: uuid.UUID) -> list[EventSignup]:
+    """Give free seats to the waitlist, oldest entry first."""
+    promoted: list[EventSignup] = []
+    while True:
+        next_in_line = (
+            select(EventWaitlistEntry.id)
+            .where(EventWaitlistEntry.event_id == event_id)
+            .order_by(EventWaitlistEntry.created_at, EventWaitlistEntry.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            delete(EventWaitlistEntry)
+            .where(EventWaitlistEntry.id == next_in_line)
+            .returning(
+                EventWaitlistEntry.id, EventWaitlistEntry.event_id, EventWaitlistEntry.name,
+                EventWaitlistEntry.email, EventWaitlistEntry.note, EventWaitlistEntry.created_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        entry = result.first()
+        if entry is None:
+            break
+        if not await take_seat(db, event_id):
+            # Still full (signup_max lowered or signups closed): back in line, same place
+            await db.execute(insert(EventWaitlistEntry).values(**entry._mapping))
+            break
+        signup = await insert_signup(db, event_id, name=entry.name, email=entry.email, note=entry.note)
+        if signup is None:
+            # Signed up directly in the meantime (signup_max was raised)
+            await release_seat(db, event_id)
+            continue
+        promoted.append(signup)
+    return promoted
@@ -9,6 +9,7 @@ Sélection via STORAGE_BACKEND env var ("local" ou "r2").
 import os
 from abc import ABC, abstractmethod
 from app.config import settings
+from app.services.jobs import job
 
 
 class StorageBackend(ABC):
@@ -77,3 +78,10 @@ def get_storage() -> StorageBackend:
 
 
 storage = get_storage()
+
+
+@job(priority=-10)
+async def delete_stored_files(filenames: list[str]) -> None:
+    """Supprime des fichiers en tâche de fond, une fois leur suppression en base validée."""
+    for filename in filenames:
+        await storage.delete(filename)
@@ -0,0 +1,66 @@
+"""Change tracking for clients: calendar content versions (ETags), delta
+sync tokens and deleted-event tombstones.
+
+A sync token is a pagination cursor over (update_dt, id). update_dt is stamped
+by the application before the transaction commits, so a fresh token is moved
+back by SYNC_OVERLAP: a write that commits late is then picked up by the next
+poll instead of being skipped. Clients may therefore see a change twice.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete, update, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.calendar import Calendar
+from app.models.event import Event, DeletedEvent
+from app.utils.pagination import encode_cursor
+
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def tombstone_cutoff() -> datetime:
+    """Tombstones older than this are purged; tokens older than this are stale."""
+    return _utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+
+
+def new_sync_token(not_before: tuple[datetime, uuid.UUID] | None = None) -> str:
+    """Token covering every change from now on (minus SYNC_OVERLAP).
+
+    not_before keeps tokens monotonic when a client polls faster than the overlap.
+    """
+    key = (_utcnow() - SYNC_OVERLAP, uuid.UUID(int=0))
+    if not_before and not_before > key:
+        key = not_before
+    return encode_cursor(*key)
+
+
+async def bump_content_version(db: AsyncSession, cal_id: uuid.UUID) -> None:
+    """Invalidate the ETags of a calendar's event reads; call on every content write."""
+    await db.execute(
+        update(Calendar)
+        .where(Calendar.id == cal_id)
+        .values(content_version=Calendar.content_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def record_tombstones(db: AsyncSession, *criteria) -> None:
+    """Leave a tombstone for every event matching criteria; call before deleting them."""
+    await db.execute(
+        pg_insert(DeletedEvent)
+        .from_select(
+            ["event_id", "calendar_id", "deleted_at"],
+            select(Event.id, Event.calendar_id, literal(_utcnow())).where(*criteria),
+        )
+        .on_conflict_do_nothing(index_elements=["event_id"])
+    )
+
+
+async def purge_tombstones(db: AsyncSession) -> int:
+    result = await db.execute(delete(DeletedEvent).where(DeletedEvent.deleted_at < tombstone_cutoff()))
+    return result.rowcount
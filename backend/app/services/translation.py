@@ -1,45 +1,432 @@
-import httpx
+"""Text translation through a chain of backends (LibreTranslate, MyMemory, Lingva).
+
+Every translation goes through a translation memory keyed by
+(sha256(text), source, target): an in-process LRU in front of the
+translation_memory table, so that a string like "Réunion" is sent to the
+backend once, ever. Concurrent requests for the same string share one
+in-flight backend call, and backend calls share one pooled HTTP client
+opened in the application lifespan (see app.main). `translate_texts`
+translates many strings at once (a comment thread), with LibreTranslate in
+batched requests.
+
+The given source language is only a hint: texts go through local language
+detection first (app.utils.language), so a text already in the target
+language, or with nothing to translate (a URL, emoji), never reaches the
+backend.
+
+Backends are tried fastest first (latency EWMA), skipping those whose
+circuit breaker is open, within a fast-fail time budget; see _call_chain.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
 from urllib.parse import quote
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.translation import TranslationMemory
+from app.utils.circuit import CircuitBreaker, Ewma
+from app.utils.language import detect_language, has_words
+from app.utils.lru import LRUCache
+from app.utils.throttle import Throttle
+
+logger = logging.getLogger(__name__)
 
 SUPPORTED_LANGS = {"fr", "en", "nl", "de"}
 
+# In-process translation memory bound (per worker)
+MEMORY_CACHE_SIZE = 20_000
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+# Requests per second sent to each backend (the public ones ban bursts)
+BACKEND_RATE_LIMITS = {"libretranslate": 10.0, "mymemory": 1.0, "lingva": 1.0}
+# A backend failing this many times in a row is skipped for BREAKER_COOLDOWN seconds
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+# translate_texts: concurrent backend requests, and texts per LibreTranslate request
+BACKEND_CONCURRENCY = 4
+BATCH_SIZE = 50
+
+MemoryKey = tuple[str, str, str]
+
+memory: LRUCache[str] = LRUCache(MEMORY_CACHE_SIZE)
+_inflight: dict[MemoryKey, asyncio.Task] = {}
+_client: Optional[httpx.AsyncClient] = None
+
+
+def init_http_client() -> None:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=settings.TRANSLATION_TIMEOUT_SECONDS, limits=HTTP_LIMITS)
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def http_client() -> httpx.AsyncClient:
+    """The pooled client (created on first use outside the app lifespan, e.g. in scripts)."""
+    init_http_client()
+    return _client
+
+
+def memory_key(text: str, source: str, target: str) -> MemoryKey:
+    return hashlib.sha256(text.encode()).hexdigest(), source, target
+
+
+class TranslationUnavailable(Exception):
+    """No backend translated the text within the time budget."""
+
+
+async def _libretranslate(texts: list[str], source: str, target: str) -> list[str]:
+    # A list as `q` is answered with a list: one request per batch
+    resp = await http_client().post(
+        f"{settings.LIBRETRANSLATE_URL}/translate",
+        json={"q": texts if len(texts) > 1 else texts[0], "source": source, "target": target, "format": "text"},
+    )
+    resp.raise_for_status()
+    translated = resp.json()["translatedText"]
+    if isinstance(translated, str):
+        translated = [translated]
+    if len(translated) != len(texts):
+        raise Exception("LibreTranslate returned a partial batch")
+    return translated
+
+
+async def _mymemory(text: str, source: str, target: str) -> str:
+    resp = await http_client().get(
+        f"{settings.MYMEMORY_URL}/get",
+        params={"q": text, "langpair": f"{source}|{target}"},
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    # Quota errors come with HTTP 200
+    if data.get("responseStatus") != 200:
+        raise Exception(f"MyMemory error: {data.get('responseDetails')}")
+    return data["responseData"]["translatedText"]
+
+
+async def _lingva(text: str, source: str, target: str) -> str:
+    resp = await http_client().get(f"{settings.LINGVA_URL}/api/v1/{source}/{target}/{quote(text)}")
+    resp.raise_for_status()
+    return resp.json()["translation"]
+
+
+@dataclass
+class Backend:
+    name: str
+    translate: Callable[[str, str, str], Awaitable[str]] | None = None
+    translate_batch: Callable[[list[str], str, str], Awaitable[list[str]]] | None = None
+    throttle: Throttle = field(init=False)
+    breaker: CircuitBreaker = field(default_factory=lambda: CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN))
+    latency: Ewma = field(default_factory=Ewma)
+    calls: int = 0
+    failures: int = 0
+
+    def __post_init__(self):
+        self.throttle = Throttle(BACKEND_RATE_LIMITS[self.name])
+
+    async def call(self, texts: list[str], source: str, target: str) -> list[str]:
+        if self.translate_batch is not None:
+            await self.throttle.wait()
+            return await self.translate_batch(texts, source, target)
+
+        async def one(text: str) -> str:
+            await self.throttle.wait()
+            return await self.translate(text, source, target)
+        return list(await asyncio.gather(*(one(text) for text in texts)))
+
+    def capacity(self, seconds: float) -> Optional[int]:
+        """Texts this backend can translate within seconds (None: any number, in one request)."""
+        if self.translate_batch is not None:
+            return None
+        # One throttled request per text: leave time for the last one to answer
+        return max(1, self.throttle.slots(seconds - (self.latency.value or 0.0)))
+
+
+def _make_backends() -> dict[str, Backend]:
+    return {
+        "libretranslate": Backend("libretranslate", translate_batch=_libretranslate),
+        "mymemory": Backend("mymemory", translate=_mymemory),
+        "lingva": Backend("lingva", translate=_lingva),
+    }
+
+
+_backends = _make_backends()
+
+
+def backend_chain() -> list[Backend]:
+    """Configured backends, in order of preference."""
+    names = [n.strip() for n in settings.TRANSLATION_BACKENDS.split(",") if n.strip()]
+    chain = [_backends[n] for n in dict.fromkeys(names or [settings.TRANSLATION_BACKEND]) if n in _backends]
+    return chain or [_backends["libretranslate"]]
+
+
+def _ranked() -> list[Backend]:
+    """Usable backends, fastest first (unmeasured ones first, to measure them; ties in chain order)."""
+    chain = backend_chain()
+    usable = [b for b in chain if b.breaker.state != "open"]
+    return sorted(usable, key=lambda b: b.latency.value or 0.0)
+
+
+async def _attempt(backend: Backend, texts: list[str], source: str, target: str) -> list[str]:
+    backend.calls += 1
+    start = time.monotonic()
+    try:
+        translated = await backend.call(texts, source, target)
+    except asyncio.CancelledError:
+        # Lost a hedge, or ran out of budget (counted by the caller)
+        backend.breaker.release()
+        raise
+    except Exception:
+        backend.failures += 1
+        backend.breaker.failure()
+        raise
+    backend.breaker.success()
+    backend.latency.add(time.monotonic() - start)
+    return translated
+
+
+async def _call_chain(texts: list[str], source: str, target: str, partial: bool = False) -> list[str]:
+    """Translate through the fastest healthy backend, failing over to the next ones.
+
+    The whole call, failovers included, is bounded by TRANSLATION_TIMEOUT_SECONDS.
+    With TRANSLATION_HEDGE_AFTER_SECONDS set, a backend slower than that gets a
+    concurrent (hedged) request to the next backend, and the first answer wins.
+
+    With partial, a backend without batch API (rate limited to one text per
+    request) is only sent the first texts it can translate within the budget,
+    and the translations of that prefix are returned.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + settings.TRANSLATION_TIMEOUT_SECONDS
+    hedge_after = settings.TRANSLATION_HEDGE_AFTER_SECONDS
+    candidates = iter(_ranked())
+    running: dict[asyncio.Task, Backend] = {}
+
+    def launch() -> None:
+        for backend in candidates:
+            if backend.breaker.allow():
+                sent = texts
+                if partial:
+                    sent = texts[:backend.capacity(deadline - loop.time())]
+                running[asyncio.create_task(_attempt(backend, sent, source, target))] = backend
+                return
+
+    launch()
+    try:
+        while running:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(
+                running, timeout=min(remaining, hedge_after) if hedge_after > 0 else remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                if hedge_after > 0:
+                    launch()
+                continue
+            for task in done:
+                backend = running.pop(task)
+                if task.exception() is None:
+                    for loser in running:
+                        loser.cancel()
+                    running.clear()
+                    return task.result()
+                logger.warning("Translation backend %s failed: %r", backend.name, task.exception())
+            if not running:
+                launch()
+    finally:
+        for task, backend in running.items():
+            if not task.done():
+                # Out of budget: as bad as a failure, and as slow as the budget
+                backend.failures += 1
+                backend.breaker.failure()
+                backend.latency.add(loop.time() - start)
+                task.cancel()
+    raise TranslationUnavailable(f"No translation backend answered ({source} -> {target})")
+
+
+async def _call_backend(text: str, source: str, target: str) -> str:
+    return (await _call_chain([text], source, target))[0]
+
+
+async def _call_backend_many(texts: list[str], source: str, target: str) -> list[str]:
+    """Backend calls for many texts, BACKEND_CONCURRENCY requests at a time."""
+    ranked = _ranked()
+    # Batches only help a backend with a batch API
+    size = BATCH_SIZE if ranked and ranked[0].translate_batch is not None else 1
+    chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+    semaphore = asyncio.Semaphore(BACKEND_CONCURRENCY)
+
+    async def limited(chunk: list[str]) -> list[str]:
+        translated: list[str] = []
+        while len(translated) < len(chunk):
+            # A failover to a slower backend may only translate part of the chunk
+            async with semaphore:
+                translated += await _call_chain(chunk[len(translated):], source, target, partial=True)
+        return translated
+
+    results = await asyncio.gather(*(limited(chunk) for chunk in chunks))
+    return [translated for chunk in results for translated in chunk]
+
+
+def backend_stats() -> dict:
+    return {
+        b.name: {
+            "state": b.breaker.state,
+            "latency_ms": round(b.latency.value * 1000) if b.latency.value is not None else None,
+            "calls": b.calls,
+            "failures": b.failures,
+        }
+        for b in backend_chain()
+    }
+
+
+async def _load(key: MemoryKey) -> Optional[str]:
+    text_hash, source, target = key
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(TranslationMemory.translated).where(
+                    TranslationMemory.text_hash == text_hash,
+                    TranslationMemory.source == source,
+                    TranslationMemory.target == target,
+                )
+            )
+            return result.scalar_one_or_none()
+    except Exception:
+        # The table is only a cache: translate anyway
+        logger.exception("Translation memory lookup failed")
+        return None
+
+
+async def _load_many(keys: list[MemoryKey]) -> dict[MemoryKey, str]:
+    if not keys:
+        return {}
+    _, source, target = keys[0]
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(TranslationMemory.text_hash, TranslationMemory.translated).where(
+                    TranslationMemory.text_hash.in_([text_hash for text_hash, _, _ in keys]),
+                    TranslationMemory.source == source,
+                    TranslationMemory.target == target,
+                )
+            )
+            return {(text_hash, source, target): translated for text_hash, translated in result.all()}
+    except Exception:
+        logger.exception("Translation memory lookup failed")
+        return {}
+
+
+async def _store(key: MemoryKey, translated: str) -> None:
+    await _store_many({key: translated})
+
+
+async def _store_many(translations: dict[MemoryKey, str]) -> None:
+    if not translations:
+        return
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                pg_insert(TranslationMemory)
+                .values([
+                    {"text_hash": text_hash, "source": source, "target": target, "translated": translated}
+                    for (text_hash, source, target), translated in translations.items()
+                ])
+                .on_conflict_do_nothing()
+            )
+            await session.commit()
+    except Exception:
+        logger.exception("Translation memory store failed")
+
+
+async def _translate(key: MemoryKey, text: str, source: str, target: str) -> str:
+    translated = await _load(key)
+    if translated is None:
+        translated = await _call_backend(text, source, target)
+        await _store(key, translated)
+    memory.set(key, translated)
+    return translated
+
+
+def source_language(text: str, hint: str) -> str:
+    """Language of text: hint, unless detection clearly says otherwise."""
+    return detect_language(text, hint) or hint
+
 
 async def translate_text(text: str, source: str, target: str) -> str:
-    """Translate text using configured backend (LibreTranslate or MyMemory)."""
+    """Translate text, from the translation memory when it was translated before."""
     if not text or not text.strip():
         return ""
+    if not has_words(text):
+        return text
+    source = source_language(text, source)
+    if source == target:
+        return text
 
-    backend = settings.TRANSLATION_BACKEND
+    key = memory_key(text, source, target)
+    translated = memory.get(key)
+    if translated is not None:
+        return translated
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        if backend == "mymemory":
-            resp = await client.get(
-                "https://api.mymemory.translated.net/get",
-                params={"q": text, "langpair": f"{source}|{target}"},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            if data.get("responseStatus") != 200:
-                raise Exception(f"MyMemory error: {data.get('responseDetails')}")
-            return data["responseData"]["translatedText"]
-        elif backend == "lingva":
-            encoded = quote(text)
-            resp = await client.get(
-                f"https://lingva.ml/api/v1/{source}/{target}/{encoded}",
-            )
-            resp.raise_for_status()
-            return resp.json()["translation"]
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_translate(key, text, source, target))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # A caller giving up (client disconnect) must not cancel the others' call
+    return await asyncio.shield(task)
+
+
+async def translate_texts(texts: list[str], source: str, target: str) -> list[str]:
+    """translate_text for many texts, in as few backend requests as possible."""
+    found: dict[str, str] = {}
+    by_source: dict[str, list[str]] = {}
+    for text in dict.fromkeys(texts):
+        if not text or not text.strip():
+            found[text] = ""
+            continue
+        text_source = source_language(text, source) if has_words(text) else target
+        if text_source == target:
+            found[text] = text
         else:
-            # Default: LibreTranslate (local Docker or self-hosted)
-            resp = await client.post(
-                f"{settings.LIBRETRANSLATE_URL}/translate",
-                json={
-                    "q": text,
-                    "source": source,
-                    "target": target,
-                    "format": "text",
-                },
-            )
-            resp.raise_for_status()
-            return resp.json()["translatedText"]
+            by_source.setdefault(text_source, []).append(text)
+    for text_source, group in by_source.items():
+        found.update(await _translate_many(group, text_source, target))
+    return [found[text] for text in texts]
+
+
+async def _translate_many(texts: list[str], source: str, target: str) -> dict[str, str]:
+    keys = {text: memory_key(text, source, target) for text in texts}
+    found: dict[str, str] = {}
+    for text, key in keys.items():
+        translated = memory.get(key)
+        if translated is not None:
+            found[text] = translated
+
+    missing = [text for text in keys if text not in found]
+    stored = await _load_many([keys[text] for text in missing])
+    for text in missing:
+        if keys[text] in stored:
+            found[text] = stored[keys[text]]
+
+    missing = [text for text in missing if text not in found]
+    if missing:
+        translated = await _call_backend_many(missing, source, target)
+        found.update(zip(missing, translated))
+        await _store_many({keys[text]: found[text] for text in missing})
+
+    for text, translated in found.items():
+        memory.set(keys[text], translated)
+    return found
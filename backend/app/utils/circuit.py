@@ -0,0 +1,66 @@
+"""Health tracking of external services: circuit breaker and latency average."""
+import time
+from typing import Callable, Optional
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service for a while.
+
+    Closed: calls go through. After `threshold` consecutive failures the
+    circuit opens: calls are refused for `cooldown` seconds. Then it is
+    half-open: one trial call goes through, and its outcome closes the circuit
+    or opens it again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may be made now (reserves the trial call when half-open)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def release(self) -> None:
+        """Give the trial call back, when it was abandoned without an outcome."""
+        self._trial = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self._trial or self.failures >= self.threshold:
+            self._opened_at = self._clock()
+        self._trial = False
+
+
+class Ewma:
+    """Exponentially weighted moving average (e.g. of call latency)."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def add(self, sample: float) -> None:
+        self.value = sample if self.value is None else self.alpha * sample + (1 - self.alpha) * self.value
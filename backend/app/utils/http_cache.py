@@ -0,0 +1,70 @@
+"""Conditional GET (ETag / If-None-Match) helpers."""
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+# Clients may store the response but must revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag derived from parts (e.g. calendar id, content version, permission)."""
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def query_key(request: Request) -> str:
+    """Order-independent representation of the query string."""
+    return "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    if not if_modified_since:
+        return True
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        return True
+    return last_modified > since
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """Return a 304 response if the client already holds this representation.
+
+    If-Modified-Since is only considered when the request has no If-None-Match.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        fresh = etag_matches(if_none_match, etag)
+    elif last_modified is not None:
+        fresh = not modified_since(request.headers.get("if-modified-since"), last_modified)
+    else:
+        fresh = False
+    if fresh:
+        response = Response(status_code=304)
+        set_etag(response, etag, last_modified)
+        return response
+    return None
+
+
+def set_etag(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
@@ -1,43 +1,298 @@
-from datetime import datetime, timedelta, timezone
-from icalendar import Calendar as ICalendar, Event as ICalEvent, vRecur
+"""iCalendar (RFC 5545) export and import.
+
+VEVENTs are written as text directly from event rows instead of building
+icalendar objects: property order, escaping and line folding follow what
+icalendar would produce, and the tests use icalendar as the oracle. Imports
+are read incrementally with VEventParser.
+"""
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from app.models.event import Event
 
 
+CALENDAR_HEADER = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Agenda Souterrain//FR\r\n"
+CALENDAR_FOOTER = b"END:VCALENDAR\r\n"
+
+# Content lines are folded at 75 octets (74 + the leading space of the continuation)
+FOLD_LIMIT = 74
+
+# RRULE parts are written in this order, then any other part alphabetically
+RRULE_ORDER = (
+    "RSCALE", "FREQ", "UNTIL", "COUNT", "INTERVAL", "BYSECOND", "BYMINUTE", "BYHOUR",
+    "BYDAY", "BYWEEKDAY", "BYMONTHDAY", "BYYEARDAY", "BYWEEKNO", "BYMONTH", "BYSETPOS",
+    "WKST", "SKIP",
+)
+_RRULE_RANK = {key: i for i, key in enumerate(RRULE_ORDER)}
+
+
 def event_to_ical(event: Event) -> bytes:
-    cal = ICalendar()
-    cal.add("prodid", "-//Agenda Souterrain//FR")
-    cal.add("version", "2.0")
-    _add_event(cal, event)
-    return cal.to_ical()
+    return events_to_ical([event])
+
 
+def events_to_ical(events: Iterable[Event]) -> bytes:
+    return b"".join(iter_ical(events))
 
-def events_to_ical(events: list[Event]) -> bytes:
-    cal = ICalendar()
-    cal.add("prodid", "-//Agenda Souterrain//FR")
-    cal.add("version", "2.0")
+
+def iter_ical(events: Iterable[Event]) -> Iterator[bytes]:
+    """Yield a VCALENDAR chunk by chunk: the header, one VEVENT per event, the footer."""
+    dtstamp = format_dtstamp()
+    yield CALENDAR_HEADER
     for event in events:
-        _add_event(cal, event)
-    return cal.to_ical()
+        yield vevent_to_ical(event, dtstamp)
+    yield CALENDAR_FOOTER
+
+
+def format_dtstamp(now: Optional[datetime] = None) -> str:
+    now = now or datetime.now(timezone.utc)
+    return _format_datetime(now)
 
 
-def _add_event(cal: ICalendar, event: Event) -> None:
-    ical_event = ICalEvent()
-    ical_event.add("uid", str(event.id))
-    ical_event.add("summary", event.title)
+def vevent_to_ical(event: Event, dtstamp: Optional[str] = None) -> bytes:
+    """Serialize a single VEVENT block."""
+    lines = ["BEGIN:VEVENT", "SUMMARY:" + escape_text(event.title)]
     if event.all_day:
-        ical_event.add("dtstart", event.start_dt.date())
-        end_date = event.end_dt.date() if event.end_dt.date() > event.start_dt.date() else event.start_dt.date()
-        ical_event.add("dtend", (end_date + timedelta(days=1)))
+        start = event.start_dt.date()
+        end = max(event.end_dt.date(), start) + timedelta(days=1)
+        lines.append("DTSTART;VALUE=DATE:" + _format_date(start))
+        lines.append("DTEND;VALUE=DATE:" + _format_date(end))
     else:
-        ical_event.add("dtstart", event.start_dt)
-        ical_event.add("dtend", event.end_dt)
-    if event.location:
-        ical_event.add("location", event.location)
+        lines.append("DTSTART:" + _format_datetime(event.start_dt))
+        lines.append("DTEND:" + _format_datetime(event.end_dt))
+    lines.append("DTSTAMP:" + (dtstamp or format_dtstamp()))
+    lines.append("UID:" + escape_text(str(event.id)))
+    if event.rrule:
+        lines.append("RRULE:" + normalize_rrule(event.rrule))
     if event.notes:
-        ical_event.add("description", event.notes)
+        lines.append("DESCRIPTION:" + escape_text(event.notes))
     if event.latitude is not None and event.longitude is not None:
-        ical_event.add("geo", (event.latitude, event.longitude))
-    if event.rrule:
-        ical_event.add("rrule", vRecur.from_ical(event.rrule))
-    ical_event.add("dtstamp", datetime.now(timezone.utc))
-    cal.add_component(ical_event)
+        lines.append(f"GEO:{event.latitude};{event.longitude}")
+    if event.location:
+        lines.append("LOCATION:" + escape_text(event.location))
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) + "\r\n" for line in lines).encode("utf-8")
+
+
+def escape_text(text: str) -> str:
+    """Escape a TEXT value (RFC 5545 §3.3.11)."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line so that no physical line exceeds 75 octets."""
+    if len(line) <= FOLD_LIMIT:
+        return line
+    if line.isascii():
+        return "\r\n ".join(line[i:i + FOLD_LIMIT] for i in range(0, len(line), FOLD_LIMIT))
+    # Never split inside a multi-byte UTF-8 sequence
+    out = []
+    size = 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        size += width
+        if size > FOLD_LIMIT:
+            out.append("\r\n ")
+            size = width
+        out.append(char)
+    return "".join(out)
+
+
+def normalize_rrule(rrule: str) -> str:
+    """Write RRULE parts in canonical order (FREQ first)."""
+    parts = []
+    for part in rrule.strip().removeprefix("RRULE:").split(";"):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            parts.append((key.strip().upper(), value.strip()))
+    parts.sort(key=lambda kv: (_RRULE_RANK.get(kv[0], len(RRULE_ORDER)), kv[0]))
+    return ";".join(f"{key}={value}" for key, value in parts)
+
+
+def _format_date(d: date) -> str:
+    return f"{d.year:04}{d.month:02}{d.day:02}"
+
+
+def _format_datetime(dt: datetime) -> str:
+    suffix = ""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+        suffix = "Z"
+    return f"{dt.year:04}{dt.month:02}{dt.day:02}T{dt.hour:02}{dt.minute:02}{dt.second:02}{suffix}"
+
+
+# ─── Import ────────────────────────────────────────────────────────────────────
+
+_UNESCAPE = re.compile(r"\\([\\;,nN])")
+_DURATION = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+
+# A parsed VEVENT: property name -> (parameters, raw value), first occurrence only
+VEvent = dict[str, tuple[dict[str, str], str]]
+
+
+class VEventParser:
+    """
+    Incremental iCalendar reader: feed() text as it arrives and get back the
+    VEVENTs completed so far, so an upload never has to be held in memory.
+    Properties of nested components (VALARM...) are ignored.
+    """
+
+    def __init__(self):
+        self._tail = ""
+        self._line: Optional[str] = None  # logical line being unfolded
+        self._stack: list[str] = []
+        self._event: Optional[VEvent] = None
+
+    def feed(self, text: str) -> list[VEvent]:
+        lines = (self._tail + text).split("\n")
+        self._tail = lines.pop()
+        return self._consume(lines)
+
+    def close(self) -> list[VEvent]:
+        events = self._consume([self._tail] if self._tail else [])
+        self._tail = ""
+        if self._line is not None:
+            self._handle(self._line, events)
+            self._line = None
+        return events
+
+    def _consume(self, lines: list[str]) -> list[VEvent]:
+        events: list[VEvent] = []
+        for raw in lines:
+            line = raw.rstrip("\r")
+            if line[:1] in (" ", "\t"):
+                if self._line is not None:
+                    self._line += line[1:]
+                continue
+            if self._line is not None:
+                self._handle(self._line, events)
+            self._line = line or None
+        return events
+
+    def _handle(self, line: str, events: list[VEvent]) -> None:
+        parsed = parse_content_line(line)
+        if parsed is None:
+            return
+        name, params, value = parsed
+        if name == "BEGIN":
+            self._stack.append(value.upper())
+            if value.upper() == "VEVENT":
+                self._event = {}
+        elif name == "END":
+            if self._stack:
+                self._stack.pop()
+            if value.upper() == "VEVENT" and self._event is not None:
+                events.append(self._event)
+                self._event = None
+        elif self._event is not None and self._stack and self._stack[-1] == "VEVENT":
+            self._event.setdefault(name, (params, value))
+
+
+def parse_content_line(line: str) -> Optional[tuple[str, dict[str, str], str]]:
+    """Split `NAME;PARAM=V;...:value` (quoted parameter values may hold ':' and ';')."""
+    in_quotes = False
+    parts: list[str] = []
+    start = 0
+    for i, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif not in_quotes and char in ";:":
+            parts.append(line[start:i])
+            start = i + 1
+            if char == ":":
+                params = {}
+                for param in parts[1:]:
+                    key, _, val = param.partition("=")
+                    params[key.upper()] = val.strip('"')
+                return parts[0].upper(), params, line[start:]
+    return None
+
+
+def unescape_text(value: str) -> str:
+    return _UNESCAPE.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def parse_date_value(params: dict[str, str], value: str) -> tuple[datetime, bool]:
+    """DATE or DATE-TIME as a naive UTC datetime, plus whether it was a DATE.
+
+    Floating times are kept as is; times with an unknown TZID are treated as floating.
+    """
+    value = value.strip()
+    if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d"), True
+    dt = datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return dt, False
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            tz = ZoneInfo(tzid)
+        except (ZoneInfoNotFoundError, ValueError):
+            return dt, False
+        return dt.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None), False
+    return dt, False
+
+
+def parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.strip().upper())
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0),
+        hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0),
+    )
+    return -delta if sign == "-" else delta
+
+
+def vevent_to_fields(vevent: VEvent) -> dict:
+    """Map a parsed VEVENT onto Event columns. Raises ValueError if unusable."""
+    if "DTSTART" not in vevent:
+        raise ValueError("VEVENT without DTSTART")
+    start, all_day = parse_date_value(*vevent["DTSTART"])
+    if "DTEND" in vevent:
+        end, _ = parse_date_value(*vevent["DTEND"])
+    elif "DURATION" in vevent:
+        end = start + parse_duration(vevent["DURATION"][1])
+    else:
+        end = start + timedelta(days=1) if all_day else start
+    if all_day:
+        # DTEND of a DATE event is exclusive; Event.end_dt holds the last day
+        end -= timedelta(days=1)
+    end = max(end, start)
+
+    fields = {
+        "ical_uid": vevent["UID"][1].strip()[:255] if "UID" in vevent else None,
+        "title": unescape_text(vevent.get("SUMMARY", ({}, ""))[1]).strip()[:500] or "Sans titre",
+        "start_dt": start,
+        "end_dt": end,
+        "all_day": all_day,
+        "location": None,
+        "latitude": None,
+        "longitude": None,
+        "notes": None,
+        "rrule": None,
+    }
+    if "LOCATION" in vevent:
+        fields["location"] = unescape_text(vevent["LOCATION"][1])[:500] or None
+    if "DESCRIPTION" in vevent:
+        fields["notes"] = unescape_text(vevent["DESCRIPTION"][1])[:10000] or None
+    if "GEO" in vevent:
+        try:
+            lat, lng = (float(v) for v in vevent["GEO"][1].split(";"))
+        except ValueError:
+            lat = lng = None
+        if lat is not None and -90 <= lat <= 90 and -180 <= lng <= 180:
+            fields["latitude"], fields["longitude"] = lat, lng
+    if "RRULE" in vevent:
+        fields["rrule"] = normalize_rrule(vevent["RRULE"][1])[:500] or None
+    return fields
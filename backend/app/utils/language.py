@@ -0,0 +1,96 @@
+"""Offline language identification, run before calling a translation backend.
+
+A character n-gram model (1 to 3 characters, words padded with spaces) is
+built at import from the sample texts in language_samples/, one per
+supported language. A text is scored by smoothed log-likelihood under each
+model; a language is only returned when it wins by a clear margin, so short
+or ambiguous texts ("Concert", "Pizza party") keep the caller's guess.
+
+The samples are small, so short titles are often misread ("Movie night" looks
+Dutch). When the caller knows the text's language, that hint is a prior: it
+is only overridden for long texts that score far better in another language.
+"""
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, Optional
+
+SAMPLES_DIR = Path(__file__).parent / "language_samples"
+NGRAM_SIZES = (1, 2, 3)
+# Shorter texts are not worth a guess
+MIN_LETTERS = 10
+# Minimum average log-likelihood gap per n-gram between the two best languages
+MIN_MARGIN = 0.08
+# Overriding a hint takes a longer text and a much wider gap to the hint's score
+OVERRIDE_LETTERS = 30
+OVERRIDE_MARGIN = 0.3
+
+_URL = re.compile(r"(?:https?://|www\.)\S+|[\w.+-]+@[\w-]+\.[\w.]+", re.IGNORECASE)
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def words(text: str) -> list[str]:
+    """Lowercase words of text, URLs and email addresses left out."""
+    return _WORD.findall(_URL.sub(" ", text).lower())
+
+
+def has_words(text: str) -> bool:
+    """False for texts with nothing to translate (only URLs, emoji, numbers, punctuation)."""
+    return bool(words(text))
+
+
+def _ngrams(text_words: list[str]) -> Iterator[str]:
+    for word in text_words:
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                if gram != " ":
+                    yield gram
+
+
+class _Model:
+    def __init__(self, sample: str):
+        self.counts = Counter(_ngrams(words(sample)))
+        self.total = sum(self.counts.values())
+
+    def log_likelihood(self, grams: list[str], vocabulary: int) -> float:
+        denominator = math.log(self.total + vocabulary)
+        return sum(math.log(self.counts.get(g, 0) + 1) - denominator for g in grams)
+
+
+def _load_models() -> dict[str, _Model]:
+    return {
+        path.stem: _Model(path.read_text(encoding="utf-8"))
+        for path in sorted(SAMPLES_DIR.glob("*.txt"))
+    }
+
+
+_models = _load_models()
+_vocabulary = len(set().union(*(m.counts for m in _models.values())))
+
+
+def detect_language(text: str, hint: Optional[str] = None) -> Optional[str]:
+    """Language code of text, or None when too short or ambiguous to tell.
+
+    With a supported hint, returns the hint unless the text is long enough
+    and clearly in another language.
+    """
+    if hint not in _models:
+        hint = None
+    text_words = words(text)
+    letters = sum(len(w) for w in text_words)
+    if letters < (OVERRIDE_LETTERS if hint else MIN_LETTERS):
+        return hint
+    grams = list(_ngrams(text_words))
+    scores = {lang: m.log_likelihood(grams, _vocabulary) for lang, m in _models.items()}
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    best = ranked[0]
+    if hint:
+        if (scores[best] - scores[hint]) / len(grams) < OVERRIDE_MARGIN:
+            return hint
+        return best
+    if (scores[best] - scores[ranked[1]]) / len(grams) < MIN_MARGIN:
+        return None
+    return best
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """In-process cache evicting the least recently used entry beyond max_entries.
+
+    With max_bytes and sizeof, entries are also evicted while their total
+    size exceeds max_bytes; a value larger than max_bytes is not cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._data: OrderedDict[Hashable, V] = OrderedDict()
+        self.total_bytes = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self.pop(key)
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._data[key] = value
+        self.total_bytes += size
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes
+        ):
+            _, evicted = self._data.popitem(last=False)
+            self.total_bytes -= self._sizeof(evicted)
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        value = self._data.pop(key, None)
+        if value is not None:
+            self.total_bytes -= self._sizeof(value)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
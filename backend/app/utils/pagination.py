@@ -0,0 +1,61 @@
+"""Keyset (cursor) pagination on (start_dt, id), or (rank, id) for search results.
+
+Cursors are opaque to clients: base64url-encoded JSON of the sort key of the
+last row of the previous page.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from sqlalchemy import tuple_, and_, or_
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(start_dt: datetime, row_id: uuid.UUID) -> str:
+    raw = json.dumps([start_dt.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Raises ValueError on a malformed cursor.
+
+    Cursors hold naive UTC datetimes, like the columns they are compared to;
+    a timezone-aware one was not issued by us and is rejected.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start, row_id = json.loads(raw)
+        start_dt = datetime.fromisoformat(start)
+        if start_dt.tzinfo is not None:
+            raise ValueError("timezone-aware cursor")
+        return start_dt, uuid.UUID(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+def after_cursor(start_col, id_col, cursor: tuple[datetime, uuid.UUID]):
+    """Row-value predicate selecting rows strictly after the cursor in (start_dt, id) order."""
+    return tuple_(start_col, id_col) > tuple_(*cursor)
+
+
+def encode_rank_cursor(rank: float, row_id: uuid.UUID) -> str:
+    raw = json.dumps([rank, str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, uuid.UUID]:
+    """Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, row_id = json.loads(raw)
+        return float(rank), uuid.UUID(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+def after_rank_cursor(rank_col, id_col, cursor: tuple[float, uuid.UUID]):
+    """Rows strictly after the cursor in (rank DESC, id) order."""
+    rank, row_id = cursor
+    return or_(rank_col < rank, and_(rank_col == rank, id_col > row_id))
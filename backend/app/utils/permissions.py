@@ -1,7 +1,10 @@
+import time
 import uuid
-from typing import Optional
+from typing import NamedTuple, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+from sqlalchemy import select, or_, event, exists, union, union_all, case, func, null
+from app.config import settings
 from app.models.access import Permission, CalendarAccess, AccessLink, group_members
 from app.models.calendar import Calendar
 from app.models.user import User
@@ -51,6 +54,143 @@ def is_admin(p: Permission) -> bool:
     return p == Permission.ADMINISTRATOR
 
 
+# ─── Permission cache ──────────────────────────────────────────────────────────
+
+_CacheKey = tuple[uuid.UUID, Optional[uuid.UUID], Optional[str], Optional[uuid.UUID]]
+
+
+class ResolvedAccess(NamedTuple):
+    calendar_exists: bool
+    is_owner: bool
+    permission: Permission
+
+
+# Session.info keys: per-request results and calendars invalidated by this session
+_REQUEST_CACHE_KEY = "effective_permissions"
+_PENDING_KEY = "invalidated_permission_calendars"
+
+
+class PermissionCache:
+    """
+    Process-wide TTL cache of resolved permissions.
+
+    Entries are grouped by calendar so that a sharing write can drop all of a
+    calendar's entries at once. Each calendar also has a generation counter:
+    a lookup that started before an invalidation is not stored, so a read racing
+    a write cannot put the old permission back in the cache.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[uuid.UUID, dict[_CacheKey, tuple[float, ResolvedAccess]]] = {}
+        self._generations: dict[uuid.UUID, int] = {}
+        self._epoch = 0
+        self._size = 0
+        self.hits = 0
+        self.request_hits = 0
+        self.misses = 0
+
+    def generation(self, calendar_id: uuid.UUID) -> tuple[int, int]:
+        return self._epoch, self._generations.get(calendar_id, 0)
+
+    def get(self, key: _CacheKey) -> Optional[ResolvedAccess]:
+        entry = self._entries.get(key[0], {}).get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def set(self, key: _CacheKey, access: ResolvedAccess, generation: tuple[int, int]) -> None:
+        if self.ttl <= 0 or generation != self.generation(key[0]):
+            return
+        if self._size >= self.max_entries:
+            self._entries.clear()
+            self._size = 0
+        bucket = self._entries.setdefault(key[0], {})
+        if key not in bucket:
+            self._size += 1
+        bucket[key] = (time.monotonic() + self.ttl, access)
+
+    def invalidate(self, calendar_id: Optional[uuid.UUID] = None) -> None:
+        """Drop entries for calendar_id, or for every calendar if None."""
+        if calendar_id is None:
+            self._epoch += 1
+            self._entries.clear()
+            self._size = 0
+            return
+        self._generations[calendar_id] = self._generations.get(calendar_id, 0) + 1
+        self._size -= len(self._entries.pop(calendar_id, {}))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.request_hits + self.misses
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "request_hits": self.request_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.request_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+permission_cache = PermissionCache(ttl=settings.PERMISSION_CACHE_TTL_SECONDS)
+
+
+def invalidate_permissions(db: AsyncSession, calendar_id: Optional[uuid.UUID] = None) -> None:
+    """
+    Forget cached permissions for calendar_id (every calendar if None).
+
+    Call after any write to grants, links, groups or memberships. Entries are
+    dropped now and once more when db commits, since other requests may read
+    the old rows until then.
+    """
+    db.info.pop(_REQUEST_CACHE_KEY, None)
+    db.info.setdefault(_PENDING_KEY, set()).add(calendar_id)
+    permission_cache.invalidate(calendar_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    for calendar_id in session.info.pop(_PENDING_KEY, ()):
+        permission_cache.invalidate(calendar_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def resolve_access(
+    db: AsyncSession,
+    calendar_id: uuid.UUID,
+    user: Optional[User] = None,
+    link_token: Optional[str] = None,
+    sub_calendar_id: Optional[uuid.UUID] = None,
+) -> ResolvedAccess:
+    """
+    Calendar existence, owner flag and highest permission for this caller.
+
+    Results are memoized for the request (on the session) and across requests
+    (permission_cache); a hit issues no query, a miss issues exactly one.
+    """
+    key = (calendar_id, user.id if user else None, link_token, sub_calendar_id)
+    request_cache: dict = db.info.setdefault(_REQUEST_CACHE_KEY, {})
+    if key in request_cache:
+        permission_cache.request_hits += 1
+        return request_cache[key]
+    access = permission_cache.get(key)
+    if access is None:
+        generation = permission_cache.generation(calendar_id)
+        row = (await db.execute(access_query(*key))).one()
+        access = _to_access(row, user)
+        # Rows written by this session are not committed yet: keep them request-local
+        if _PENDING_KEY not in db.info:
+            permission_cache.set(key, access, generation)
+    request_cache[key] = access
+    return access
+
+
 async def get_effective_permission(
     db: AsyncSession,
     calendar_id: uuid.UUID,
@@ -58,65 +198,95 @@ async def get_effective_permission(
     link_token: Optional[str] = None,
     sub_calendar_id: Optional[uuid.UUID] = None,
 ) -> Permission:
+    """Returns the highest applicable permission for this caller on this calendar."""
+    access = await resolve_access(db, calendar_id, user, link_token, sub_calendar_id)
+    return access.permission
+
+
+def access_query(
+    calendar_id: uuid.UUID,
+    user_id: Optional[uuid.UUID] = None,
+    link_token: Optional[str] = None,
+    sub_calendar_id: Optional[uuid.UUID] = None,
+):
     """
-    Returns the highest applicable permission for this caller on this calendar.
-    Optimized: 2-3 queries instead of 4-6.
+    One statement returning (calendar_exists, owner_id, level).
+
+    level is the highest PERMISSION_ORDER index among the caller's direct,
+    group and link grants (NULL if none). Each source is a CTE so that the
+    whole resolution is a single round trip.
     """
+    cal = select(Calendar.owner_id).where(Calendar.id == calendar_id).cte("cal")
+
     # Sub-calendar scope filter
     sc_filter = or_(
         CalendarAccess.sub_calendar_id == None,  # noqa: E711
         CalendarAccess.sub_calendar_id == sub_calendar_id,
     )
-
-    perms: list[Permission] = []
-
-    # Query 1: Owner check + all user-based permissions (direct + group) in one query
-    if user:
-        # Owner check
-        cal_result = await db.execute(
-            select(Calendar.owner_id).where(Calendar.id == calendar_id)
-        )
-        owner_id = cal_result.scalar_one_or_none()
-        if owner_id == user.id:
-            return Permission.ADMINISTRATOR
-
-        # Single query: direct user grants + group-based grants via subquery
-        group_ids_subq = (
-            select(group_members.c.group_id)
-            .where(group_members.c.user_id == user.id)
-            .correlate_except(group_members)
-            .scalar_subquery()
-        )
-
-        result = await db.execute(
+    sources = []
+    if user_id:
+        # Direct user grants + group-based grants
+        user_groups = select(group_members.c.group_id).where(group_members.c.user_id == user_id)
+        sources.append(
             select(CalendarAccess.permission).where(
                 CalendarAccess.calendar_id == calendar_id,
                 sc_filter,
                 or_(
-                    CalendarAccess.user_id == user.id,
-                    CalendarAccess.group_id.in_(group_ids_subq),
+                    CalendarAccess.user_id == user_id,
+                    CalendarAccess.group_id.in_(user_groups),
                 ),
-            )
+            ).cte("user_grants")
         )
-        perms.extend(result.scalars().all())
-
-    # Query 2 (only if link_token): link-based permissions
     if link_token:
-        link_result = await db.execute(
-            select(AccessLink).where(
+        sources.append(
+            select(CalendarAccess.permission)
+            .join(AccessLink, AccessLink.id == CalendarAccess.link_id)
+            .where(
                 AccessLink.token == link_token,
                 AccessLink.active == True,  # noqa: E712
                 AccessLink.calendar_id == calendar_id,
-            )
+                sc_filter,
+            ).cte("link_grants")
         )
-        link = link_result.scalar_one_or_none()
-        if link:
-            result = await db.execute(
-                select(CalendarAccess.permission).where(
-                    CalendarAccess.link_id == link.id,
-                    sc_filter,
-                )
-            )
-            perms.extend(result.scalars().all())
-
-    return highest_permission(perms)
+
+    columns = [
+        exists(select(cal.c.owner_id)).label("calendar_exists"),
+        select(cal.c.owner_id).scalar_subquery().label("owner_id"),
+    ]
+    if sources:
+        grants = union_all(*(select(src.c.permission) for src in sources)).subquery("grants")
+        level = case(*((grants.c.permission == p, i) for i, p in enumerate(PERMISSION_ORDER)))
+        columns.append(select(func.max(level)).scalar_subquery().label("level"))
+    else:
+        columns.append(null().label("level"))
+    return select(*columns)
+
+
+def readable_calendars(user_id: uuid.UUID, minimum: Permission = Permission.READ_ONLY):
+    """
+    Calendar ids the user may read everything in (calendar-wide permission of
+    at least minimum): owned calendars plus direct and group grants, the union
+    list_accessible_calendars shows. Meant to be joined, not executed alone.
+    """
+    user_groups = select(group_members.c.group_id).where(group_members.c.user_id == user_id)
+    level = case(*((CalendarAccess.permission == p, i) for i, p in enumerate(PERMISSION_ORDER)))
+    granted = (
+        select(CalendarAccess.calendar_id.label("calendar_id"))
+        .where(
+            CalendarAccess.sub_calendar_id == None,  # noqa: E711
+            or_(CalendarAccess.user_id == user_id, CalendarAccess.group_id.in_(user_groups)),
+        )
+        .group_by(CalendarAccess.calendar_id)
+        .having(func.max(level) >= permission_level(minimum))
+    )
+    owned = select(Calendar.id.label("calendar_id")).where(Calendar.owner_id == user_id)
+    return union(owned, granted)
+
+
+def _to_access(row, user: Optional[User]) -> ResolvedAccess:
+    if not row.calendar_exists:
+        return ResolvedAccess(False, False, Permission.NO_ACCESS)
+    if user and row.owner_id == user.id:
+        return ResolvedAccess(True, True, Permission.ADMINISTRATOR)
+    perm = PERMISSION_ORDER[row.level] if row.level is not None else Permission.NO_ACCESS
+    return ResolvedAccess(True, False, perm)
@@ -0,0 +1,70 @@
+"""Server-side expansion of recurring events (RFC 5545 RRULE).
+
+Event datetimes are stored as naive UTC. Timed rules are expanded on the
+calendar's local wall clock, so a weekly 10:00 meeting stays at 10:00 across
+DST changes, and each occurrence is converted back to naive UTC. All-day
+events are date based and are expanded as-is.
+"""
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from dateutil.rrule import rrulestr
+
+# Hard cap on occurrences produced for one series in one window (guards
+# against FREQ=MINUTELY-style rules on wide windows).
+MAX_OCCURRENCES = 5000
+
+
+def _utc_to_local(dt: datetime, tz: ZoneInfo) -> datetime:
+    return dt.replace(tzinfo=timezone.utc).astimezone(tz).replace(tzinfo=None)
+
+
+def _local_to_utc(dt: datetime, tz: ZoneInfo) -> datetime:
+    return dt.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def overlaps(start: datetime, end: datetime, window_start: datetime, window_end: datetime) -> bool:
+    """Half-open overlap with [window_start, window_end); zero-length events count at their start."""
+    if start >= window_end:
+        return False
+    return end > window_start or start >= window_start
+
+
+def expand_occurrences(
+    rrule: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    window_start: datetime,
+    window_end: datetime,
+    tz_name: str = "UTC",
+    all_day: bool = False,
+    limit: int = MAX_OCCURRENCES,
+) -> list[tuple[datetime, datetime]]:
+    """Return the (start, end) naive-UTC pairs of the occurrences of a series
+    that overlap [window_start, window_end).
+
+    Raises ValueError if the rule cannot be parsed.
+    """
+    duration = end_dt - start_dt
+    tz = ZoneInfo(tz_name or "UTC")
+    local = not all_day
+
+    dtstart = _utc_to_local(start_dt, tz) if local else start_dt
+    rule = rrulestr(rrule, dtstart=dtstart, ignoretz=True)
+
+    # Start iterating a little before the window: an occurrence that began
+    # earlier may still overlap it, and wall-clock vs UTC shifts by up to a day.
+    search_from = window_start - duration - timedelta(days=1)
+    if local:
+        search_from = _utc_to_local(search_from, tz)
+
+    occurrences: list[tuple[datetime, datetime]] = []
+    for occ in rule.xafter(search_from, inc=True):
+        occ_start = _local_to_utc(occ, tz) if local else occ
+        if occ_start >= window_end:
+            break
+        occ_end = occ_start + duration
+        if overlaps(occ_start, occ_end, window_start, window_end):
+            occurrences.append((occ_start, occ_end))
+            if len(occurrences) >= limit:
+                break
+    return occurrences
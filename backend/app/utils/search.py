@@ -0,0 +1,75 @@
+"""Full-text search over events and comments.
+
+Events and comments carry a generated `search_vector` (GIN indexed). The
+original text is indexed twice: with the 'simple' configuration (exact
+words, whatever the language) and with 'french', the default source
+language. Cached translations are indexed with the configuration of their
+language. A query is matched against all of these, the last word as a
+prefix so that results come in while the user is typing.
+"""
+import html
+import re
+from typing import Optional
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+# Language of a cached translation -> text search configuration (SUPPORTED_LANGS)
+SEARCH_CONFIGS = {"fr": "french", "en": "english", "nl": "dutch", "de": "german"}
+
+# Longer queries are cut to this many words
+MAX_QUERY_WORDS = 16
+
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxWords=20, MinWords=8, "
+    'MaxFragments=2, FragmentDelimiter=" … "'
+)
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _vector(config: str, text_sql: str, weight: str) -> str:
+    return f"setweight(to_tsvector('{config}', coalesce({text_sql}, '')), '{weight}')"
+
+
+def search_vector_sql(fields: dict[str, str], translated: dict[str, str]) -> str:
+    """SQL of a search_vector generated column.
+
+    fields maps columns of the row to their weight; translated maps keys of the
+    `translations` JSON (per language) to theirs.
+    """
+    parts = []
+    for column, weight in fields.items():
+        parts.append(_vector("simple", column, weight))
+        parts.append(_vector("french", column, weight))
+    for lang, config in SEARCH_CONFIGS.items():
+        for key, weight in translated.items():
+            parts.append(_vector(config, f"translations -> '{lang}' ->> '{key}'", weight))
+    return "\n || ".join(parts)
+
+
+def tsquery_text(q: str) -> Optional[str]:
+    """`w1 & w2 & w3:*` from free text, or None if it has no word."""
+    words = _WORD.findall(q.lower())[:MAX_QUERY_WORDS]
+    if not words:
+        return None
+    words[-1] += ":*"
+    return " & ".join(words)
+
+
+def search_query(text: str):
+    """The tsquery matching text in any of the indexed configurations."""
+    query = func.to_tsquery(literal("simple", REGCONFIG), text)
+    for config in ("french", *(c for c in SEARCH_CONFIGS.values() if c != "french")):
+        query = query.op("||")(func.to_tsquery(literal(config, REGCONFIG), text))
+    return query
+
+
+def headline(document, query):
+    return func.ts_headline(literal("simple", REGCONFIG), document, query, HEADLINE_OPTIONS)
+
+
+def safe_snippet(raw: Optional[str]) -> Optional[str]:
+    """HTML-escape a ts_headline result, keeping its <mark> highlights."""
+    if raw is None:
+        return None
+    return html.escape(raw).replace("&lt;mark&gt;", "<mark>").replace("&lt;/mark&gt;", "</mark>")
@@ -0,0 +1,26 @@
+"""Client-side rate limiting of calls to external services."""
+import asyncio
+
+
+class Throttle:
+    """Spaces calls at least 1/rate seconds apart; `await throttle.wait()` before each call."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        now = asyncio.get_running_loop().time()
+        # Reserve the next free slot before sleeping, so concurrent callers queue up
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def slots(self, within: float) -> int:
+        """How many calls could start within the next `within` seconds, after those already queued."""
+        now = asyncio.get_running_loop().time()
+        free_in = max(0.0, self._next - now)
+        if free_in > within:
+            return 0
+        return int((within - free_in) / self.interval) + 1
@@ -0,0 +1,40 @@
+"""Background job worker, run apart from the API: `python -m app.worker`.
+
+Runs the jobs queued in the `jobs` table (app.services.jobs) until SIGTERM
+or SIGINT. Any number of workers can run next to the API; set
+RUN_JOB_WORKER=false on the API to leave the jobs to them.
+"""
+import asyncio
+import logging
+import signal
+from app.config import settings
+from app.services import jobs
+# Modules defining job handlers, imported to register them
+from app.services import email, pretranslation, storage  # noqa: F401
+from app.services.translation import init_http_client, close_http_client
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    email.log_email_status()
+    email.outbox.start()
+    init_http_client()
+    worker = asyncio.create_task(jobs.run_worker(settings.JOB_CONCURRENCY))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.cancel)
+    logger.info("Job worker started (%d at a time, handlers: %s)", settings.JOB_CONCURRENCY, ", ".join(sorted(jobs.HANDLERS)))
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await close_http_client()
+        await email.outbox.stop()
+    logger.info("Job worker stopped")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -93,6 +93,14 @@ async def test_get_calendar_not_found(auth_client):
     assert resp.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_list_events_unknown_calendar(auth_client):
+    """Permission resolution reports a missing calendar as 404, not 403."""
+    client, headers, _, _ = auth_client
+    resp = await client.get(f"/v1/calendars/{uuid.uuid4()}/events", headers=headers)
+    assert resp.status_code == 404
+
+
 # ─── Sub-calendars ────────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
@@ -179,7 +187,7 @@ async def test_list_events_date_filter(auth_client):
         params={"start_dt": "2025-08-01T00:00:00", "end_dt": "2025-08-31T23:59:59"},
     )
     assert resp2.status_code == 200
-    events = resp2.json()
+    events = resp2.json()["items"]
     assert any(e["id"] == event_id for e in events)
 
     # Filter for January — should NOT find it
@@ -189,7 +197,7 @@ async def test_list_events_date_filter(auth_client):
         params={"start_dt": "2025-01-01T00:00:00", "end_dt": "2025-01-31T23:59:59"},
     )
     assert resp3.status_code == 200
-    events3 = resp3.json()
+    events3 = resp3.json()["items"]
     assert not any(e["id"] == event_id for e in events3)
 
     # Cleanup
@@ -323,13 +331,44 @@ async def test_search_events(auth_client):
         params={"q": "Searchable XYZ"},
     )
     assert resp2.status_code == 200
-    results = resp2.json()
+    results = resp2.json()["items"]
     assert any(e["id"] == eid for e in results)
 
+    # Type-ahead: the last word matches as a prefix, with highlighted snippets
+    resp3 = await client.get(
+        f"/v1/calendars/{cal_id}/events/search",
+        headers=headers,
+        params={"q": "unique searcha"},
+    )
+    hit = next(e for e in resp3.json()["items"] if e["id"] == eid)
+    assert "<mark>Searchable</mark>" in hit["snippet"]
+
     # Cleanup
     await client.delete(f"/v1/calendars/{cal_id}/events/{eid}", headers=headers)
 
 
+@pytest.mark.asyncio
+async def test_search_all_calendars(auth_client):
+    client, headers, cal_id, sc_id = auth_client
+    resp = await client.post(
+        f"/v1/calendars/{cal_id}/events",
+        headers=headers,
+        json={
+            "sub_calendar_id": sc_id,
+            "title": "Crosscalendar Findable",
+            "start_dt": "2025-07-06T10:00:00",
+            "end_dt": "2025-07-06T11:00:00",
+        },
+    )
+    eid = resp.json()["id"]
+
+    resp2 = await client.get("/v1/search", headers=headers, params={"q": "crosscalendar find"})
+    assert resp2.status_code == 200
+    group = next(g for g in resp2.json()["groups"] if g["calendar_id"] == cal_id)
+    assert any(e["id"] == eid for e in group["items"])
+
+    await client.delete(f"/v1/calendars/{cal_id}/events/{eid}", headers=headers)
+
 @pytest.mark.asyncio
 async def test_recurring_event_included_in_future(auth_client):
     """A recurring event with start_dt in the past should still appear in future windows."""
@@ -354,13 +393,260 @@ async def test_recurring_event_included_in_future(auth_client):
         params={"start_dt": "2025-07-01T00:00:00", "end_dt": "2025-07-31T23:59:59"},
     )
     assert resp2.status_code == 200
-    events = resp2.json()
+    events = resp2.json()["items"]
     assert any(e["id"] == eid for e in events)
 
     # Cleanup
     await client.delete(f"/v1/calendars/{cal_id}/events/{eid}", headers=headers)
 
 
+
+@pytest.mark.asyncio
+async def test_list_events_expand_occurrences(auth_client):
+    """expand=true returns only the occurrences inside the window, in local time."""
+    client, headers, cal_id, sc_id = auth_client
+    resp = await client.post(
+        f"/v1/calendars/{cal_id}/events",
+        headers=headers,
+        json={
+            "sub_calendar_id": sc_id,
+            "title": "Weekly Since 2019",
+            "start_dt": "2019-01-07T09:00:00",  # Monday 10:00 Europe/Paris
+            "end_dt": "2019-01-07T10:00:00",
+            "rrule": "FREQ=WEEKLY",
+        },
+    )
+    eid = resp.json()["id"]
+
+    resp2 = await client.get(
+        f"/v1/calendars/{cal_id}/events",
+        headers=headers,
+        params={"start_dt": "2025-03-20T00:00:00", "end_dt": "2025-04-10T00:00:00", "expand": "true"},
+    )
+    assert resp2.status_code == 200
+    occurrences = [e for e in resp2.json()["items"] if e["id"] == eid]
+    assert [e["start_dt"] for e in occurrences] == [
+        "2025-03-24T09:00:00", "2025-03-31T08:00:00", "2025-04-07T08:00:00",
+    ]
+    assert all(e["is_occurrence"] for e in occurrences)
+
+    # expand without a window is rejected
+    resp3 = await client.get(
+        f"/v1/calendars/{cal_id}/events", headers=headers, params={"expand": "true"},
+    )
+    assert resp3.status_code == 400
+
+    # Cleanup
+    await client.delete(f"/v1/calendars/{cal_id}/events/{eid}", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_finished_series_excluded_from_later_window(auth_client):
+    """A series that ended is no longer returned, and an rrule edit is reflected."""
+    client, headers, cal_id, sc_id = auth_client
+    resp = await client.post(
+        f"/v1/calendars/{cal_id}/events",
+        headers=headers,
+        json={
+            "sub_calendar_id": sc_id,
+            "title": "Three Weeks Only",
+            "start_dt": "2025-01-06T10:00:00",
+            "end_dt": "2025-01-06T11:00:00",
+            "rrule": "FREQ=WEEKLY;COUNT=3",
+        },
+    )
+    eid = resp.json()["id"]
+    july = {"start_dt": "2025-07-01T00:00:00", "end_dt": "2025-07-31T23:59:59"}
+
+    resp2 = await client.get(f"/v1/calendars/{cal_id}/events", headers=headers, params=july)
+    assert resp2.status_code == 200
+    assert not any(e["id"] == eid for e in resp2.json()["items"])
+
+    # Make it open-ended: it now reaches July
+    await client.put(
+        f"/v1/calendars/{cal_id}/events/{eid}", headers=headers, json={"rrule": "FREQ=WEEKLY"},
+    )
+    resp3 = await client.get(f"/v1/calendars/{cal_id}/events", headers=headers, params=july)
+    assert any(e["id"] == eid for e in resp3.json()["items"])
+
+    # Cleanup
+    await client.delete(f"/v1/calendars/{cal_id}/events/{eid}", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_event_scoped_to_its_calendar(auth_client):
+    """An event is not reachable through another calendar, nor movable into one."""
+    client, headers, cal_id, sc_id = auth_client
+    other = await client.post("/v1/calendars", headers=headers, json={"title": "Scope Test"})
+    if other.status_code != 201:
+        pytest.skip("Test user cannot create calendars")
+    other_id = other.json()["id"]
+    other_sc = (await client.get(f"/v1/calendars/{other_id}/subcalendars", headers=headers)).json()[0]["id"]
+
+    eid = await _create_test_event(client, headers, cal_id, sc_id)
+
+    resp = await client.get(f"/v1/calendars/{other_id}/events/{eid}", headers=headers)
+    assert resp.status_code == 404
+    resp = await client.put(
+        f"/v1/calendars/{cal_id}/events/{eid}", headers=headers, json={"sub_calendar_id": other_sc},
+    )
+    assert resp.status_code == 404
+
+    # Rows of the other calendar's events are not reachable through this one
+    other_eid = await _create_test_event(client, headers, other_id, other_sc)
+    comment = await client.post(
+        f"/v1/calendars/{other_id}/events/{other_eid}/comments", headers=headers, json={"content": "Bonjour"},
+    )
+    comment_id = comment.json()["id"]
+    resp = await client.post(
+        f"/v1/calendars/{cal_id}/events/{other_eid}/comments/{comment_id}/translate",
+        headers=headers, params={"target_lang": "en"},
+    )
+    assert resp.status_code == 404
+    resp = await client.delete(f"/v1/calendars/{cal_id}/events/{other_eid}/comments/{comment_id}", headers=headers)
+    assert resp.status_code == 404
+    resp = await client.get(f"/v1/calendars/{cal_id}/events/{other_eid}/signups", headers=headers)
+    assert resp.json() == []
+
+    # Cleanup
+    await client.delete(f"/v1/calendars/{cal_id}/events/{eid}", headers=headers)
+    await client.delete(f"/v1/calendars/{other_id}", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_move_event_needs_add_in_target_sub_calendar(auth_client):
+    """Modify rights in one sub-calendar do not allow pushing events into another."""
+    client, headers, cal_id, sc_id = auth_client
+    target = await client.post(
+        f"/v1/calendars/{cal_id}/subcalendars", headers=headers, json={"name": "Move Target", "color": "#00ff00"},
+    )
+    target_id = target.json()["id"]
+    link = await client.post(
+        f"/v1/calendars/{cal_id}/links", headers=headers,
+        json={"label": "Modify one", "permission": "modify", "sub_calendar_id": sc_id},
+    )
+    token = link.json()["token"]
+    eid = await _create_test_event(client, headers, cal_id, sc_id)
+
+    url = f"/v1/calendars/{cal_id}/events"
+    resp = await client.put(f"{url}/{eid}", params={"token": token}, json={"sub_calendar_id": target_id})
+    assert resp.status_code == 403
+    resp = await client.post(f"{url}:batch", params={"token": token}, json={"operations": [
+        {"op": "update", "id": eid, "data": {"sub_calendar_id": target_id}},
+    ]})
+    assert resp.json()[0]["status"] == 403
+
+    # Cleanup
+    await client.delete(f"{url}/{eid}", headers=headers)
+    await client.delete(f"/v1/calendars/{cal_id}/links/{link.json()['id']}", headers=headers)
+    await client.delete(f"/v1/calendars/{cal_id}/subcalendars/{target_id}", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_list_events_cursor_pagination(auth_client):
+    """Pages follow (start_dt, id) order and next_cursor until the last page."""
+    client, headers, cal_id, sc_id = auth_client
+    ids = []
+    for day in (3, 1, 2):
+        resp = await client.post(
+            f"/v1/calendars/{cal_id}/events",
+            headers=headers,
+            json={
+                "sub_calendar_id": sc_id,
+                "title": f"Paged {day}",
+                "start_dt": f"2024-11-0{day}T10:00:00",
+                "end_dt": f"2024-11-0{day}T11:00:00",
+            },
+        )
+        ids.append(resp.json()["id"])
+
+    params = {"start_dt": "2024-11-01T00:00:00", "end_dt": "2024-11-04T00:00:00", "limit": 2}
+    seen = []
+    cursor = None
+    while True:
+        resp = await client.get(
+            f"/v1/calendars/{cal_id}/events", headers=headers,
+            params={**params, **({"cursor": cursor} if cursor else {})},
+        )
+        assert resp.status_code == 200
+        page = resp.json()
+        assert len(page["items"]) <= 2
+        seen += [e["title"] for e in page["items"] if e["id"] in ids]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == ["Paged 1", "Paged 2", "Paged 3"]
+
+    resp = await client.get(
+        f"/v1/calendars/{cal_id}/events", headers=headers, params={"cursor": "garbage!"},
+    )
+    assert resp.status_code == 400
+
+    # Cleanup
+    for eid in ids:
+        await client.delete(f"/v1/calendars/{cal_id}/events/{eid}", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_changes_delta_sync(auth_client):
+    """/changes returns created/updated events and tombstones since a token."""
+    client, headers, cal_id, sc_id = auth_client
+    url = f"/v1/calendars/{cal_id}/events/changes"
+    resp = await client.get(url, headers=headers)
+    assert resp.status_code == 200
+    token = resp.json()["sync_token"]
+
+    kept = await _create_test_event(client, headers, cal_id, sc_id)
+    gone = await _create_test_event(client, headers, cal_id, sc_id)
+    await client.delete(f"/v1/calendars/{cal_id}/events/{gone}", headers=headers)
+
+    resp2 = await client.get(url, headers=headers, params={"since": token})
+    assert resp2.status_code == 200
+    changes = resp2.json()
+    assert any(e["id"] == kept for e in changes["events"])
+    assert not any(e["id"] == gone for e in changes["events"])
+    assert gone in changes["deleted"]
+    assert changes["sync_token"]
+
+    resp3 = await client.get(url, headers=headers, params={"since": "garbage!"})
+    assert resp3.status_code == 400
+
+    # Cleanup
+    await client.delete(f"/v1/calendars/{cal_id}/events/{kept}", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_list_events_reversed_window(auth_client):
+    client, headers, cal_id, sc_id = auth_client
+    resp = await client.get(
+        f"/v1/calendars/{cal_id}/events", headers=headers,
+        params={"start_dt": "2025-12-31T00:00:00", "end_dt": "2025-01-01T00:00:00"},
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_events_etag_not_modified(auth_client):
+    """Unchanged calendars answer 304 to If-None-Match; any event write changes the ETag."""
+    client, headers, cal_id, sc_id = auth_client
+    url = f"/v1/calendars/{cal_id}/events"
+    params = {"start_dt": "2025-01-01T00:00:00", "end_dt": "2025-12-31T23:59:59"}
+    resp = await client.get(url, headers=headers, params=params)
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+
+    resp2 = await client.get(url, headers={**headers, "If-None-Match": etag}, params=params)
+    assert resp2.status_code == 304
+    assert resp2.headers["etag"] == etag
+
+    eid = await _create_test_event(client, headers, cal_id, sc_id)
+    resp3 = await client.get(url, headers={**headers, "If-None-Match": etag}, params=params)
+    assert resp3.status_code == 200
+    assert resp3.headers["etag"] != etag
+
+    # Cleanup
+    await client.delete(f"/v1/calendars/{cal_id}/events/{eid}", headers=headers)
+
 # ─── iCal export ──────────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
@@ -398,6 +684,33 @@ async def test_export_ical_full(auth_client):
     assert b"VCALENDAR" in resp.content
 
 
+@pytest.mark.asyncio
+async def test_import_ical_skips_known_uids(auth_client):
+    client, headers, cal_id, sc_id = auth_client
+    uid = f"import-{uuid.uuid4()}@example.com"
+    ics = (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        f"BEGIN:VEVENT\r\nUID:{uid}\r\nSUMMARY:Importé\r\n"
+        "DTSTART:20250910T080000Z\r\nDTEND:20250910T090000Z\r\n"
+        "RRULE:FREQ=WEEKLY;COUNT=3\r\nGEO:50.85;4.35\r\nEND:VEVENT\r\n"
+        "BEGIN:VEVENT\r\nSUMMARY:Sans date\r\nEND:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    ).encode()
+    url = f"/v1/calendars/{cal_id}/events/import.ics?sub_calendar_id={sc_id}"
+    resp = await client.post(url, headers=headers, files={"file": ("cal.ics", ics, "text/calendar")})
+    assert resp.status_code == 201
+    assert resp.json() == {"imported": 1, "duplicates": 0, "invalid": 1}
+
+    # Importing the same file again adds nothing
+    resp2 = await client.post(url, headers=headers, files={"file": ("cal.ics", ics, "text/calendar")})
+    assert resp2.json()["imported"] == 0
+    assert resp2.json()["duplicates"] == 1
+
+    search = await client.get(f"/v1/calendars/{cal_id}/events/search?q=Importé", headers=headers)
+    for ev in search.json()["items"]:
+        await client.delete(f"/v1/calendars/{cal_id}/events/{ev['id']}", headers=headers)
+
+
 # ─── Permissions ──────────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
@@ -610,6 +923,116 @@ async def test_update_event_tags(auth_client):
     await client.delete(f"/v1/calendars/{cal_id}/tags/{tag_b_id}", headers=headers)
 
 
+@pytest.mark.asyncio
+async def test_batch_events(auth_client):
+    """Create, update and delete events in one request, with per-operation results."""
+    client, headers, cal_id, sc_id = auth_client
+    tag = await client.post(f"/v1/calendars/{cal_id}/tags", headers=headers, json={"name": "Batch Tag"})
+    tag_id = tag.json()["id"]
+    url = f"/v1/calendars/{cal_id}/events:batch"
+
+    creates = [
+        {"op": "create", "data": {
+            "sub_calendar_id": sc_id, "title": f"Batch {i}",
+            "start_dt": "2025-09-01T10:00:00", "end_dt": "2025-09-01T11:00:00",
+            "tag_ids": [tag_id],
+        }}
+        for i in range(3)
+    ]
+    resp = await client.post(url, headers=headers, json={"operations": creates})
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [r["status"] for r in results] == [201, 201, 201]
+    assert results[0]["event"]["tags"][0]["id"] == tag_id
+    ids = [r["id"] for r in results]
+
+    resp = await client.post(url, headers=headers, json={"operations": [
+        {"op": "update", "id": ids[0], "data": {"title": "Batch renamed", "tag_ids": []}},
+        {"op": "update", "id": ids[1], "data": {"start_dt": "2025-09-02T10:00:00", "end_dt": "2025-09-02T11:00:00"}},
+        {"op": "delete", "id": ids[2]},
+        {"op": "delete", "id": ids[2]},
+        {"op": "delete", "id": "00000000-0000-0000-0000-000000000000"},
+    ]})
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [r["status"] for r in results] == [200, 200, 204, 409, 404]
+    assert results[0]["event"]["title"] == "Batch renamed"
+    assert results[0]["event"]["tags"] == []
+    assert results[1]["event"]["start_dt"].startswith("2025-09-02T10:00")
+
+    gone = await client.get(f"/v1/calendars/{cal_id}/events/{ids[2]}", headers=headers)
+    assert gone.status_code == 404
+
+    resp = await client.post(url, headers=headers, json={"operations": [
+        {"op": "delete", "id": ids[0]}, {"op": "delete", "id": ids[1]},
+    ]})
+    assert [r["status"] for r in resp.json()] == [204, 204]
+    await client.delete(f"/v1/calendars/{cal_id}/tags/{tag_id}", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_batch_events_unauthenticated(auth_client):
+    client, headers, cal_id, sc_id = auth_client
+    resp = await client.post(f"/v1/calendars/{cal_id}/events:batch", json={"operations": [
+        {"op": "create", "data": {
+            "sub_calendar_id": sc_id, "title": "Anonymous",
+            "start_dt": "2025-09-01T10:00:00", "end_dt": "2025-09-01T11:00:00",
+        }},
+    ]})
+    assert resp.status_code == 200
+    assert resp.json()[0]["status"] == 403
+
+
+@pytest.mark.asyncio
+async def test_signup_capacity_and_waitlist(auth_client):
+    """A full event waitlists new signups and promotes them when a seat frees up."""
+    client, headers, cal_id, sc_id = auth_client
+    ev = await client.post(
+        f"/v1/calendars/{cal_id}/events",
+        headers=headers,
+        json={
+            "sub_calendar_id": sc_id,
+            "title": "One Seat",
+            "start_dt": "2025-09-20T10:00:00",
+            "end_dt": "2025-09-20T11:00:00",
+            "signup_enabled": True,
+            "signup_max": 1,
+        },
+    )
+    ev_id = ev.json()["id"]
+    url = f"/v1/calendars/{cal_id}/events/{ev_id}/signups"
+    event = await client.get(f"/v1/calendars/{cal_id}/events/{ev_id}", headers=headers)
+    etag = event.headers["etag"]
+
+    first = await client.post(url, headers=headers, json={"name": "Alice", "email": "alice@example.com"})
+    assert first.status_code == 201
+    assert first.json()["waitlisted"] is False
+    # A signup changes signup_count: cached reads are stale
+    event = await client.get(f"/v1/calendars/{cal_id}/events/{ev_id}", headers={**headers, "If-None-Match": etag})
+    assert event.status_code == 200
+    dup = await client.post(url, headers=headers, json={"name": "Alice", "email": "alice@example.com"})
+    assert dup.status_code == 409
+
+    second = await client.post(url, headers=headers, json={"name": "Bob", "email": "bob@example.com"})
+    assert second.status_code == 202
+    assert second.json()["waitlisted"] is True
+
+    event = await client.get(f"/v1/calendars/{cal_id}/events/{ev_id}", headers=headers)
+    assert event.json()["signup_count"] == 1
+    etag = event.headers["etag"]
+
+    resp = await client.delete(f"{url}/{first.json()['id']}", headers=headers)
+    assert resp.status_code == 204
+    # Bob was promoted: the count is the same, but the seat changes are new content
+    event = await client.get(f"/v1/calendars/{cal_id}/events/{ev_id}", headers={**headers, "If-None-Match": etag})
+    assert event.status_code == 200
+    assert event.json()["signup_count"] == 1
+    signups = await client.get(url, headers=headers)
+    assert [s["email"] for s in signups.json()] == ["bob@example.com"]
+
+    await client.delete(f"/v1/calendars/{cal_id}/events/{ev_id}", headers=headers)
+
+
 # ─── Comments ──────────────────────────────────────────────────────────────
 
 async def _create_test_event(client, headers, cal_id, sc_id):
@@ -683,6 +1106,23 @@ async def test_list_comments_empty(auth_client):
     await client.delete(f"/v1/calendars/{cal_id}/events/{ev_id}", headers=headers)
 
 
+@pytest.mark.asyncio
+async def test_translate_comments_thread(auth_client):
+    client, headers, cal_id, sc_id = auth_client
+    ev_id = await _create_test_event(client, headers, cal_id, sc_id)
+    url = f"/v1/calendars/{cal_id}/events/{ev_id}/comments/translate"
+
+    resp = await client.post(url, headers=headers, params={"target_lang": "xx"})
+    assert resp.status_code == 400
+
+    # Nothing to translate: no backend call
+    resp = await client.post(url, headers=headers, params={"target_lang": "en"})
+    assert resp.status_code == 200
+    assert resp.json() == {}
+
+    await client.delete(f"/v1/calendars/{cal_id}/events/{ev_id}", headers=headers)
+
+
 @pytest.mark.asyncio
 async def test_delete_own_comment(auth_client):
     client, headers, cal_id, sc_id = auth_client
@@ -704,6 +1144,44 @@ async def test_delete_own_comment(auth_client):
     await client.delete(f"/v1/calendars/{cal_id}/events/{ev_id}", headers=headers)
 
 
+@pytest.mark.asyncio
+async def test_delete_own_comment_after_losing_access(auth_client):
+    """Authors keep the right to delete their comments once their access is revoked."""
+    client, headers, cal_id, sc_id = auth_client
+    ev_id = await _create_test_event(client, headers, cal_id, sc_id)
+    temp_email = f"del_comment_{uuid.uuid4().hex[:8]}@example.com"
+    reg = await client.post(
+        "/v1/auth/register",
+        json={"email": temp_email, "name": "Comment Author", "password": "securepass1"},
+    )
+    if reg.status_code == 429:
+        pytest.skip("Rate limited")
+    login = await client.post("/v1/auth/login", json={"email": temp_email, "password": "securepass1"})
+    author_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    await client.post(
+        f"/v1/calendars/{cal_id}/invite", headers=headers,
+        json={"email": temp_email, "permission": "read_only"},
+    )
+    access_resp = await client.get(f"/v1/calendars/{cal_id}/access", headers=headers)
+    access_id = next(acc["id"] for acc in access_resp.json() if acc.get("user_email") == temp_email)
+
+    create_resp = await client.post(
+        f"/v1/calendars/{cal_id}/events/{ev_id}/comments",
+        headers=author_headers,
+        json={"content": "Written before losing access"},
+    )
+    assert create_resp.status_code == 201
+    await client.delete(f"/v1/calendars/{cal_id}/access/{access_id}", headers=headers)
+
+    resp = await client.delete(
+        f"/v1/calendars/{cal_id}/events/{ev_id}/comments/{create_resp.json()['id']}",
+        headers=author_headers,
+    )
+    assert resp.status_code == 204
+
+    await client.delete(f"/v1/calendars/{cal_id}/events/{ev_id}", headers=headers)
+
+
 @pytest.mark.asyncio
 async def test_delete_comment_not_found(auth_client):
     client, headers, cal_id, sc_id = auth_client
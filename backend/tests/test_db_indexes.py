@@ -0,0 +1,112 @@
+"""Query-plan tests — run against the migrated database (DATABASE_URL).
+
+    docker exec agenda-souterrain-backend-1 python -m pytest tests/test_db_indexes.py -v
+
+A few years of events are inserted and analyzed inside a rolled-back
+transaction, so that the planner picks its plans from real statistics with
+its default settings, as it would in production.
+"""
+import json
+import uuid
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.models.user import User
+from app.models.calendar import Calendar
+from app.models.sub_calendar import SubCalendar
+from app.models.event import Event, EventOccurrence
+from app.routers.events import _period_overlaps
+
+WINDOW = (datetime(2025, 3, 1), datetime(2025, 3, 31, 23, 59, 59))
+# Two events a day until the window: the window holds a small share of the rows
+FIXTURE_START = datetime(2019, 1, 1)
+FIXTURE_ROWS = 4000
+
+
+async def _fill(c) -> None:
+    user_id, cal_id, sc_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await c.execute(insert(User).values(
+        id=user_id, email=f"plan_{user_id.hex}@example.com", name="Plan", hashed_password="x",
+    ))
+    await c.execute(insert(Calendar).values(
+        id=cal_id, slug=f"plan-{cal_id.hex}", title="Plan", owner_id=user_id,
+    ))
+    await c.execute(insert(SubCalendar).values(id=sc_id, calendar_id=cal_id, name="Plan"))
+    rows = []
+    for i in range(FIXTURE_ROWS):
+        start = FIXTURE_START + timedelta(hours=12 * i)
+        rows.append({
+            "id": uuid.uuid4(), "sub_calendar_id": sc_id, "calendar_id": cal_id,
+            "title": f"Event {i}", "start_dt": start, "end_dt": start + timedelta(hours=2),
+        })
+    await c.execute(insert(Event), rows)
+    await c.execute(insert(EventOccurrence), [
+        {k: row[k] for k in ("sub_calendar_id", "calendar_id", "start_dt", "end_dt")} | {"event_id": row["id"]}
+        for row in rows
+    ])
+    await c.execute(text("ANALYZE events"))
+    await c.execute(text("ANALYZE event_occurrences"))
+
+
+@pytest_asyncio.fixture
+async def conn():
+    engine = create_async_engine(settings.DATABASE_URL, connect_args={"statement_cache_size": 0})
+    try:
+        c = await engine.connect()
+    except OSError:
+        await engine.dispose()
+        pytest.skip("Database not reachable")
+    trans = await c.begin()
+    await _fill(c)
+    yield c
+    await trans.rollback()
+    await c.close()
+    await engine.dispose()
+
+
+def _nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+async def _plan(conn, stmt) -> list[dict]:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    return list(_nodes(result.scalar()[0]["Plan"]))
+
+
+def _uses_overlap_index(nodes: list[dict], index: str) -> bool:
+    """True when the plan scans index with the && operator as its index condition."""
+    return any(
+        node["Node Type"] in ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+        and node.get("Index Name") == index
+        and "&&" in node.get("Index Cond", "")
+        for node in nodes
+    )
+
+
+@pytest.mark.asyncio
+async def test_events_window_uses_period_index(conn):
+    stmt = select(Event.id).where(_period_overlaps(Event.period, *WINDOW))
+    nodes = await _plan(conn, stmt)
+    assert _uses_overlap_index(nodes, "ix_events_period"), json.dumps(nodes)
+
+
+@pytest.mark.asyncio
+async def test_events_open_window_uses_period_index(conn):
+    stmt = select(Event.id).where(_period_overlaps(Event.period, WINDOW[0], None))
+    nodes = await _plan(conn, stmt)
+    assert _uses_overlap_index(nodes, "ix_events_period"), json.dumps(nodes)
+
+
+@pytest.mark.asyncio
+async def test_occurrences_window_uses_period_index(conn):
+    stmt = select(EventOccurrence.event_id).where(_period_overlaps(EventOccurrence.period, *WINDOW))
+    nodes = await _plan(conn, stmt)
+    assert _uses_overlap_index(nodes, "ix_event_occurrences_period"), json.dumps(nodes)
@@ -0,0 +1,232 @@
+"""iCalendar serializer tests — icalendar is the oracle, no DB required.
+
+Regenerate the golden file after an intended format change with:
+
+    python -m tests.test_ical
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from icalendar import Calendar as ICalendar, Event as ICalEvent, vRecur
+
+from app.utils.ical import (
+    CALENDAR_HEADER, CALENDAR_FOOTER, vevent_to_ical, format_dtstamp, fold_line, escape_text,
+    VEventParser, vevent_to_fields, parse_content_line, parse_duration,
+)
+
+GOLDEN = Path(__file__).parent / "golden" / "export.ics"
+DTSTAMP = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def _event(n: int, **kwargs):
+    defaults = {
+        "id": uuid.UUID(int=n),
+        "title": f"Event {n}",
+        "start_dt": datetime(2025, 6, 15, 10, 0),
+        "end_dt": datetime(2025, 6, 15, 11, 30),
+        "all_day": False,
+        "location": None,
+        "notes": None,
+        "rrule": None,
+        "latitude": None,
+        "longitude": None,
+    }
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+CASES = [
+    _event(1),
+    _event(2, all_day=True, start_dt=datetime(2025, 6, 15), end_dt=datetime(2025, 6, 17)),
+    _event(3, all_day=True, start_dt=datetime(2025, 6, 15, 9), end_dt=datetime(2025, 6, 15, 9)),
+    _event(4, title="Réunion; ordre du jour, budget \\ divers", notes="Ligne 1\nLigne 2\r\nLigne 3"),
+    _event(5, notes="x" * 300, location="Salle des fêtes — " + "é" * 80),
+    _event(6, title="Émojis 🎉" * 20),
+    _event(7, latitude=50.8503, longitude=4.3517, location="Bruxelles"),
+    _event(8, rrule="FREQ=WEEKLY;BYDAY=MO,WE"),
+    _event(9, rrule="BYDAY=MO;INTERVAL=2;FREQ=WEEKLY;COUNT=10"),
+    _event(10, rrule="FREQ=DAILY;UNTIL=20250701T000000Z"),
+    _event(11, start_dt=datetime(2025, 3, 30, 1, 0, tzinfo=timezone.utc),
+           end_dt=datetime(2025, 3, 30, 2, 0, tzinfo=timezone.utc)),
+]
+
+
+def _oracle(event) -> bytes:
+    """The previous icalendar-based implementation."""
+    ical_event = ICalEvent()
+    ical_event.add("uid", str(event.id))
+    ical_event.add("summary", event.title)
+    if event.all_day:
+        ical_event.add("dtstart", event.start_dt.date())
+        end_date = event.end_dt.date() if event.end_dt.date() > event.start_dt.date() else event.start_dt.date()
+        ical_event.add("dtend", (end_date + timedelta(days=1)))
+    else:
+        ical_event.add("dtstart", event.start_dt)
+        ical_event.add("dtend", event.end_dt)
+    if event.location:
+        ical_event.add("location", event.location)
+    if event.notes:
+        ical_event.add("description", event.notes)
+    if event.latitude is not None and event.longitude is not None:
+        ical_event.add("geo", (event.latitude, event.longitude))
+    if event.rrule:
+        ical_event.add("rrule", vRecur.from_ical(event.rrule))
+    ical_event.add("dtstamp", DTSTAMP)
+    return ical_event.to_ical()
+
+
+def _render_golden() -> bytes:
+    dtstamp = format_dtstamp(DTSTAMP)
+    return CALENDAR_HEADER + b"".join(vevent_to_ical(e, dtstamp) for e in CASES) + CALENDAR_FOOTER
+
+
+@pytest.mark.parametrize("event", CASES, ids=lambda e: e.title[:20])
+def test_vevent_matches_icalendar(event):
+    assert vevent_to_ical(event, format_dtstamp(DTSTAMP)) == _oracle(event)
+
+
+def test_export_matches_golden_file():
+    assert _render_golden() == GOLDEN.read_bytes()
+
+
+def test_golden_file_round_trips():
+    parsed = ICalendar.from_ical(GOLDEN.read_bytes())
+    events = parsed.walk("VEVENT")
+    assert len(events) == len(CASES)
+    assert str(events[3]["summary"]) == CASES[3].title
+    assert str(events[3]["description"]) == "Ligne 1\nLigne 2\nLigne 3"
+    assert str(events[4]["location"]) == CASES[4].location
+
+
+def test_fold_line_limits_octets():
+    line = "DESCRIPTION:" + "é" * 100
+    for physical in fold_line(line).split("\r\n"):
+        assert len(physical.encode("utf-8")) <= 75
+    assert fold_line(line).replace("\r\n ", "") == line
+
+
+def test_escape_text():
+    assert escape_text("a,b;c\\d\ne") == r"a\,b\;c\\d\ne"
+
+
+
+# ─── Import ──────────────────────────────────────────────────────────────
+
+def _parse_all(data: bytes, chunk_size: int) -> list:
+    parser = VEventParser()
+    text = data.decode("utf-8")
+    events = []
+    for i in range(0, len(text), chunk_size):
+        events.extend(parser.feed(text[i:i + chunk_size]))
+    return events + parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_golden_file_imports_back(chunk_size):
+    vevents = _parse_all(GOLDEN.read_bytes(), chunk_size)
+    assert len(vevents) == len(CASES)
+    for vevent, event in zip(vevents, CASES):
+        fields = vevent_to_fields(vevent)
+        assert fields["ical_uid"] == str(event.id)
+        assert fields["title"] == event.title
+        assert fields["all_day"] == event.all_day
+        if not event.all_day:
+            assert fields["start_dt"] == event.start_dt.replace(tzinfo=None)
+        assert fields["location"] == event.location
+        assert (fields["latitude"], fields["longitude"]) == (event.latitude, event.longitude)
+        if event.notes:
+            assert fields["notes"] == event.notes.replace("\r\n", "\n")
+
+
+def test_import_all_day_end_is_inclusive():
+    fields = vevent_to_fields(_parse_all(GOLDEN.read_bytes(), 4096)[1])
+    assert fields["start_dt"] == datetime(2025, 6, 15)
+    assert fields["end_dt"] == datetime(2025, 6, 17)
+
+
+def test_import_tzid_duration_and_nested_components():
+    data = (
+        "BEGIN:VCALENDAR\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:abc@example.com\r\n"
+        "DTSTART;TZID=Europe/Brussels:20250701T100000\r\n"
+        "DURATION:PT1H30M\r\n"
+        "SUMMARY:Concert\r\n"
+        "BEGIN:VALARM\r\n"
+        "DESCRIPTION:Rappel\r\n"
+        "END:VALARM\r\n"
+        "END:VEVENT\r\n"
+        "BEGIN:VEVENT\r\n"
+        "SUMMARY:Sans début\r\n"
+        "END:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    ).encode()
+    first, second = _parse_all(data, 5)
+    fields = vevent_to_fields(first)
+    assert fields["start_dt"] == datetime(2025, 7, 1, 8, 0)
+    assert fields["end_dt"] == datetime(2025, 7, 1, 9, 30)
+    assert fields["notes"] is None  # the VALARM description is not the event's
+    with pytest.raises(ValueError):
+        vevent_to_fields(second)
+
+
+def test_parse_content_line_quoted_params():
+    assert parse_content_line('ATTENDEE;CN="Doe; John":mailto:j@x.org') == (
+        "ATTENDEE", {"CN": "Doe; John"}, "mailto:j@x.org",
+    )
+    assert parse_content_line("garbage") is None
+
+
+def test_parse_duration():
+    assert parse_duration("P1W2DT3H") == timedelta(days=9, hours=3)
+    assert parse_duration("-PT15M") == -timedelta(minutes=15)
+    with pytest.raises(ValueError):
+        parse_duration("1H")
+
+
+def test_import_batches_stay_under_bind_param_limit(monkeypatch):
+    import asyncio
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.sql.dml import Insert
+    from app.services import ics_import
+
+    class FakeResult:
+        def all(self):
+            return []
+
+    class FakeSession:
+        def __init__(self):
+            self.params = []
+
+        async def execute(self, stmt):
+            if isinstance(stmt, Insert):
+                self.params.append(len(stmt.compile(dialect=postgresql.dialect()).params))
+            return FakeResult()
+
+    async def no_occurrences(db, events, tz_name):
+        pass
+
+    monkeypatch.setattr(ics_import, "materialize_new_events", no_occurrences)
+    total = 2 * ics_import.IMPORT_BATCH_SIZE + 10
+    body = "".join(
+        f"BEGIN:VEVENT\r\nUID:{i}@example.com\r\nDTSTART:20250701T100000Z\r\nSUMMARY:Event {i}\r\nEND:VEVENT\r\n"
+        for i in range(total)
+    )
+
+    async def chunks():
+        # Everything in one chunk: more than a batch at once
+        yield f"BEGIN:VCALENDAR\r\n{body}END:VCALENDAR\r\n".encode()
+
+    db = FakeSession()
+    importer = ics_import.IcsImporter(db, uuid.uuid4(), uuid.uuid4(), "Europe/Brussels")
+    result = asyncio.run(importer.run(chunks()))
+    assert result.imported == total
+    assert len(db.params) == 3
+    assert max(db.params) <= ics_import.MAX_BIND_PARAMS
+
+
+if __name__ == "__main__":
+    GOLDEN.write_bytes(_render_golden())
@@ -129,6 +129,40 @@ async def test_delete_link(auth_client):
     assert not any(l["id"] == link_id for l in links)
 
 
+@pytest.mark.asyncio
+async def test_link_subscription_feed(auth_client):
+    client, headers, cal_id = auth_client
+    resp = await client.post(
+        f"/v1/calendars/{cal_id}/links",
+        headers=headers,
+        json={"label": "Feed Test", "permission": "read_only"},
+    )
+    link = resp.json()
+
+    feed = await client.get(f"/v1/feeds/{link['token']}.ics")
+    assert feed.status_code == 200
+    assert feed.headers["content-type"].startswith("text/calendar")
+    assert feed.content.startswith(b"BEGIN:VCALENDAR")
+    assert "last-modified" in feed.headers
+
+    # Unchanged calendar: both validators give 304
+    resp2 = await client.get(
+        f"/v1/feeds/{link['token']}.ics", headers={"If-None-Match": feed.headers["etag"]}
+    )
+    assert resp2.status_code == 304
+    resp3 = await client.get(
+        f"/v1/feeds/{link['token']}.ics", headers={"If-Modified-Since": feed.headers["last-modified"]}
+    )
+    assert resp3.status_code == 304
+
+    # A disabled link no longer serves the feed
+    await client.put(f"/v1/calendars/{cal_id}/links/{link['id']}", headers=headers, json={"active": False})
+    resp4 = await client.get(f"/v1/feeds/{link['token']}.ics")
+    assert resp4.status_code == 404
+
+    await client.delete(f"/v1/calendars/{cal_id}/links/{link['id']}", headers=headers)
+
+
 # ─── User invitations ─────────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
@@ -1,5 +1,10 @@
 """Unit tests for utility modules — no DB required."""
+import asyncio
+import json
+import threading
+import time
 import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
@@ -25,10 +30,29 @@ from app.utils.permissions import (
     can_modify,
     can_modify_own,
     is_admin,
+    PermissionCache,
+    ResolvedAccess,
+    access_query,
+    _to_access,
 )
-from app.utils.ical import event_to_ical, events_to_ical
+from app.utils.ical import event_to_ical, events_to_ical, iter_ical
+from app.utils.recurrence import expand_occurrences, overlaps
+from app.utils.pagination import encode_cursor, decode_cursor, encode_rank_cursor, decode_rank_cursor
+from app.utils.search import tsquery_text, safe_snippet, search_vector_sql
+from app.utils.http_cache import make_etag, etag_matches, modified_since
+from app.utils.lru import LRUCache
+from app.services.feeds import render_fragment, fragment_cache
+from app.services import translation, pretranslation, jobs
+from app.utils.throttle import Throttle
+from app.utils.circuit import CircuitBreaker, Ewma
+from app.utils.language import detect_language, has_words
+from app.routers.events import _set_tags_stmt
 from app.schemas.calendar import slugify
-from app.services.email import TEMPLATES, PERMISSION_LABELS, _email_configured, _get_permission_label
+from app.services.email import (
+    TEMPLATES, PERMISSION_LABELS, _email_configured, _get_permission_label, EmailOutbox, OutgoingEmail,
+    invitation_email, verification_email,
+)
+from app.services.storage import delete_stored_files
 
 
 # ─── Security: password hashing ──────────────────────────────────────────
@@ -133,6 +157,64 @@ def test_is_admin_levels():
     assert is_admin(Permission.ADMINISTRATOR)
 
 
+# ─── Permission cache ────────────────────────────────────────────────────
+
+def test_permission_cache_hit_and_invalidate():
+    cache = PermissionCache(ttl=60)
+    cal_id, other_id = uuid.uuid4(), uuid.uuid4()
+    key, other_key = (cal_id, None, "tok", None), (other_id, None, "tok", None)
+    assert cache.get(key) is None
+    cache.set(key, Permission.READ_ONLY, cache.generation(cal_id))
+    cache.set(other_key, Permission.MODIFY, cache.generation(other_id))
+    assert cache.get(key) == Permission.READ_ONLY
+    cache.invalidate(cal_id)
+    assert cache.get(key) is None
+    assert cache.get(other_key) == Permission.MODIFY
+    cache.invalidate()
+    assert cache.get(other_key) is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_permission_cache_skips_stale_generation():
+    cache = PermissionCache(ttl=60)
+    cal_id = uuid.uuid4()
+    key = (cal_id, uuid.uuid4(), None, None)
+    generation = cache.generation(cal_id)
+    cache.invalidate(cal_id)  # a write landed while the lookup was running
+    cache.set(key, Permission.ADMINISTRATOR, generation)
+    assert cache.get(key) is None
+
+
+def test_permission_cache_expires():
+    cache = PermissionCache(ttl=-1)
+    cal_id = uuid.uuid4()
+    cache.set((cal_id, None, None, None), Permission.READ_ONLY, cache.generation(cal_id))
+    assert cache.get((cal_id, None, None, None)) is None
+    assert cache.stats()["hit_rate"] == 0.0
+
+
+def test_access_query_is_single_statement():
+    from sqlalchemy.dialects import postgresql
+    stmt = access_query(uuid.uuid4(), uuid.uuid4(), "tok", None)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH cal AS")
+    assert "user_grants AS" in sql and "link_grants AS" in sql
+    anonymous = str(access_query(uuid.uuid4()).compile(dialect=postgresql.dialect()))
+    assert "calendar_access" not in anonymous
+
+
+def test_to_access_rows():
+    owner = SimpleNamespace(id=uuid.uuid4())
+    other = SimpleNamespace(id=uuid.uuid4())
+    missing = SimpleNamespace(calendar_exists=False, owner_id=None, level=None)
+    assert _to_access(missing, owner) == ResolvedAccess(False, False, Permission.NO_ACCESS)
+    row = SimpleNamespace(calendar_exists=True, owner_id=owner.id, level=None)
+    assert _to_access(row, owner) == ResolvedAccess(True, True, Permission.ADMINISTRATOR)
+    assert _to_access(row, other).permission == Permission.NO_ACCESS
+    row = SimpleNamespace(calendar_exists=True, owner_id=owner.id, level=2)
+    assert _to_access(row, None) == ResolvedAccess(True, False, Permission.READ_ONLY)
+
+
 # ─── iCal generation ─────────────────────────────────────────────────────
 
 def _make_event(**kwargs):
@@ -196,6 +278,17 @@ def test_events_to_ical_multiple():
     assert ical_str.count("VEVENT") == 4  # BEGIN:VEVENT + END:VEVENT x2
 
 
+def test_iter_ical_yields_one_chunk_per_event():
+    from icalendar import Calendar as ICalendar
+    events = (_make_event(title=f"Event {i}") for i in range(3))  # a generator is enough
+    chunks = list(iter_ical(events))
+    assert len(chunks) == 5
+    assert chunks[0].startswith(b"BEGIN:VCALENDAR")
+    assert chunks[-1] == b"END:VCALENDAR\r\n"
+    parsed = ICalendar.from_ical(b"".join(chunks))
+    assert [str(e["summary"]) for e in parsed.walk("VEVENT")] == ["Event 0", "Event 1", "Event 2"]
+
+
 # ─── Slugify ─────────────────────────────────────────────────────────────
 
 def test_slugify_basic():
@@ -242,6 +335,104 @@ def test_templates_all_languages():
         assert set(TEMPLATES[lang].keys()) == required_keys, f"Missing keys for {lang}"
 
 
+def _run_outbox(outbox, handler, emails, wait=0.3):
+    async def run():
+        import httpx
+        outbox.start(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        for email in emails:
+            outbox.enqueue(email)
+        await asyncio.sleep(wait)
+        await outbox.stop()
+    asyncio.run(run())
+
+
+def test_email_outbox_coalesces_into_batches():
+    import httpx
+    requests = []
+
+    def handler(request):
+        requests.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(200, json={"data": []})
+
+    outbox = EmailOutbox(batch_size=3, linger=0.05, rate=1000)
+    emails = [OutgoingEmail(f"user{i}@example.org", "Invitation", "<p>Hi</p>") for i in range(7)]
+    _run_outbox(outbox, handler, emails)
+    assert [path for path, _ in requests] == ["/emails/batch", "/emails/batch", "/emails"]
+    assert [len(body) for _, body in requests[:2]] == [3, 3]
+    assert requests[0][1][0]["to"] == ["user0@example.org"]
+    assert outbox.stats() == {"queued": 7, "pending": 0, "sent": 7, "failed": 0, "retries": 0, "requests": 3}
+
+
+def test_email_outbox_retries_with_backoff():
+    import httpx
+    answers = iter([429, 503, 200])
+
+    def handler(request):
+        return httpx.Response(next(answers), json={})
+
+    outbox = EmailOutbox(linger=0.01, rate=1000, backoff=0.01)
+    _run_outbox(outbox, handler, [OutgoingEmail("a@example.org", "Hi", "<p>Hi</p>")])
+    assert outbox.stats()["sent"] == 1
+    assert outbox.stats()["retries"] == 2
+
+
+def test_email_outbox_gives_up():
+    import httpx
+
+    def handler(request):
+        return httpx.Response(500 if request.url.path.endswith("batch") else 422, json={})
+
+    outbox = EmailOutbox(linger=0.05, rate=1000, max_attempts=2, backoff=0.01)
+    _run_outbox(outbox, handler, [OutgoingEmail("a@example.org", "Hi", "x"), OutgoingEmail("b@example.org", "Hi", "x")])
+    # The batch is retried once, then dropped
+    assert outbox.stats()["failed"] == 2
+    assert outbox.stats()["retries"] == 2
+    assert outbox.stats()["requests"] == 2
+
+    # A rejected email (4xx) is not retried
+    outbox = EmailOutbox(linger=0.01, rate=1000, backoff=0.01)
+    _run_outbox(outbox, handler, [OutgoingEmail("not-an-address", "Hi", "x")])
+    assert outbox.stats()["failed"] == 1
+    assert outbox.stats()["requests"] == 1
+
+
+def test_email_outbox_rejected_batch_sent_one_by_one():
+    import httpx
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        body = json.loads(request.content)
+        emails = body if isinstance(body, list) else [body]
+        return httpx.Response(422 if any(e["to"] == ["bad"] for e in emails) else 200, json={})
+
+    outbox = EmailOutbox(linger=0.05, rate=1000)
+    emails = [OutgoingEmail(to, "Hi", "x") for to in ("a@example.org", "bad", "b@example.org")]
+    _run_outbox(outbox, handler, emails)
+    assert paths == ["/emails/batch", "/emails", "/emails", "/emails"]
+    assert outbox.stats()["sent"] == 2
+    assert outbox.stats()["failed"] == 1
+    assert outbox.stats()["retries"] == 0
+
+
+def test_email_outbox_send_waits_for_delivery():
+    import httpx
+
+    def handler(request):
+        to = json.loads(request.content)["to"][0]
+        return httpx.Response(422 if to == "bad" else 200, json={})
+
+    async def run():
+        outbox = EmailOutbox(linger=0.01, rate=1000)
+        outbox.start(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        sent = await outbox.send(OutgoingEmail("a@example.org", "Hi", "x"))
+        rejected = await outbox.send(OutgoingEmail("bad", "Hi", "x"))
+        await outbox.stop()
+        return sent, rejected
+
+    assert asyncio.run(run()) == (True, False)
+
+
 # ─── Verification / Password reset tokens ────────────────────────────────
 
 def test_create_verification_token_type():
@@ -297,6 +488,673 @@ def test_event_to_ical_with_geo():
     assert "GEO:48.8566;2.3522" in ical_str
 
 
+
+# ─── Recurrence expansion ────────────────────────────────────────────────
+
+def test_expand_weekly_keeps_local_time_across_dst():
+    """10:00 Europe/Paris stays 10:00 local: 09:00 UTC in winter, 08:00 UTC in summer."""
+    occ = expand_occurrences(
+        "FREQ=WEEKLY",
+        datetime(2019, 1, 7, 9, 0), datetime(2019, 1, 7, 10, 0),
+        datetime(2025, 3, 20), datetime(2025, 4, 10),
+        tz_name="Europe/Paris",
+    )
+    assert [s for s, _ in occ] == [
+        datetime(2025, 3, 24, 9, 0),
+        datetime(2025, 3, 31, 8, 0),
+        datetime(2025, 4, 7, 8, 0),
+    ]
+    assert all(e - s == timedelta(hours=1) for s, e in occ)
+
+
+def test_expand_window_is_half_open():
+    occ = expand_occurrences(
+        "FREQ=DAILY",
+        datetime(2025, 6, 1, 10, 0), datetime(2025, 6, 1, 11, 0),
+        datetime(2025, 6, 2, 10, 30), datetime(2025, 6, 4, 10, 0),
+    )
+    # The 2nd overlaps the window start, the 4th starts exactly at its end
+    assert [s.day for s, _ in occ] == [2, 3]
+
+
+def test_expand_respects_until_and_count():
+    until = expand_occurrences(
+        "FREQ=WEEKLY;UNTIL=20250101T000000Z",
+        datetime(2024, 12, 1, 9, 0), datetime(2024, 12, 1, 10, 0),
+        datetime(2024, 12, 20), datetime(2025, 2, 1),
+        tz_name="Europe/Paris",
+    )
+    assert len(until) == 2
+    count = expand_occurrences(
+        "FREQ=DAILY;COUNT=3",
+        datetime(2025, 1, 1), datetime(2025, 1, 1),
+        datetime(2025, 1, 2), datetime(2025, 2, 1),
+        all_day=True,
+    )
+    assert [s for s, _ in count] == [datetime(2025, 1, 2), datetime(2025, 1, 3)]
+
+
+def test_expand_limit():
+    occ = expand_occurrences(
+        "FREQ=MINUTELY",
+        datetime(2025, 1, 1), datetime(2025, 1, 1),
+        datetime(2025, 1, 1), datetime(2025, 12, 31),
+        limit=10,
+    )
+    assert len(occ) == 10
+
+
+def test_expand_invalid_rule():
+    with pytest.raises(ValueError):
+        expand_occurrences(
+            "FREQ=NEVER",
+            datetime(2025, 1, 1), datetime(2025, 1, 1),
+            datetime(2025, 1, 1), datetime(2025, 2, 1),
+        )
+
+
+def test_overlaps_zero_length_event():
+    window = (datetime(2025, 1, 1), datetime(2025, 1, 2))
+    assert overlaps(datetime(2025, 1, 1), datetime(2025, 1, 1), *window)
+    assert not overlaps(datetime(2025, 1, 2), datetime(2025, 1, 2), *window)
+
+
+def test_materialize_limit_is_logged(monkeypatch, caplog):
+    from app.services import occurrences
+    monkeypatch.setattr(occurrences, "MATERIALIZE_LIMIT", 10)
+    event = SimpleNamespace(
+        id=uuid.uuid4(), rrule="FREQ=HOURLY", start_dt=datetime(2025, 1, 1), end_dt=datetime(2025, 1, 1, 0, 30),
+        all_day=False, sub_calendar_id=uuid.uuid4(), calendar_id=uuid.uuid4(),
+    )
+    with caplog.at_level("WARNING", logger=occurrences.__name__):
+        rows = occurrences._occurrence_rows(event, "UTC", datetime(2025, 1, 1), datetime(2025, 1, 2))
+    assert len(rows) == 10
+    assert "not materialized" in caplog.text
+    # Only windows up to the last materialized start can be read from the table
+    assert occurrences._covered_until(rows, datetime(2025, 1, 2)) == datetime(2025, 1, 1, 9)
+    assert occurrences._covered_until(rows[:9], datetime(2025, 1, 2)) == datetime(2025, 1, 2)
+
+
+def test_horizon_step_within_slack():
+    from app.main import MAINTENANCE_INTERVAL
+    from app.services.occurrences import HORIZON_STEP, HORIZON_SLACK
+    assert HORIZON_STEP + timedelta(seconds=MAINTENANCE_INTERVAL) < HORIZON_SLACK
+
+
+# ─── Pagination cursors ──────────────────────────────────────────────────
+
+def test_cursor_roundtrip():
+    key = (datetime(2025, 3, 1, 9, 30), uuid.uuid4())
+    cursor = encode_cursor(*key)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize("cursor", [
+    "", "not-a-cursor", "WzFd", "eyJhIjogMX0",
+    encode_cursor(datetime(2026, 10, 1, tzinfo=timezone.utc), uuid.uuid4()),
+])
+def test_cursor_invalid(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_rank_cursor_roundtrip():
+    key = (0.0607927, uuid.uuid4())
+    assert decode_rank_cursor(encode_rank_cursor(*key)) == key
+    with pytest.raises(ValueError):
+        decode_rank_cursor(encode_cursor(datetime(2025, 3, 1), uuid.uuid4()))
+
+
+# ─── Full-text search ────────────────────────────────────────────────────
+
+def test_tsquery_text_prefix_on_last_word():
+    assert tsquery_text("Concert d'été") == "concert & d & été:*"
+    assert tsquery_text("répét") == "répét:*"
+
+
+@pytest.mark.parametrize("q", ["", "   ", "!&|:*()", "__"])
+def test_tsquery_text_no_words(q):
+    assert tsquery_text(q) is None
+
+
+def test_safe_snippet_escapes_all_but_marks():
+    raw = "<b>Salle</b> <mark>concert</mark> & bar"
+    assert safe_snippet(raw) == "&lt;b&gt;Salle&lt;/b&gt; <mark>concert</mark> &amp; bar"
+    assert safe_snippet(None) is None
+
+
+def test_search_vector_sql_covers_translations():
+    sql = search_vector_sql({"content": "A"}, {"content": "A"})
+    assert "to_tsvector('simple', coalesce(content, ''))" in sql
+    for config, lang in (("french", "fr"), ("english", "en"), ("dutch", "nl"), ("german", "de")):
+        assert f"to_tsvector('{config}', coalesce(translations -> '{lang}' ->> 'content', ''))" in sql
+
+
+# ─── ETags ───────────────────────────────────────────────────────────────
+
+def test_make_etag_strong_and_stable():
+    etag = make_etag(3, "READ_ONLY", "/v1/calendars/x/events", "end_dt=b&start_dt=a")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(3, "READ_ONLY", "/v1/calendars/x/events", "end_dt=b&start_dt=a")
+    assert etag != make_etag(4, "READ_ONLY", "/v1/calendars/x/events", "end_dt=b&start_dt=a")
+    assert etag != make_etag(3, "READ_ONLY_NO_DETAILS", "/v1/calendars/x/events", "end_dt=b&start_dt=a")
+
+
+def test_etag_matches():
+    etag = make_etag("a")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_modified_since():
+    last_modified = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+    assert modified_since(None, last_modified)
+    assert modified_since("garbage", last_modified)
+    assert not modified_since("Sun, 01 Jun 2025 12:00:00 GMT", last_modified)
+    assert modified_since("Sun, 01 Jun 2025 11:59:59 GMT", last_modified)
+
+
+# ─── Subscription feeds ──────────────────────────────────────────────────
+
+def test_lru_cache_evicts_least_recent():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_bounded_by_bytes():
+    cache = LRUCache(10, max_bytes=10, sizeof=len)
+    cache.set("a", b"xxxx")
+    cache.set("b", b"yyyy")
+    cache.set("a", b"xxxxx")
+    assert cache.total_bytes == 9
+    cache.set("c", b"zz")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"xxxxx" and cache.get("c") == b"zz"
+    assert cache.total_bytes == 7
+    # Larger than the whole cache: not stored, nothing evicted
+    cache.set("d", b"d" * 11)
+    assert cache.get("d") is None and len(cache) == 2
+
+
+def test_feed_fragment_keyed_by_update_dt():
+    event = _make_event(update_dt=datetime(2025, 5, 4, 3, 2, 1))
+    fragment = render_fragment(event)
+    assert b"DTSTAMP:20250504T030201Z" in fragment
+    assert fragment_cache.get((event.id, event.update_dt)) == fragment
+    assert fragment_cache.get((event.id, datetime(2025, 5, 4, 3, 2, 2))) is None
+
+# ─── Translation memory ──────────────────────────────────────────────────
+
+@pytest.fixture
+def translation_backend(monkeypatch):
+    """Fake backend counting calls; translation_memory table always empty."""
+    calls = []
+
+    async def call_chain(texts, source, target, partial=False):
+        calls.extend(texts)
+        await asyncio.sleep(0.01)
+        return [f"{text} ({target})" for text in texts]
+
+    async def load(key):
+        return None
+
+    async def store(key, translated):
+        pass
+
+    async def load_many(keys):
+        return {}
+
+    async def store_many(translations):
+        pass
+
+    monkeypatch.setattr(translation, "_call_chain", call_chain)
+    monkeypatch.setattr(translation, "_load", load)
+    monkeypatch.setattr(translation, "_store", store)
+    monkeypatch.setattr(translation, "_load_many", load_many)
+    monkeypatch.setattr(translation, "_store_many", store_many)
+    monkeypatch.setattr(translation, "memory", LRUCache(100))
+    monkeypatch.setattr(translation, "_backends", translation._make_backends())
+    return calls
+
+
+def test_translate_text_memory_hit(translation_backend):
+    first = asyncio.run(translation.translate_text("Réunion", "fr", "en"))
+    second = asyncio.run(translation.translate_text("Réunion", "fr", "en"))
+    assert first == second == "Réunion (en)"
+    assert translation_backend == ["Réunion"]
+    assert asyncio.run(translation.translate_text("Réunion", "fr", "fr")) == "Réunion"
+    assert asyncio.run(translation.translate_text("  ", "fr", "en")) == ""
+    assert translation_backend == ["Réunion"]
+
+
+def test_translate_text_shares_inflight_call(translation_backend):
+    async def burst():
+        return await asyncio.gather(*(translation.translate_text("Apéro", "fr", "de") for _ in range(5)))
+
+    assert asyncio.run(burst()) == ["Apéro (de)"] * 5
+    assert translation_backend == ["Apéro"]
+    assert not translation._inflight
+
+
+def test_translate_texts_batches(translation_backend, monkeypatch):
+    batches = []
+
+    async def call_batch(texts, source, target, partial=False):
+        batches.append(texts)
+        return [f"{text} ({target})" for text in texts]
+
+    monkeypatch.setattr(translation, "_call_chain", call_batch)
+    monkeypatch.setattr(translation.settings, "TRANSLATION_BACKEND", "libretranslate")
+    monkeypatch.setattr(translation, "BATCH_SIZE", 2)
+    asyncio.run(translation.translate_text("Merci", "fr", "en"))
+
+    texts = ["Merci", "Oui", "", "Non", "Oui", "Peut-être"]
+    result = asyncio.run(translation.translate_texts(texts, "fr", "en"))
+    assert result == ["Merci (en)", "Oui (en)", "", "Non (en)", "Oui (en)", "Peut-être (en)"]
+    # "Merci" came from the memory, duplicates and blanks are not sent
+    assert batches == [["Merci"], ["Oui", "Non"], ["Peut-être"]]
+
+
+def test_translate_texts_one_request_per_text_without_batch_api(translation_backend, monkeypatch):
+    monkeypatch.setattr(translation.settings, "TRANSLATION_BACKEND", "mymemory")
+    result = asyncio.run(translation.translate_texts(["Oui", "Non", "Oui"], "fr", "nl"))
+    assert result == ["Oui (nl)", "Non (nl)", "Oui (nl)"]
+    assert sorted(translation_backend) == ["Non", "Oui"]
+
+
+def test_translation_memory_key():
+    key = translation.memory_key("Réunion", "fr", "en")
+    assert key[1:] == ("fr", "en")
+    assert len(key[0]) == 64
+    assert key != translation.memory_key("Réunion", "fr", "nl")
+
+# ─── Translation backends (against local stub servers) ───────────────────
+
+class _StubBackend(BaseHTTPRequestHandler):
+    """Answers like LibreTranslate (POST /translate), MyMemory (GET /get) and Lingva."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        q = body["q"]
+        translated = [f"[{self.server.tag}] {t}" for t in q] if isinstance(q, list) else f"[{self.server.tag}] {q}"
+        self._answer({"translatedText": translated})
+
+    def do_GET(self):
+        from urllib.parse import urlsplit, parse_qs, unquote
+        url = urlsplit(self.path)
+        if url.path == "/get":
+            text = parse_qs(url.query)["q"][0]
+            self._answer({"responseStatus": 200, "responseData": {"translatedText": f"[{self.server.tag}] {text}"}})
+        else:
+            self._answer({"translation": f"[{self.server.tag}] {unquote(url.path.rsplit('/', 1)[1])}"})
+
+    def _answer(self, data):
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        status = 500 if self.server.failing else 200
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_backends(monkeypatch):
+    """One local server per backend; tweak .failing / .delay, read .requests."""
+    servers = {}
+    for name, setting in (("libretranslate", "LIBRETRANSLATE_URL"), ("mymemory", "MYMEMORY_URL"), ("lingva", "LINGVA_URL")):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubBackend)
+        server.daemon_threads = True
+        server.tag, server.failing, server.delay, server.requests = name, False, 0.0, 0
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        monkeypatch.setattr(translation.settings, setting, f"http://127.0.0.1:{server.server_port}")
+        servers[name] = server
+    monkeypatch.setattr(translation.settings, "TRANSLATION_BACKENDS", "libretranslate,mymemory,lingva")
+    monkeypatch.setattr(translation.settings, "TRANSLATION_TIMEOUT_SECONDS", 2.0)
+    monkeypatch.setattr(translation.settings, "TRANSLATION_HEDGE_AFTER_SECONDS", 0.0)
+    monkeypatch.setattr(translation, "BREAKER_THRESHOLD", 2)
+    monkeypatch.setattr(translation, "BACKEND_RATE_LIMITS", dict.fromkeys(servers, 1000.0))
+    monkeypatch.setattr(translation, "_backends", translation._make_backends())
+    yield servers
+    for server in servers.values():
+        server.shutdown()
+        server.server_close()
+
+
+def _call_chain(texts, source="fr", target="en"):
+    async def run():
+        try:
+            return await translation._call_chain(texts, source, target)
+        finally:
+            await translation.close_http_client()
+    return asyncio.run(run())
+
+
+def test_backend_chain_batches_and_single_requests(stub_backends):
+    assert _call_chain(["Oui", "Non"]) == ["[libretranslate] Oui", "[libretranslate] Non"]
+    assert stub_backends["libretranslate"].requests == 1
+
+    stub_backends["libretranslate"].failing = True
+    assert _call_chain(["Oui", "Non"]) == ["[mymemory] Oui", "[mymemory] Non"]
+    assert stub_backends["mymemory"].requests == 2
+
+
+def test_backend_failover_splits_batches_to_fit_budget(stub_backends, monkeypatch):
+    monkeypatch.setattr(translation.settings, "TRANSLATION_TIMEOUT_SECONDS", 0.3)
+    monkeypatch.setattr(translation, "BACKEND_RATE_LIMITS", {"libretranslate": 1000.0, "mymemory": 20.0, "lingva": 1000.0})
+    monkeypatch.setattr(translation, "_backends", translation._make_backends())
+    monkeypatch.setattr(translation.settings, "TRANSLATION_BACKENDS", "libretranslate,mymemory")
+    stub_backends["libretranslate"].failing = True
+    texts = [f"Texte {i}" for i in range(20)]
+
+    async def run():
+        try:
+            return await translation._call_backend_many(texts, "fr", "en")
+        finally:
+            await translation.close_http_client()
+
+    # 20 texts at 20 per second do not fit a 0.3s budget in one call
+    assert asyncio.run(run()) == [f"[mymemory] {t}" for t in texts]
+    assert stub_backends["mymemory"].requests == 20
+
+
+def test_backend_chain_failover_and_circuit_breaker(stub_backends):
+    stub_backends["libretranslate"].failing = True
+    stub_backends["mymemory"].failing = True
+    assert _call_chain(["Salut"]) == ["[lingva] Salut"]
+    assert _call_chain(["Salut"]) == ["[lingva] Salut"]
+    # Two failures in a row: both circuits open, lingva is asked directly
+    assert translation._backends["libretranslate"].breaker.state == "open"
+    assert _call_chain(["Salut"]) == ["[lingva] Salut"]
+    assert stub_backends["libretranslate"].requests == 2
+    assert stub_backends["mymemory"].requests == 2
+    stats = translation.backend_stats()
+    assert stats["libretranslate"]["failures"] == 2 and stats["lingva"]["state"] == "closed"
+
+    stub_backends["lingva"].failing = True
+    with pytest.raises(translation.TranslationUnavailable):
+        _call_chain(["Salut"])
+
+
+def test_backend_chain_time_budget(stub_backends, monkeypatch):
+    monkeypatch.setattr(translation.settings, "TRANSLATION_BACKENDS", "libretranslate")
+    monkeypatch.setattr(translation.settings, "TRANSLATION_TIMEOUT_SECONDS", 0.3)
+    stub_backends["libretranslate"].delay = 1.0
+    start = time.monotonic()
+    with pytest.raises(translation.TranslationUnavailable):
+        _call_chain(["Salut"])
+    assert time.monotonic() - start < 0.9
+    assert translation._backends["libretranslate"].failures == 1
+
+
+def test_backend_chain_hedged_request(stub_backends, monkeypatch):
+    monkeypatch.setattr(translation.settings, "TRANSLATION_HEDGE_AFTER_SECONDS", 0.1)
+    stub_backends["libretranslate"].delay = 1.0
+    start = time.monotonic()
+    assert _call_chain(["Salut"]) == ["[mymemory] Salut"]
+    assert time.monotonic() - start < 0.8
+    # The slow backend lost the race but is not counted as failing
+    assert translation._backends["libretranslate"].breaker.state == "closed"
+
+
+def test_backend_chain_prefers_fastest(stub_backends):
+    translation._backends["libretranslate"].latency.add(0.8)
+    translation._backends["mymemory"].latency.add(0.1)
+    assert [b.name for b in translation._ranked()][:2] == ["lingva", "mymemory"]
+    translation._backends["lingva"].latency.add(0.4)
+    assert [b.name for b in translation._ranked()] == ["mymemory", "lingva", "libretranslate"]
+
+
+def test_circuit_breaker_half_open():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=2, cooldown=10, clock=lambda: now[0])
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 10.0
+    assert breaker.allow()
+    # A single trial call while half-open
+    assert not breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open"
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed"
+
+
+def test_ewma():
+    average = Ewma(alpha=0.5)
+    average.add(1.0)
+    average.add(3.0)
+    assert average.value == 2.0
+
+# ─── Language detection ──────────────────────────────────────────────────
+
+@pytest.mark.parametrize("lang,text", [
+    ("fr", "Qui vient au pique-nique dimanche ?"),
+    ("fr", "Je ne peux pas venir, désolé"),
+    ("en", "Thanks for organizing this, see you tomorrow"),
+    ("en", "I can't make it, sorry"),
+    ("nl", "Ik kan niet komen, sorry"),
+    ("nl", "Spelletjesavond in het buurthuis"),
+    ("de", "Wer kommt am Sonntag zum Picknick?"),
+    ("de", "Ich kann leider nicht kommen"),
+])
+def test_detect_language(lang, text):
+    assert detect_language(text) == lang
+
+
+def test_detect_language_unsure():
+    assert detect_language("Concert") is None
+    assert detect_language("Board game night") is None
+    assert detect_language("https://example.com/inscription-atelier-velo") is None
+
+
+@pytest.mark.parametrize("lang,title", [
+    ("en", "Summer festival"),
+    ("en", "Movie night"),
+    ("en", "Garden workshop"),
+    ("en", "Annual general meeting"),
+    ("fr", "Fête de la musique"),
+    ("fr", "Réunion du comité des fêtes"),
+    ("nl", "Jaarlijkse algemene vergadering"),
+    ("nl", "Ik kan niet komen"),
+    ("de", "Sommerfest im Garten"),
+    ("de", "Ich kann leider nicht kommen"),
+])
+def test_short_title_keeps_hint(lang, title):
+    assert detect_language(title, lang) == lang
+    assert translation.source_language(title, lang) == lang
+
+
+def test_long_text_overrides_hint():
+    text = "We will meet at the station and walk together to the lake for a picnic"
+    assert detect_language(text, "nl") == "en"
+    assert translation.source_language(text, "fr") == "en"
+
+
+def test_translate_text_short_title_not_misread(translation_backend):
+    assert asyncio.run(translation.translate_text("Movie night", "en", "nl")) == "Movie night (nl)"
+    assert asyncio.run(translation.translate_text("Summer festival", "en", "fr")) == "Summer festival (fr)"
+    assert translation_backend == ["Movie night", "Summer festival"]
+
+
+def test_has_words():
+    assert has_words("Réunion")
+    assert not has_words("https://example.com 🎉🎉 !!")
+    assert not has_words("contact@example.org 06 12 34 56 78")
+
+
+def test_translate_text_skips_noop(translation_backend):
+    english = "Thanks for organizing this, see you tomorrow"
+    assert asyncio.run(translation.translate_text(english, "fr", "en")) == english
+    assert asyncio.run(translation.translate_text("https://example.com 🎉", "fr", "en")) == "https://example.com 🎉"
+    # Wrong source guess fixed: translated from English
+    asyncio.run(translation.translate_text(english, "fr", "de"))
+    assert translation.memory.get(translation.memory_key(english, "en", "de")) == f"{english} (de)"
+    assert translation_backend == [english]
+
+# ─── Pre-translation ─────────────────────────────────────────────────────
+
+def test_pretranslation_schedules_jobs_in_session():
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.models.job import Job
+    events = [uuid.uuid4() for _ in range(pretranslation.JOB_SIZE + 1)]
+    comment = uuid.uuid4()
+    db = AsyncSession()
+    pretranslation.schedule(db, "event", events)
+    pretranslation.schedule(db, "comment", [comment])
+    pretranslation.schedule(db, "comment", [])
+    queued = [obj for obj in db.new if isinstance(obj, Job)]
+    assert sorted((j.kind, len(j.payload["ids"])) for j in queued) == [
+        ("pretranslate_comments", 1), ("pretranslate_events", 1), ("pretranslate_events", pretranslation.JOB_SIZE),
+    ]
+    assert str(comment) in next(j for j in queued if j.kind == "pretranslate_comments").payload["ids"]
+
+
+# ─── Job queue ───────────────────────────────────────────────────────────
+
+def test_job_handlers_registered():
+    assert jobs.HANDLERS["invitation_email"] is invitation_email
+    assert jobs.HANDLERS["delete_stored_files"] is delete_stored_files
+    assert {"verification_email", "password_reset_email", "pretranslate_events", "pretranslate_comments"} <= set(jobs.HANDLERS)
+
+
+def test_enqueue_adds_job_with_handler_defaults():
+    from sqlalchemy.ext.asyncio import AsyncSession
+    db = AsyncSession()
+    row = jobs.enqueue(db, verification_email, user_id="abc")
+    assert row in db.new
+    assert (row.kind, row.payload, row.priority, row.max_attempts) == ("verification_email", {"user_id": "abc"}, 10, 5)
+    later = datetime(2030, 1, 1)
+    row = jobs.enqueue(db, delete_stored_files, priority=3, run_at=later, max_attempts=2, filenames=["a.png"])
+    assert (row.priority, row.run_at, row.max_attempts) == (3, later, 2)
+
+    async def not_a_job():
+        pass
+
+    with pytest.raises(ValueError):
+        jobs.enqueue(db, not_a_job)
+
+
+def test_job_retry_backoff():
+    assert [jobs.retry_delay(n) for n in (1, 2, 3)] == [jobs.RETRY_BASE, 2 * jobs.RETRY_BASE, 4 * jobs.RETRY_BASE]
+    assert jobs.retry_delay(30) == jobs.RETRY_MAX
+    now = datetime(2026, 1, 1)
+    retry = jobs.failure_values(2, 5, "boom", now)
+    assert retry["status"] == "pending"
+    assert retry["run_at"] == now + timedelta(seconds=jobs.retry_delay(2))
+    assert jobs.failure_values(5, 5, "boom", now) == {"status": "failed", "locked_at": None, "last_error": "boom"}
+
+
+def test_claim_statement_skips_locked_rows():
+    from sqlalchemy.dialects import postgresql
+    sql = str(jobs.claim_statement(4, datetime(2026, 1, 1)).compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "ORDER BY jobs.priority DESC, jobs.run_at" in sql
+    assert "RETURNING" in sql
+    # Matches the partial index ix_jobs_pending: no OR on running jobs
+    assert "locked_at <" not in sql
+    released = str(jobs.release_expired_statement(datetime(2026, 1, 1)).compile(dialect=postgresql.dialect()))
+    assert "jobs.status = %(status_1)s AND jobs.locked_at < %(locked_at_1)s" in released
+
+
+def test_run_job_records_outcome(monkeypatch):
+    finished = []
+
+    async def fake_finish(job_id, values):
+        finished.append(values)
+
+    monkeypatch.setattr(jobs, "_finish", fake_finish)
+    calls = []
+
+    async def flaky_job(n):
+        calls.append(n)
+        if n < 0:
+            raise RuntimeError("negative")
+
+    monkeypatch.setitem(jobs.HANDLERS, "flaky_job", flaky_job)
+
+    def claimed(n, attempts=1, max_attempts=3):
+        return SimpleNamespace(
+            id=uuid.uuid4(), kind="flaky_job", payload={"n": n}, attempts=attempts, max_attempts=max_attempts,
+        )
+
+    asyncio.run(jobs.run_job(claimed(1)))
+    asyncio.run(jobs.run_job(claimed(-1)))
+    asyncio.run(jobs.run_job(claimed(-1, attempts=3)))
+    # Reclaimed from a dead worker after its last attempt: not run again
+    asyncio.run(jobs.run_job(claimed(2, attempts=4)))
+    assert calls == [1, -1, -1]
+    assert finished[0] is None
+    assert finished[1]["status"] == "pending" and "negative" in finished[1]["last_error"]
+    assert [f["status"] for f in finished[2:]] == ["failed", "failed"]
+
+
+def test_pretranslation_targets():
+    assert pretranslation._targets("fr", None) == ["de", "en", "nl"]
+    assert pretranslation._targets("en", {"fr": {}, "de": {}}) == ["nl"]
+
+
+def test_throttle_spaces_calls():
+    async def run():
+        loop = asyncio.get_running_loop()
+        throttle = Throttle(50)
+        start = loop.time()
+        await asyncio.gather(*(throttle.wait() for _ in range(4)))
+        return loop.time() - start
+
+    assert asyncio.run(run()) >= 0.06
+
+
+def test_throttle_slots():
+    async def run():
+        throttle = Throttle(4)
+        before = throttle.slots(1.0)
+        waiting = [asyncio.create_task(throttle.wait()) for _ in range(3)]
+        await asyncio.sleep(0)
+        after = throttle.slots(1.0), throttle.slots(0.5)
+        for task in waiting:
+            task.cancel()
+        return before, *after
+
+    # Calls queued for the next 0.75s leave room for 2 more starts within the second
+    assert asyncio.run(run()) == (5, 2, 0)
+
+# ─── Event tag links ─────────────────────────────────────────────────────
+
+def test_set_tags_stmt_single_statement():
+    from sqlalchemy.dialects import postgresql
+    event_id, a, b = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    assert _set_tags_stmt(event_id, {a}, {a}) is None
+
+    removed_only = str(_set_tags_stmt(event_id, {a, b}, {a}).compile(dialect=postgresql.dialect()))
+    assert removed_only.startswith("DELETE FROM event_tags")
+
+    swapped = str(_set_tags_stmt(event_id, {a}, {b}).compile(dialect=postgresql.dialect()))
+    assert swapped.startswith("WITH removed_tags AS")
+    assert "INSERT INTO event_tags" in swapped
+
+    added_only = str(_set_tags_stmt(event_id, set(), {a, b}).compile(dialect=postgresql.dialect()))
+    assert added_only.startswith("INSERT INTO event_tags")
+
 # ─── Slugify edge cases ──────────────────────────────────────────────────
 
 def test_slugify_empty():
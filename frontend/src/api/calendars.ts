@@ -1,6 +1,6 @@
 import api from './client'
 import type {
-  CalendarConfig, SubCalendar, CalendarEvent, EventSignup,
+  CalendarConfig, SubCalendar, CalendarEvent, EventPage, EventSignup,
   AccessLink, CalendarAccess, Group, GroupMember, MyPermission, Permission, Tag,
   EventComment, EventAttachment, InviteResult, PendingInvitation,
   GroupAccess, ClaimLinkResult, UserGroupMembership, AddGroupMemberResult,
@@ -36,13 +36,22 @@ export const calendarApi = {
   deleteSubCalendar: (calId: string, scId: string) =>
     api.delete(`/calendars/${calId}/subcalendars/${scId}`),
 
-  getEvents: (
+  // Follows next_cursor until the whole window is loaded
+  getEvents: async (
     calId: string,
     params?: { start_dt?: string; end_dt?: string; subcalendar_ids?: string[] }
-  ) =>
-    api
-      .get<CalendarEvent[]>(`/calendars/${calId}/events`, { params })
-      .then((r) => r.data),
+  ) => {
+    const events: CalendarEvent[] = []
+    let cursor: string | undefined
+    do {
+      const page = await api
+        .get<EventPage>(`/calendars/${calId}/events`, { params: { ...params, cursor } })
+        .then((r) => r.data)
+      events.push(...page.items)
+      cursor = page.next_cursor ?? undefined
+    } while (cursor)
+    return events
+  },
 
   createEvent: (calId: string, data: Partial<CalendarEvent>) =>
     api.post<CalendarEvent>(`/calendars/${calId}/events`, data).then((r) => r.data),
@@ -55,10 +64,11 @@ export const calendarApi = {
   deleteEvent: (calId: string, eventId: string) =>
     api.delete(`/calendars/${calId}/events/${eventId}`),
 
+  // First page only: enough for the search dropdown
   searchEvents: (calId: string, q: string) =>
     api
-      .get<CalendarEvent[]>(`/calendars/${calId}/events/search`, { params: { q } })
-      .then((r) => r.data),
+      .get<EventPage>(`/calendars/${calId}/events/search`, { params: { q, limit: 50 } })
+      .then((r) => r.data.items),
 
   getSignups: (calId: string, eventId: string) =>
     api
@@ -183,13 +193,10 @@ export const calendarApi = {
   deleteComment: (calId: string, eventId: string, commentId: string) =>
     api.delete(`/calendars/${calId}/events/${eventId}/comments/${commentId}`),
 
-  translateComment: (
-    calId: string, eventId: string, commentId: string,
-    targetLang: string, sourceLang = 'fr'
-  ) =>
+  translateComments: (calId: string, eventId: string, targetLang: string, sourceLang = 'fr') =>
     api
-      .post<{ content: string }>(
-        `/calendars/${calId}/events/${eventId}/comments/${commentId}/translate`,
+      .post<Record<string, { content: string }>>(
+        `/calendars/${calId}/events/${eventId}/comments/translate`,
         null,
         { params: { target_lang: targetLang, source_lang: sourceLang } }
       )
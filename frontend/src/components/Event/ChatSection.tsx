@@ -46,29 +46,28 @@ export default function ChatSection({
     scrollRef.current?.scrollTo({ top: scrollRef.current.scrollHeight, behavior: 'smooth' })
   }, [comments.length])
 
-  // Auto-translate comments
+  // Auto-translate comments: the whole thread in one request
   useEffect(() => {
     if (targetLang === sourceLang) return
     const untranslated = comments.filter(
       (c) => !c.translations?.[targetLang] && !translatingRef.current.has(c.id)
     )
-    untranslated.forEach((comment) => {
-      translatingRef.current.add(comment.id)
-      calendarApi
-        .translateComment(calendarId, eventId, comment.id, targetLang, sourceLang)
-        .then((data) => {
-          qc.setQueryData<EventComment[]>(queryKey, (old) => {
-            if (!old) return old
-            return old.map((c) =>
-              c.id !== comment.id
-                ? c
-                : { ...c, translations: { ...c.translations, [targetLang]: data } }
-            )
-          })
+    if (untranslated.length === 0) return
+    untranslated.forEach((c) => translatingRef.current.add(c.id))
+    calendarApi
+      .translateComments(calendarId, eventId, targetLang, sourceLang)
+      .then((data) => {
+        qc.setQueryData<EventComment[]>(queryKey, (old) => {
+          if (!old) return old
+          return old.map((c) =>
+            !data[c.id]
+              ? c
+              : { ...c, translations: { ...c.translations, [targetLang]: data[c.id] } }
+          )
         })
-        .catch(() => {})
-        .finally(() => translatingRef.current.delete(comment.id))
-    })
+      })
+      .catch(() => {})
+      .finally(() => untranslated.forEach((c) => translatingRef.current.delete(c.id)))
   }, [targetLang, comments, sourceLang, calendarId, eventId, qc]) // eslint-disable-line react-hooks/exhaustive-deps
 
   const createMutation = useMutation({
@@ -63,12 +63,21 @@ export interface CalendarEvent {
   creator_user_id: string | null
   signup_enabled: boolean
   signup_max: number | null
+  signup_count: number
   rrule: string | null
   custom_fields: Record<string, unknown>
   tags: Tag[]
   translations: Record<string, { title: string; notes: string }> | null
+  language: string | null
   creation_dt: string
   update_dt: string
+  // Search results only: HTML-escaped, matches wrapped in <mark>
+  snippet?: string | null
+}
+
+export interface EventPage {
+  items: CalendarEvent[]
+  next_cursor: string | null
 }
 
 export interface EventSignup {
@@ -78,6 +87,7 @@ export interface EventSignup {
   email: string
   note: string | null
   created_at: string
+  waitlisted: boolean
 }
 
 export interface EventComment {
@@ -87,6 +97,7 @@ export interface EventComment {
   user_name: string
   content: string
   translations: Record<string, { content: string }> | null
+  language: string | null
   created_at: string
 }
 
@@ -79,19 +79,25 @@ async function globalSetup(_config: FullConfig) {
   })
   if (calInfoRes.ok) {
     const cal = await calInfoRes.json()
-    const eventsRes = await fetch(`${BASE}/calendars/${cal.id}/events`, {
-      headers: { Authorization: `Bearer ${access_token}` },
-    })
-    if (eventsRes.ok) {
-      const events = await eventsRes.json()
-      for (const ev of events) {
-        await fetch(`${BASE}/calendars/${cal.id}/events/${ev.id}`, {
-          method: 'DELETE',
-          headers: { Authorization: `Bearer ${access_token}` },
-        })
-      }
-      console.log(`[Setup] ${events.length} événements supprimés`)
+    const events: { id: string }[] = []
+    let cursor: string | null = null
+    do {
+      const qs: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+      const eventsRes = await fetch(`${BASE}/calendars/${cal.id}/events${qs}`, {
+        headers: { Authorization: `Bearer ${access_token}` },
+      })
+      if (!eventsRes.ok) break
+      const page = await eventsRes.json()
+      events.push(...page.items)
+      cursor = page.next_cursor
+    } while (cursor)
+    for (const ev of events) {
+      await fetch(`${BASE}/calendars/${cal.id}/events/${ev.id}`, {
+        method: 'DELETE',
+        headers: { Authorization: `Bearer ${access_token}` },
+      })
     }
+    console.log(`[Setup] ${events.length} événements supprimés`)
   }
 }
 